@@ -0,0 +1,61 @@
+"""
+Cold-start benchmark for the `synapso` entry point.
+
+Imports `synapso_cli.main` in fresh interpreters under `python -X importtime`
+and fails if the median cumulative import time exceeds the budget, or if any
+of the heavy dependencies that commands load on demand sneaks back into the
+startup import graph.
+
+    python benchmarks/startup.py [--budget-ms 150] [--runs 5]
+
+`synapso bench startup` reports the same measurement as JSON.
+"""
+
+import argparse
+import statistics
+import sys
+
+from synapso_cli.commands.bench import import_profile
+
+DEFAULT_BUDGET_MS = 150.0
+DEFAULT_RUNS = 5
+
+# Modules that must not be imported just to build the CLI.
+LAZY_MODULES = ("requests", "httpx", "psutil", "yaml", "pydantic", "typer")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Cold-start benchmark for the `synapso` entry point."
+    )
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS)
+    args = parser.parse_args()
+
+    totals_ms = []
+    loaded: set[str] = set()
+    for _ in range(args.runs):
+        total_ms, modules = import_profile()
+        totals_ms.append(total_ms)
+        loaded.update(name.split(".")[0] for name in modules)
+
+    median_ms = statistics.median(totals_ms)
+    print(
+        f"startup import time: median {median_ms:.1f} ms, "
+        f"min {min(totals_ms):.1f} ms over {args.runs} runs "
+        f"(budget {args.budget_ms:.0f} ms)"
+    )
+
+    failed = False
+    leaked = sorted(set(LAZY_MODULES) & loaded)
+    if leaked:
+        print(f"FAIL: imported at startup: {', '.join(leaked)}")
+        failed = True
+    if median_ms > args.budget_ms:
+        print(f"FAIL: startup exceeds budget by {median_ms - args.budget_ms:.1f} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,411 @@
+import asyncio
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable
+from contextlib import asynccontextmanager
+from typing import Any, TypeVar
+
+import httpx
+
+from . import tracing
+from .errors import SynapsoHTTPError
+from .policy import RequestPolicy
+from .rest_client import (
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_ENDPOINT_TIMEOUTS,
+    DEFAULT_POOL_SIZE,
+    DEFAULT_READ_TIMEOUT,
+    SynapsoRestClientError,
+    build_query_payload,
+)
+
+DEFAULT_CONCURRENCY = 8
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def _handle_response(response: httpx.Response):
+    try:
+        response.raise_for_status()
+    except httpx.HTTPStatusError as e:
+        raise SynapsoHTTPError(f"HTTP error: {e}", response.status_code) from e
+    try:
+        return response.json()
+    except ValueError as e:
+        raise SynapsoRestClientError(f"Invalid JSON response: {e}") from e
+
+
+class _ConnectTimer:
+    """httpx trace hook adding up the time spent opening connections."""
+
+    def __init__(self):
+        self.seconds = 0.0
+        self._started: float | None = None
+
+    async def __call__(self, event: str, info: dict):
+        if event.startswith("connection.connect_") and event.endswith(".started"):
+            self._started = time.perf_counter()
+        elif event.startswith("connection.connect_") and self._started is not None:
+            self.seconds += time.perf_counter() - self._started
+            self._started = None
+
+
+class AsyncSynapsoRestClient:
+    """
+    Asyncio counterpart of `SynapsoRestClient`.
+
+    Mirrors every endpoint of the sync client over a single pooled
+    `httpx.AsyncClient`. Use it as an async context manager (or await
+    `aclose()`) to release the pool when done. `socket_path` works as in
+    the sync client, and requests produce trace spans just as its do.
+    JSON calls run under `policy`, with the same deadlines, retries, hedging
+    of `query` and circuit breaker as in the sync client.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        keep_alive: bool = True,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: float = DEFAULT_READ_TIMEOUT,
+        endpoint_timeouts: dict[str, tuple[float, float]] | None = None,
+        socket_path: str | None = None,
+        on_request: Callable[[], None] | None = None,
+        policy: RequestPolicy | None = None,
+    ):
+        if not base_url.startswith(("http://", "https://")):
+            raise ValueError("base_url must start with 'http://' or 'https://'")
+        if pool_size < 1:
+            raise ValueError("pool_size must be at least 1")
+        self.base_url = base_url.rstrip("/")
+        self.pool_size = pool_size
+        self.keep_alive = keep_alive
+        self.socket_path = socket_path
+        # Called before every request, e.g. to record that the server is in use.
+        self.on_request = on_request
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.endpoint_timeouts = {
+            **DEFAULT_ENDPOINT_TIMEOUTS,
+            **(endpoint_timeouts or {}),
+        }
+        self.policy = policy if policy is not None else RequestPolicy()
+        self._client: httpx.AsyncClient | None = None
+        # Pools replaced by `retarget`; requests in flight may still use them.
+        self._retired: list[httpx.AsyncClient] = []
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            limits = httpx.Limits(
+                max_connections=self.pool_size,
+                max_keepalive_connections=self.pool_size if self.keep_alive else 0,
+            )
+            transport = (
+                httpx.AsyncHTTPTransport(uds=self.socket_path, limits=limits)
+                if self.socket_path
+                else None
+            )
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url, limits=limits, transport=transport
+            )
+        return self._client
+
+    async def aclose(self):
+        self.policy.close()
+        for client in self._retired:
+            await client.aclose()
+        self._retired.clear()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def retarget(self, base_url: str, socket_path: str | None = None):
+        """Point the client at another server, e.g. one restarted elsewhere."""
+        self.base_url = base_url.rstrip("/")
+        self.socket_path = socket_path
+        if self._client is not None:
+            self._retired.append(self._client)
+            self._client = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+
+    def timeout_for(
+        self, endpoint: str, remaining: float | None = None
+    ) -> httpx.Timeout:
+        """Timeouts of `endpoint`, reading for at most `remaining` seconds."""
+        connect, read = self.endpoint_timeouts.get(
+            endpoint, (self.connect_timeout, self.read_timeout)
+        )
+        if remaining is not None:
+            read = max(0.001, min(read, remaining))
+        return httpx.Timeout(read, connect=connect)
+
+    @asynccontextmanager
+    async def _stream(
+        self, method: str, endpoint: str, retries: int = 0, **kwargs
+    ) -> AsyncIterator[httpx.Response]:
+        """
+        Send a request and yield the response before its body is read. With
+        tracing on, the request is recorded as a span once the body is done;
+        `retries` is how many attempts of the same call came before it.
+        """
+        kwargs.setdefault("timeout", self.timeout_for(endpoint))
+        if self.on_request is not None:
+            self.on_request()
+        span = None
+        timer = _ConnectTimer()
+        if tracing.tracing_enabled():
+            span = tracing.start_span(method, endpoint)
+            span["retries"] = retries
+            kwargs["extensions"] = {"trace": timer}
+        response: httpx.Response | None = None
+        error = None
+        try:
+            try:
+                request = self.client.build_request(method, endpoint, **kwargs)
+                response = await self.client.send(request, stream=True)
+            except httpx.HTTPError as e:
+                raise SynapsoRestClientError(f"Request error: {e}") from e
+            if span is not None:
+                span["ttfb_ms"] = tracing.elapsed_ms(span)
+                span["status"] = response.status_code
+            try:
+                yield response
+            except httpx.HTTPError as e:
+                raise SynapsoRestClientError(f"Request error: {e}") from e
+            finally:
+                await response.aclose()
+        except SynapsoRestClientError as e:
+            error = str(e)
+            raise
+        finally:
+            if span is not None:
+                span["connect_ms"] = timer.seconds * 1000
+                body_bytes = response.num_bytes_downloaded if response else 0
+                tracing.finish_span(span, body_bytes=body_bytes, error=error)
+
+    async def _request(
+        self, method: str, endpoint: str, retries: int = 0, **kwargs
+    ) -> httpx.Response:
+        async with self._stream(method, endpoint, retries, **kwargs) as response:
+            await response.aread()
+        return response
+
+    async def _call(
+        self,
+        method: str,
+        endpoint: str,
+        idempotent: bool | None = None,
+        hedge: bool = False,
+        **kwargs,
+    ):
+        """
+        Make a JSON call under the client's policy and return the decoded
+        body. Calls are idempotent, and so retried, if they are GETs unless
+        told otherwise.
+        """
+        if idempotent is None:
+            idempotent = method == "GET"
+
+        async def attempt(remaining: float | None, retry: int):
+            response = await self._request(
+                method,
+                endpoint,
+                retries=retry,
+                timeout=self.timeout_for(endpoint, remaining),
+                **kwargs,
+            )
+            return _handle_response(response)
+
+        return await self.policy.acall(
+            endpoint, attempt, idempotent=idempotent, hedge=hedge
+        )
+
+    async def health(self) -> bool:
+        """Return True if the server answers its health check."""
+        try:
+            response = await self._request("GET", "/")
+            return (
+                response.status_code == 200
+                and response.json().get("message") == "Synapso API is running"
+            )
+        except (SynapsoRestClientError, ValueError):
+            return False
+
+    async def get_cortex_list(self):
+        return await self._call("GET", "/cortex/list")
+
+    async def get_cortex(
+        self, cortex_id: str | None = None, cortex_name: str | None = None
+    ):
+        params = {}
+        if cortex_id:
+            params["cortex_id"] = cortex_id
+        if cortex_name:
+            params["cortex_name"] = cortex_name
+        return await self._call("GET", "/cortex", params=params)
+
+    async def create_cortex(self, path: str, cortex_name: str):
+        data = {
+            "path": path,
+            "name": cortex_name,
+        }
+        return await self._call("POST", "/cortex/create", json=data)
+
+    async def index_cortex(
+        self,
+        cortex_id: str | None = None,
+        cortex_name: str | None = None,
+        delta: dict[str, list[str]] | None = None,
+    ):
+        """
+        Submit an index job. With `delta` ({"added", "changed", "deleted"}
+        lists of file paths) only those files are (re)indexed or dropped.
+        """
+        params = {}
+        if cortex_id:
+            params["cortex_id"] = cortex_id
+        if cortex_name:
+            params["cortex_name"] = cortex_name
+        data = {"files": delta} if delta is not None else None
+        return await self._call("POST", "/cortex/index", params=params, json=data)
+
+    async def query(self, query: str, cortex_id: str | None = None):
+        data = {
+            "query": query,
+        }
+        if cortex_id:
+            data["cortex_id"] = cortex_id
+        return await self._call(
+            "POST", "/query/query", json=data, idempotent=True, hedge=True
+        )
+
+    async def system_init(self):
+        return await self._call("POST", "/system/init")
+
+    async def query_stream(
+        self, query: str, cortex_ids: list[str] | None = None
+    ) -> AsyncIterator[str]:
+        data = build_query_payload(query, cortex_ids)
+        async with self._stream("POST", "/query/query_stream", json=data) as response:
+            if response.is_error:
+                await response.aread()
+                _handle_response(response)
+            async for chunk in response.aiter_text():
+                if chunk:
+                    yield chunk
+
+    async def rebuild_vector_index(self, settings: dict):
+        """Submit a job rebuilding the vector index with `settings`."""
+        return await self._call("POST", "/vector/rebuild_index", json=settings)
+
+    async def get_job_list(self):
+        return await self._call("GET", "/job/list_jobs")
+
+    async def get_job(self, job_id: str):
+        return await self._call("GET", "/job/get_job", params={"job_id": job_id})
+
+    async def get_job_if_changed(
+        self, job_id: str, etag: str | None = None
+    ) -> tuple[dict | None, str | None]:
+        """
+        Conditionally fetch a job: return (None, etag) if the server answers
+        304 Not Modified for `etag`, else the job and its new ETag, if any.
+        """
+        endpoint = "/job/get_job"
+        headers = {"If-None-Match": etag} if etag else {}
+
+        async def attempt(remaining: float | None, retry: int):
+            response = await self._request(
+                "GET",
+                endpoint,
+                retries=retry,
+                timeout=self.timeout_for(endpoint, remaining),
+                params={"job_id": job_id},
+                headers=headers,
+            )
+            if response.status_code == 304:
+                return None, etag
+            return _handle_response(response), response.headers.get("ETag")
+
+        return await self.policy.acall(endpoint, attempt, idempotent=True)
+
+    async def gather_queries(
+        self,
+        queries: Iterable[str],
+        concurrency: int = DEFAULT_CONCURRENCY,
+        return_exceptions: bool = False,
+    ) -> list[Any]:
+        """Run `query` for each query text, at most `concurrency` at a time.
+
+        Results are returned in submission order.
+        """
+        return await bounded_gather(
+            self.query, queries, concurrency, return_exceptions=return_exceptions
+        )
+
+    async def query_cortices(
+        self,
+        query: str,
+        cortex_ids: Iterable[str],
+        concurrency: int = DEFAULT_CONCURRENCY,
+        return_exceptions: bool = False,
+    ) -> list[Any]:
+        """Run one query against each cortex, at most `concurrency` at a time.
+
+        Results are returned in the order of `cortex_ids`.
+        """
+
+        async def query_one(cortex_id: str):
+            return await self.query(query, cortex_id)
+
+        return await bounded_gather(
+            query_one, cortex_ids, concurrency, return_exceptions=return_exceptions
+        )
+
+    async def index_many(
+        self,
+        cortex_ids: Iterable[str],
+        concurrency: int = DEFAULT_CONCURRENCY,
+        return_exceptions: bool = False,
+    ) -> list[Any]:
+        """Submit an index job for each cortex, at most `concurrency` at a time.
+
+        Results are returned in submission order.
+        """
+        return await bounded_gather(
+            self.index_cortex,
+            cortex_ids,
+            concurrency,
+            return_exceptions=return_exceptions,
+        )
+
+
+async def bounded_gather(
+    func: Callable[[T], Awaitable[R]],
+    items: Iterable[T],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    return_exceptions: bool = False,
+) -> list[R | BaseException]:
+    """Await `func(item)` for every item with at most `concurrency` in flight.
+
+    Results are returned in the order of `items`, like `asyncio.gather`; with
+    `return_exceptions`, failed items hold their exception.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(item: T) -> R:
+        async with semaphore:
+            return await func(item)
+
+    return await asyncio.gather(
+        *(run(item) for item in items), return_exceptions=return_exceptions
+    )
@@ -1,3 +1,16 @@
-from .init import init_synapso
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .init import init_synapso
 
 __all__ = ["init_synapso"]
+
+
+def __getattr__(name: str):
+    # Imported on first use: `init` pulls in yaml, pydantic and the REST client,
+    # which the other commands don't need.
+    if name == "init_synapso":
+        from .init import init_synapso
+
+        return init_synapso
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
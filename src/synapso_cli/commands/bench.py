@@ -0,0 +1,322 @@
+import json
+import os
+import sys
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Annotated, Any
+
+import cyclopts
+
+from ..errors import SynapsoRestClientError
+from ..metrics import percentile, summarize_latencies
+
+if TYPE_CHECKING:
+    from ..rest_client import SynapsoRestClient
+
+bench_app = cyclopts.App()
+
+StandIn = Annotated[bool, cyclopts.Parameter(name=["--stand-in", "-s"])]
+LatencyMs = Annotated[float, cyclopts.Parameter(name=["--latency-ms"])]
+PayloadBytes = Annotated[int, cyclopts.Parameter(name=["--payload-bytes"])]
+Output = Annotated[str | None, cyclopts.Parameter(name=["--output", "-o"])]
+
+
+@contextmanager
+def _bench_client(
+    stand_in: bool, pool_size: int = 1, **stand_in_options
+) -> Iterator["SynapsoRestClient"]:
+    """Yield a client for the running server, or for a fresh stand-in."""
+    from ..rest_client import SynapsoRestClient
+    from .server import get_rest_client
+
+    if not stand_in:
+        yield get_rest_client()
+        return
+
+    from ..stand_in import StandInServer
+
+    with (
+        StandInServer(**stand_in_options) as server,
+        SynapsoRestClient(server.base_url, pool_size=pool_size) as client,
+    ):
+        yield client
+
+
+def _emit(
+    benchmark: str, params: dict[str, Any], results: dict, output_path: str | None
+):
+    """Write a benchmark report as JSON to `output_path`, or stdout."""
+    import platform
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        cli_version = version("synapso_cli")
+    except PackageNotFoundError:
+        cli_version = None
+    report = {
+        "benchmark": benchmark,
+        "version": cli_version,
+        "python": platform.python_version(),
+        "timestamp": time.time(),
+        "params": params,
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if output_path is None:
+        print(text)
+    else:
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+
+def _summarize(values: list[float], unit: str = "ms") -> dict[str, float]:
+    return {
+        f"mean_{unit}": sum(values) / len(values) if values else 0.0,
+        f"p50_{unit}": percentile(values, 50),
+        f"p95_{unit}": percentile(values, 95),
+        f"max_{unit}": max(values, default=0.0),
+    }
+
+
+@bench_app.command
+def query(
+    requests: Annotated[int, cyclopts.Parameter(name=["--requests", "-n"])] = 200,
+    concurrency: Annotated[int, cyclopts.Parameter(name=["--concurrency", "-j"])] = 1,
+    warmup: Annotated[int, cyclopts.Parameter(name=["--warmup"])] = 5,
+    stand_in: StandIn = False,
+    latency_ms: LatencyMs = 5.0,
+    payload_bytes: PayloadBytes = 2048,
+    hedge_ms: Annotated[float | None, cyclopts.Parameter(name=["--hedge-ms"])] = None,
+    output: Output = None,
+):
+    """
+    Measure /query/query latency percentiles and throughput.
+
+    --hedge-ms sends a second, hedged request when the first hasn't answered
+    within that many milliseconds. The client's retry, hedging and circuit
+    breaker counters are included in the report.
+    """
+    params = locals().copy()
+    if requests < 1 or concurrency < 1:
+        raise cyclopts.CycloptsError("--requests and --concurrency must be at least 1")
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    with _bench_client(
+        stand_in,
+        pool_size=concurrency,
+        latency_ms=latency_ms,
+        payload_bytes=payload_bytes,
+    ) as client:
+        if hedge_ms is not None:
+            client.policy.hedge_after = hedge_ms / 1000
+        for i in range(warmup):
+            client.query(f"warmup query {i}")
+
+        def run(i: int) -> float | None:
+            start = time.perf_counter()
+            try:
+                client.query(f"benchmark query {i}")
+            except SynapsoRestClientError:
+                return None
+            return time.perf_counter() - start
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            outcomes = list(pool.map(run, range(requests)))
+        elapsed = time.perf_counter() - start
+        policy_stats = client.policy.stats()
+
+    latencies = [latency for latency in outcomes if latency is not None]
+    results = {
+        **summarize_latencies(latencies, elapsed),
+        "errors": len(outcomes) - len(latencies),
+        "policy": policy_stats,
+    }
+    _emit("query", params, results, output)
+
+
+@bench_app.command
+def ask(
+    requests: Annotated[int, cyclopts.Parameter(name=["--requests", "-n"])] = 20,
+    stand_in: StandIn = False,
+    latency_ms: LatencyMs = 50.0,
+    payload_bytes: PayloadBytes = 2048,
+    stream_tokens: Annotated[int, cyclopts.Parameter(name=["--stream-tokens"])] = 64,
+    token_interval_ms: Annotated[
+        float, cyclopts.Parameter(name=["--token-interval-ms"])
+    ] = 2.0,
+    output: Output = None,
+):
+    """Measure streaming time to first token and token throughput."""
+    params = locals().copy()
+    if requests < 1:
+        raise cyclopts.CycloptsError("--requests must be at least 1")
+
+    from ..streaming import render_stream
+
+    runs = []
+    with (
+        _bench_client(
+            stand_in,
+            latency_ms=latency_ms,
+            payload_bytes=payload_bytes,
+            stream_tokens=stream_tokens,
+            token_interval_ms=token_interval_ms,
+        ) as client,
+        open(os.devnull, "wb") as sink,
+    ):
+        for i in range(requests):
+            runs.append(render_stream(client.query_stream(f"benchmark {i}"), sink))
+
+    results = {
+        "count": len(runs),
+        "ttft": _summarize([run["ttft_ms"] for run in runs]),
+        "total": _summarize([run["total_ms"] for run in runs]),
+        "tokens_per_s": _summarize(
+            [run["chunks_per_s"] for run in runs], unit="tokens_per_s"
+        ),
+    }
+    _emit("ask", params, results, output)
+
+
+@bench_app.command
+def index(
+    cortex_id: Annotated[
+        str | None, cyclopts.Parameter(name=["--cortex-id", "-i"])
+    ] = None,
+    requests: Annotated[int, cyclopts.Parameter(name=["--requests", "-n"])] = 5,
+    poll_interval: Annotated[
+        float, cyclopts.Parameter(name=["--poll-interval"])
+    ] = 0.05,
+    timeout: Annotated[float, cyclopts.Parameter(name=["--timeout"])] = 600.0,
+    stand_in: StandIn = False,
+    latency_ms: LatencyMs = 5.0,
+    index_ms: Annotated[float, cyclopts.Parameter(name=["--index-ms"])] = 200.0,
+    output: Output = None,
+):
+    """Measure index job turnaround: submit, then poll until the job finishes."""
+    params = locals().copy()
+    if not stand_in and not cortex_id:
+        raise cyclopts.CycloptsError("--cortex-id is required without --stand-in")
+
+    from ..jobs import is_job_done, job_id_from_response, job_status
+
+    turnarounds = []
+    statuses: dict[str, int] = {}
+    with _bench_client(stand_in, latency_ms=latency_ms, index_ms=index_ms) as client:
+        if stand_in and not cortex_id:
+            cortex_id = client.create_cortex("/tmp/bench", "bench")["cortex"]["id"]
+        for _ in range(requests):
+            start = time.perf_counter()
+            job = client.index_cortex(cortex_id)
+            job_id = job_id_from_response(job)
+            if job_id is None:
+                raise cyclopts.CycloptsError(f"No job id in response {job}")
+            while not is_job_done(job):
+                if time.perf_counter() - start > timeout:
+                    raise cyclopts.CycloptsError(f"Job {job_id} did not finish")
+                time.sleep(poll_interval)
+                job = client.get_job(job_id)
+            turnarounds.append((time.perf_counter() - start) * 1000)
+            statuses[job_status(job)] = statuses.get(job_status(job), 0) + 1
+
+    results = {"count": len(turnarounds), "statuses": statuses}
+    results["turnaround"] = _summarize(turnarounds)
+    _emit("index", params, results, output)
+
+
+def import_profile() -> tuple[float, set[str]]:
+    """Import the CLI in a fresh interpreter; return (total ms, modules imported)."""
+    import subprocess
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import synapso_cli.main"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total_us = 0
+    modules: set[str] = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative_us, name = line.split(":", 1)[1].split("|")
+        if not cumulative_us.strip().isdigit():
+            continue  # header line
+        modules.add(name.strip())
+        # Nesting is encoded as extra indentation; top-level entries have one
+        # leading space and their cumulative times add up to the whole import.
+        if not name.startswith("  "):
+            total_us += int(cumulative_us)
+    return total_us / 1000, modules
+
+
+@bench_app.command
+def startup(
+    runs: Annotated[int, cyclopts.Parameter(name=["--runs", "-n"])] = 10,
+    output: Output = None,
+):
+    """Measure CLI cold start: `synapso --help` wall time and import time."""
+    params = locals().copy()
+    import subprocess
+
+    wall_ms = []
+    import_ms = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-m", "synapso_cli.main", "--help"],
+            stdout=subprocess.DEVNULL,
+            check=True,
+        )
+        wall_ms.append((time.perf_counter() - start) * 1000)
+        import_ms.append(import_profile()[0])
+
+    results = {"wall": _summarize(wall_ms), "import": _summarize(import_ms)}
+    _emit("startup", params, results, output)
+
+
+@bench_app.command(name="vector-index")
+def vector_index(
+    vectors: Annotated[int, cyclopts.Parameter(name=["--vectors", "-n"])] = 4000,
+    dim: Annotated[int, cyclopts.Parameter(name=["--dim"])] = 64,
+    queries: Annotated[int, cyclopts.Parameter(name=["--queries", "-q"])] = 100,
+    top_k: Annotated[int, cyclopts.Parameter(name=["--top-k", "-k"])] = 10,
+    lists: Annotated[int, cyclopts.Parameter(name=["--lists"])] = 64,
+    probes: Annotated[
+        list[int] | None, cyclopts.Parameter(name=["--probes", "-p"])
+    ] = None,
+    seed: Annotated[int, cyclopts.Parameter(name=["--seed"])] = 0,
+    output: Output = None,
+):
+    """
+    Measure recall against latency and memory for the vector store options.
+
+    Runs on synthetic clustered embeddings, so no model or server is needed:
+    the flat index and IVF at each --probes (repeatable; default 1, 4, 16)
+    are searched at every quantization (none, int8, binary), and recall@k is
+    taken against exact search.
+    """
+    params = locals().copy()
+    if min(vectors, dim, queries, top_k, lists) < 1:
+        raise cyclopts.CycloptsError(
+            "--vectors, --dim, --queries, --top-k and --lists must be at least 1"
+        )
+    probes = probes or [1, 4, 16]
+    if any(p < 1 or p > lists for p in probes):
+        raise cyclopts.CycloptsError("--probes must be from 1 to --lists")
+
+    from ..vector_index import run_benchmark
+
+    results = run_benchmark(
+        count=vectors,
+        dim=dim,
+        queries=queries,
+        k=top_k,
+        lists=lists,
+        probes=probes,
+        seed=seed,
+    )
+    _emit("vector-index", params, results, output)
@@ -0,0 +1,44 @@
+import cyclopts
+
+cache_app = cyclopts.App()
+
+
+@cache_app.command
+def stats():
+    """Show query cache size, hit rate and pending index jobs."""
+    import sqlite3
+
+    from ..query_cache import QueryCache
+
+    try:
+        with QueryCache() as cache:
+            cache_stats = cache.stats()
+    except sqlite3.Error as e:
+        raise cyclopts.CycloptsError(f"Error reading query cache: {e}")
+    print(f"Cache:         {cache_stats['path']}")
+    print(f"Entries:       {cache_stats['entries']} / {cache_stats['max_entries']}")
+    print(
+        f"Size:          {cache_stats['size_bytes'] / 1024:.1f} KiB / "
+        f"{cache_stats['max_bytes'] / 1024 / 1024:.0f} MiB"
+    )
+    print(
+        f"Hits / misses: {cache_stats['hits']} / {cache_stats['misses']} "
+        f"({cache_stats['hit_rate']:.0%} hit rate)"
+    )
+    print(f"Evictions:     {cache_stats['evictions']}")
+    print(f"Pending index: {cache_stats['pending_index_jobs']} job(s)")
+
+
+@cache_app.command
+def clear():
+    """Remove every cached query result."""
+    import sqlite3
+
+    from ..query_cache import QueryCache
+
+    try:
+        with QueryCache() as cache:
+            removed = cache.clear()
+    except sqlite3.Error as e:
+        raise cyclopts.CycloptsError(f"Error clearing query cache: {e}")
+    print(f"Removed {removed} cached result(s).")
@@ -1,9 +1,11 @@
+import os
+from pathlib import Path
 from typing import Annotated, Any, Dict, List
 
 import cyclopts
 
-from ...rest_client import SynapsoRestClientError
-from ..server import get_rest_client
+from ...errors import SynapsoRestClientError
+from ..server import get_rest_client, heartbeat
 
 cortex_app = cyclopts.App()
 
@@ -33,18 +35,47 @@ def create(
 @cortex_app.command
 def index(
     cortex_id: Annotated[
-        str | None, cyclopts.Parameter(name=["--cortex-id", "-i"])
+        list[str] | None, cyclopts.Parameter(name=["--cortex-id", "-i"])
     ] = None,
     cortex_name: Annotated[
-        str | None, cyclopts.Parameter(name=["--cortex-name", "-n"])
+        list[str] | None, cyclopts.Parameter(name=["--cortex-name", "-n"])
     ] = None,
+    all_cortices: Annotated[bool, cyclopts.Parameter(name=["--all", "-a"])] = False,
+    concurrency: Annotated[int, cyclopts.Parameter(name=["--concurrency", "-j"])] = 4,
+    incremental: Annotated[bool, cyclopts.Parameter(name=["--incremental"])] = False,
 ):
-    """Index a cortex."""
-    if not cortex_id and not cortex_name:
+    """
+    Index one or more cortices.
+
+    Repeat -i/-n, or pass --all, to index several cortices: jobs are submitted
+    at most --concurrency at a time and followed in a live progress view, then
+    the duration and docs/sec of each cortex are reported.
+
+    With --incremental, each cortex folder is compared against the manifest
+    saved by its last successful incremental index, and only the files added,
+    changed or deleted since are sent for indexing.
+    """
+    targets: list[tuple[str | None, str | None]] = [(c, None) for c in cortex_id or []]
+    targets += [(None, n) for n in cortex_name or []]
+    if all_cortices:
+        targets = _all_cortex_targets()
+    if not targets:
         raise cyclopts.CycloptsError("Either cortex_id or cortex_name must be provided")
+    if concurrency < 1:
+        raise cyclopts.CycloptsError("Concurrency must be at least 1")
+    if incremental:
+        plans = _plan_incremental(targets)
+        if plans:
+            _index_many(list(plans), concurrency, plans)
+        return
+    if len(targets) > 1 or all_cortices:
+        _index_many(targets, concurrency)
+        return
+
+    target_id, target_name = targets[0]
     rest_client = get_rest_client()
     try:
-        response = rest_client.index_cortex(cortex_id, cortex_name)
+        response = rest_client.index_cortex(target_id, target_name)
     except SynapsoRestClientError as e:
         print(f"Synapso REST client error: {e}")
         raise cyclopts.CycloptsError(f"Synapso REST client error: {e}")
@@ -52,10 +83,258 @@ def index(
         print(f"Error: {e}")
         raise cyclopts.CycloptsError(f"Error: {e}")
     print(response)
-    identifier = cortex_id or cortex_name
+    _track_index_job(response, target_id)
+    identifier = target_id or target_name
     print(f"Cortex {identifier} indexed successfully")
 
 
+def _all_cortex_targets() -> list[tuple[str | None, str | None]]:
+    try:
+        response = get_rest_client().get_cortex_list()
+    except SynapsoRestClientError as e:
+        raise cyclopts.CycloptsError(f"Synapso REST client error: {e}")
+    return [(cortex["id"], None) for cortex in response["cortices"]]
+
+
+def _plan_incremental(
+    targets: list[tuple[str | None, str | None]],
+) -> dict[tuple[str | None, str | None], dict]:
+    """
+    Scan each target's folder and diff it against its manifest. Return a plan
+    per target that has changes: its cortex id, folder, scanned files and the
+    delta of absolute paths to submit.
+    """
+    from ...manifest import diff_manifests, is_empty_delta, load_manifest, scan_folder
+
+    rest_client = get_rest_client()
+    plans = {}
+    for cortex_id, cortex_name in targets:
+        try:
+            cortex = rest_client.get_cortex(cortex_id, cortex_name)["cortex"]
+        except SynapsoRestClientError as e:
+            print(f"Synapso REST client error: {e}")
+            raise cyclopts.CycloptsError(f"Synapso REST client error: {e}")
+        root = os.path.abspath(cortex["path"])
+        if not os.path.isdir(root):
+            raise cyclopts.CycloptsError(f"Cortex folder {root} does not exist")
+        previous = load_manifest(cortex["id"], root)
+        files = scan_folder(root, previous)
+        delta = diff_manifests(previous, files)
+        label = cortex_name or cortex["id"]
+        if is_empty_delta(delta):
+            print(f"Cortex {label} is up to date")
+            continue
+        print(
+            f"Cortex {label}: {len(delta['added'])} added, "
+            f"{len(delta['changed'])} changed, {len(delta['deleted'])} deleted"
+        )
+        plans[(cortex["id"], cortex_name)] = {
+            "cortex_id": cortex["id"],
+            "root": root,
+            "files": files,
+            "delta": {
+                kind: [os.path.join(root, path) for path in paths]
+                for kind, paths in delta.items()
+            },
+        }
+    return plans
+
+
+def _index_many(
+    targets: list[tuple[str | None, str | None]],
+    concurrency: int,
+    plans: dict[tuple[str | None, str | None], dict] | None = None,
+):
+    import asyncio
+
+    try:
+        view, failed = asyncio.run(_submit_and_follow(targets, concurrency, plans))
+    except SynapsoRestClientError as e:
+        print(f"Synapso REST client error: {e}")
+        raise cyclopts.CycloptsError(f"Synapso REST client error: {e}")
+
+    print(_format_index_summary(view))
+    for label, error in failed:
+        print(f"{label}\tnot submitted: {error}")
+    unsuccessful = len(failed) + sum(
+        1 for job in view.jobs.values() if job.get("status") != "completed"
+    )
+    if unsuccessful:
+        raise cyclopts.CycloptsError(
+            f"{unsuccessful} of {len(targets)} cortices failed to index"
+        )
+
+
+async def _submit_and_follow(
+    targets: list[tuple[str | None, str | None]],
+    concurrency: int,
+    plans: dict[tuple[str | None, str | None], dict] | None = None,
+):
+    """
+    Submit an index job per target and follow them all until they finish.
+
+    Targets with an incremental plan submit only its delta, and their
+    manifest is saved once their job completes.
+    """
+    import time
+
+    from ...async_rest_client import bounded_gather
+    from ...jobs import (
+        JOB_SUCCESS_STATUS,
+        JobProgressView,
+        job_id_from_response,
+        job_status,
+        poll_jobs,
+    )
+    from ...manifest import save_manifest
+    from ..server import get_async_rest_client
+
+    plans = plans or {}
+
+    async with get_async_rest_client(pool_size=concurrency) as client:
+
+        async def submit(target: tuple[str | None, str | None]):
+            submitted_at = time.perf_counter()
+            delta = plans[target]["delta"] if target in plans else None
+            response = await client.index_cortex(*target, delta=delta)
+            return response, submitted_at
+
+        results = await bounded_gather(
+            submit, targets, concurrency, return_exceptions=True
+        )
+        labels: dict[str, str] = {}
+        started_at: dict[str, float] = {}
+        failed: list[tuple[str, str]] = []
+        plan_for_job: dict[str, dict] = {}
+        for target, result in zip(targets, results):
+            cortex_id, cortex_name = target
+            label = cortex_name or cortex_id or ""
+            if isinstance(result, BaseException):
+                failed.append((label, str(result)))
+                continue
+            response, submitted_at = result
+            job_id = job_id_from_response(response)
+            if job_id is None:
+                failed.append((label, f"no job id in response {response}"))
+                continue
+            labels[job_id] = label
+            started_at[job_id] = submitted_at
+            if target in plans:
+                plan_for_job[job_id] = plans[target]
+            _track_index_job(response, cortex_id)
+
+        view = JobProgressView(labels, started_at=started_at)
+        jobs = await poll_jobs(client, labels, view.update, concurrency=concurrency)
+    for job_id, plan in plan_for_job.items():
+        if job_status(jobs.get(job_id, {})) == JOB_SUCCESS_STATUS:
+            save_manifest(plan["cortex_id"], plan["root"], plan["files"])
+    return view, failed
+
+
+def _format_index_summary(view) -> str:
+    from ...jobs import documents_processed, job_status
+
+    msg = "Cortex\tStatus\tDuration\tDocs\tDocs/sec\n"
+    for job_id, label in view.labels.items():
+        job = view.jobs.get(job_id, {})
+        duration = view.elapsed(job_id)
+        docs = documents_processed(job)
+        rate = f"{docs / duration:.1f}" if docs is not None and duration > 0 else "-"
+        msg += (
+            f"{label}\t{job_status(job)}\t{duration:.1f}s\t"
+            f"{docs if docs is not None else '-'}\t{rate}\n"
+        )
+    return msg
+
+
+def _track_index_job(response: Any, cortex_id: str | None):
+    """Have the query cache drop the cortex's answers once indexing finishes."""
+    import sqlite3
+
+    from ...jobs import job_id_from_response
+    from ...query_cache import QueryCache
+
+    job_id = job_id_from_response(response)
+    try:
+        with QueryCache() as cache:
+            if job_id:
+                cache.track_index_job(job_id, cortex_id)
+            else:
+                cache.invalidate(cortex_id)
+    except sqlite3.Error:
+        pass
+
+
+@cortex_app.command
+def watch(
+    cortex_id: Annotated[
+        list[str] | None, cyclopts.Parameter(name=["--cortex-id", "-i"])
+    ] = None,
+    cortex_name: Annotated[
+        list[str] | None, cyclopts.Parameter(name=["--cortex-name", "-n"])
+    ] = None,
+    all_cortices: Annotated[bool, cyclopts.Parameter(name=["--all", "-a"])] = False,
+    debounce: Annotated[float, cyclopts.Parameter(name=["--debounce"])] = 2.0,
+    max_delay: Annotated[float, cyclopts.Parameter(name=["--max-delay"])] = 30.0,
+    poll_interval: Annotated[float, cyclopts.Parameter(name=["--poll-interval"])] = 5.0,
+    metrics_file: Annotated[
+        Path | None, cyclopts.Parameter(name=["--metrics-file"])
+    ] = None,
+):
+    """
+    Watch cortex folders and keep their indexes fresh until interrupted.
+
+    Changes are batched until a folder has been quiet for --debounce seconds
+    (or for at most --max-delay seconds of continuous changes), then sent as
+    one incremental index job. Each cortex has at most one job running.
+    Folders are watched with inotify, or re-scanned every --poll-interval
+    seconds where it is unavailable. Queue depth and index lag are written as
+    JSON to --metrics-file (default: SYNAPSO_HOME/watch_metrics.json). The
+    server is not stopped as idle while the watch runs.
+    """
+    from ...watcher import METRICS_PATH, WatchDaemon, WatchedCortex, open_watcher
+
+    targets = [(c, None) for c in cortex_id or []]
+    targets += [(None, n) for n in cortex_name or []]
+    if all_cortices:
+        targets = _all_cortex_targets()
+    if not targets:
+        raise cyclopts.CycloptsError("Either cortex_id or cortex_name must be provided")
+    if debounce < 0 or max_delay < debounce:
+        raise cyclopts.CycloptsError("--max-delay must be at least --debounce")
+
+    rest_client = get_rest_client()
+    cortices = []
+    for target_id, target_name in targets:
+        try:
+            cortex = rest_client.get_cortex(target_id, target_name)["cortex"]
+        except SynapsoRestClientError as e:
+            print(f"Synapso REST client error: {e}")
+            raise cyclopts.CycloptsError(f"Synapso REST client error: {e}")
+        root = os.path.abspath(cortex["path"])
+        if not os.path.isdir(root):
+            raise cyclopts.CycloptsError(f"Cortex folder {root} does not exist")
+        watcher = open_watcher(root, poll_interval)
+        label = target_name or cortex["id"]
+        print(f"Watching {label} at {root} ({watcher.backend})")
+        cortices.append(WatchedCortex(cortex["id"], label, root, watcher))
+
+    daemon = WatchDaemon(
+        rest_client,
+        cortices,
+        debounce=debounce,
+        max_delay=max_delay,
+        metrics_path=metrics_file or METRICS_PATH,
+        on_submit=_track_index_job,
+        log=lambda line: print(line, flush=True),
+        keepalive=heartbeat,
+    )
+    try:
+        daemon.run()
+    except KeyboardInterrupt:
+        print("Stopped watching")
+
+
 @cortex_app.command(name="list")
 def cmd_cortex_list():
     rest_client = get_rest_client()
@@ -0,0 +1,186 @@
+from pathlib import Path
+from typing import Annotated
+
+import cyclopts
+
+from ..errors import SynapsoHTTPError, SynapsoRestClientError
+
+db_app = cyclopts.App()
+
+
+def _load_stores():
+    from ..config import get_config
+    from ..db_maintenance import store_paths
+
+    config = get_config()
+    paths = {name: path for name, path in store_paths(config).items() if path.exists()}
+    if not paths:
+        print("No stores found. Run `synapso init` first.")
+        raise cyclopts.CycloptsError("No stores found")
+    return config.sqlite, paths
+
+
+def _format_size(size: int) -> str:
+    return f"{size / 2**20:.1f} MiB"
+
+
+def _format_bench(result: dict) -> str:
+    return (
+        f"scan {result['rows']} rows in {result['scan_ms']:.1f} ms, "
+        f"{result['lookups']} lookups p50 {result['lookup_p50_ms']:.3f} ms "
+        f"p95 {result['lookup_p95_ms']:.3f} ms"
+    )
+
+
+@db_app.command
+def stats():
+    """Show size, page usage and fragmentation of each SQLite store."""
+    import sqlite3
+
+    from ..db_maintenance import store_stats
+
+    _, paths = _load_stores()
+    print(
+        f"{'store':<8} {'size':>11} {'wal':>11} {'page':>6} {'pages':>9} "
+        f"{'free':>8} {'frag':>6}  journal"
+    )
+    for name, path in paths.items():
+        try:
+            s = store_stats(path)
+        except sqlite3.Error as e:
+            raise cyclopts.CycloptsError(f"Error reading {path}: {e}")
+        print(
+            f"{name:<8} {_format_size(s['size_bytes']):>11} "
+            f"{_format_size(s['wal_bytes']):>11} {s['page_size']:>6} "
+            f"{s['page_count']:>9} {s['freelist_count']:>8} "
+            f"{s['fragmentation']:>6.1%}  {s['journal_mode']}"
+        )
+
+
+@db_app.command
+def bench(
+    lookups: Annotated[int, cyclopts.Parameter(name=["--lookups", "-n"])] = 500,
+):
+    """Time a read workload (full scans and point lookups) on each store."""
+    import sqlite3
+
+    from ..db_maintenance import read_benchmark
+
+    tuning, paths = _load_stores()
+    for name, path in paths.items():
+        try:
+            print(f"{name:<8} {_format_bench(read_benchmark(path, tuning, lookups))}")
+        except sqlite3.Error as e:
+            raise cyclopts.CycloptsError(f"Error reading {path}: {e}")
+
+
+@db_app.command
+def optimize(
+    vacuum: Annotated[bool, cyclopts.Parameter(name=["--vacuum"])] = True,
+    bench: Annotated[bool, cyclopts.Parameter(name=["--bench", "-b"])] = False,
+):
+    """
+    Check, compact and tune every SQLite store.
+
+    Runs quick_check, VACUUM (skip with --no-vacuum), ANALYZE and PRAGMA
+    optimize, and applies the `sqlite` settings from the config: journal
+    mode and page size are stored in the files, mmap and cache size are used
+    per connection. The server is stopped for the duration and started again
+    afterwards. With --bench, a read workload is timed before and after.
+    """
+    from .server import ensure_server, stop_idle_server
+
+    tuning, paths = _load_stores()
+    restart = stop_idle_server("optimize the stores")
+    try:
+        for name, path in paths.items():
+            _optimize_one(name, path, tuning, vacuum, bench)
+    finally:
+        if restart:
+            ensure_server()
+
+
+def _optimize_one(name: str, path: Path, tuning, vacuum: bool, bench: bool):
+    import sqlite3
+
+    from ..db_maintenance import optimize_store, read_benchmark, store_stats
+
+    try:
+        before = store_stats(path)
+        before_bench = read_benchmark(path, tuning) if bench else None
+        steps = optimize_store(path, tuning, vacuum=vacuum)
+        after = store_stats(path)
+        after_bench = read_benchmark(path, tuning) if bench else None
+    except sqlite3.Error as e:
+        print(f"Error optimizing {path}: {e}")
+        raise cyclopts.CycloptsError(f"Error optimizing {path}: {e}")
+
+    print(f"{name}: {', '.join(steps)}")
+    print(
+        f"  size {_format_size(before['size_bytes'] + before['wal_bytes'])} -> "
+        f"{_format_size(after['size_bytes'] + after['wal_bytes'])}, "
+        f"fragmentation {before['fragmentation']:.1%} -> "
+        f"{after['fragmentation']:.1%}"
+    )
+    if before_bench is not None and after_bench is not None:
+        print(f"  before: {_format_bench(before_bench)}")
+        print(f"  after:  {_format_bench(after_bench)}")
+
+
+@db_app.command(name="rebuild-index")
+def rebuild_index():
+    """
+    Rebuild the vector index with the `vector_store` settings of the config.
+
+    Run it after changing index_type, quantization or the IVF parameters.
+    The server rebuilds in a job, which is followed until it finishes; cached
+    query results are dropped once it has. `synapso bench vector-index`
+    shows the recall and latency each setting trades. Needs a server that
+    provides POST /vector/rebuild_index (the bench stand-in does).
+    """
+    import asyncio
+
+    from ..config import get_config
+    from ..jobs import JOB_SUCCESS_STATUS, job_status
+
+    store = get_config().vector_store
+    print(f"Rebuilding the vector index: {store.describe_index()}")
+    job = asyncio.run(_rebuild_and_follow(store.index_settings()))
+    if job_status(job) != JOB_SUCCESS_STATUS:
+        message = f"Index rebuild {job_status(job)}"
+        if job.get("error"):
+            message += f": {job['error']}"
+        print(message)
+        raise cyclopts.CycloptsError(message)
+    print("Vector index rebuilt.")
+
+
+async def _rebuild_and_follow(settings: dict) -> dict:
+    import sqlite3
+
+    from ..jobs import JobProgressView, job_id_from_response, poll_jobs
+    from ..query_cache import QueryCache
+    from .server import get_async_rest_client
+
+    async with get_async_rest_client() as client:
+        try:
+            response = await client.rebuild_vector_index(settings)
+        except SynapsoRestClientError as e:
+            if isinstance(e, SynapsoHTTPError) and e.status_code in (404, 405):
+                message = "This server does not support rebuilding the vector index"
+            else:
+                message = f"Error rebuilding the vector index: {e}"
+            print(message)
+            raise cyclopts.CycloptsError(message)
+        job_id = job_id_from_response(response)
+        if job_id is None:
+            raise cyclopts.CycloptsError(f"No job id in response {response}")
+        # Answers change with the index; drop them all once it is rebuilt.
+        try:
+            with QueryCache() as cache:
+                cache.track_index_job(job_id, None)
+        except sqlite3.Error:
+            pass
+        view = JobProgressView({job_id: "vector index"})
+        jobs = await poll_jobs(client, [job_id], view.update)
+    return jobs.get(job_id, {})
@@ -7,8 +7,9 @@ import typer
 import yaml
 
 from ..config import GlobalConfig, get_config
-from ..rest_client import SynapsoRestClientError
-from .server import get_rest_client, is_server_running
+from ..errors import SynapsoRestClientError
+from ..paths import synapso_home
+from .server import get_rest_client, is_server_running, prewarm_server
 from .server import restart as restart_server
 
 
@@ -55,7 +56,7 @@ def set_environment_variable_system_wide(var_name: str, var_value: str):
     )
 
 
-def init_synapso(force_db_reset: bool = False):
+def init_synapso(force_db_reset: bool = False, warm: bool = True):
     """
     Initialize a new Synapso project.
 
@@ -94,27 +95,36 @@ def init_synapso(force_db_reset: bool = False):
             yaml.dump(default_config, f, default_flow_style=False)
         typer.echo(f"Config file created at {config_path}")
 
+    try:
+        config = get_config(str(config_path))
+    except ValueError as e:
+        typer.echo(f"Invalid config {config_path}: {e}", err=True)
+        raise typer.Exit(1) from e
+    store = config.vector_store
+    typer.echo(f"Vector store: {store.vector_db_type}, {store.describe_index()}")
+
     if force_db_reset:
         # Remove db files
         _remove_db_files(config_path)
         if is_server_running():
-            restart_server()
+            restart_server(warm=False)
 
-    # Start the server
+    # Start the server. The warm-up queries only reach the models once system
+    # init has created the stores, so `warm` applies after that.
     typer.echo("Starting server...")
-    restart_server()
+    restart_server(warm=False)
     typer.echo("Server started.")
 
     _initialize()
+    if warm:
+        prewarm_server()
 
 
 def _remove_db_files(config_path: Path):
     config: GlobalConfig = get_config(str(config_path))
 
     # Validate that paths are within the SYNAPSO_HOME
-    synapso_home = (
-        Path(os.getenv("SYNAPSO_HOME", Path.home() / ".synapso")).expanduser().resolve()
-    )
+    home = synapso_home().resolve()
 
     meta_store_path = Path(config.meta_store.meta_db_path).expanduser().resolve()
     vector_store_path = Path(config.vector_store.vector_db_path).expanduser().resolve()
@@ -123,10 +133,8 @@ def _remove_db_files(config_path: Path):
     )
 
     for path in [meta_store_path, vector_store_path, private_store_path]:
-        if not str(path).startswith(str(synapso_home)):
-            typer.echo(
-                f"Path {path} is not within SYNAPSO_HOME {synapso_home}", err=True
-            )
+        if not str(path).startswith(str(home)):
+            typer.echo(f"Path {path} is not within SYNAPSO_HOME {home}", err=True)
             raise typer.Exit(1)
 
     if meta_store_path.exists():
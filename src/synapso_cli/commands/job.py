@@ -1,10 +1,18 @@
 import json
-from typing import Any, Dict
+from typing import Annotated, Any, Dict
 
 import cyclopts
 
-from ..rest_client import SynapsoRestClientError
-from .server import get_rest_client
+from ..errors import SynapsoRestClientError
+from ..jobs import (
+    DEFAULT_MAX_POLL_INTERVAL,
+    JOB_SUCCESS_STATUS,
+    JobProgressView,
+    is_job_done,
+    job_status,
+    poll_jobs,
+)
+from .server import get_async_rest_client, get_rest_client
 
 job_app = cyclopts.App()
 
@@ -20,6 +28,7 @@ def list():
     except Exception as e:
         print(f"Error: {e}")
         raise cyclopts.CycloptsError(f"Error: {e}")
+    print(_format_job_list(response))
 
 
 def _format_job_list(job_list_response: Dict[str, Any]) -> str:
@@ -37,3 +46,64 @@ def status(job_id: str):
     except Exception as e:
         print(f"Error: {e}")
         raise cyclopts.CycloptsError(f"Error: {e}")
+    print(_format_job(response))
+
+
+def _format_job(job_response: Dict[str, Any]) -> str:
+    return json.dumps(job_response, indent=2)
+
+
+@job_app.command(name="watch")
+def watch(
+    job_id: str | None = None,
+    all_jobs: Annotated[bool, cyclopts.Parameter(name=["--all", "-a"])] = False,
+    max_interval: Annotated[
+        float, cyclopts.Parameter(name=["--max-interval"])
+    ] = DEFAULT_MAX_POLL_INTERVAL,
+):
+    """
+    Follow a job, or with --all every unfinished job, until it finishes.
+
+    A line is printed only when a job's state or progress changes, and the
+    command fails unless every watched job completed.
+    """
+    if not job_id and not all_jobs:
+        raise cyclopts.CycloptsError("Either a job id or --all must be provided")
+    import asyncio
+
+    try:
+        jobs = asyncio.run(_watch_jobs(job_id, max_interval))
+    except SynapsoRestClientError as e:
+        print(f"Synapso REST client error: {e}")
+        raise cyclopts.CycloptsError(f"Synapso REST client error: {e}")
+    if not jobs:
+        print("No running jobs")
+        return
+    failed = {
+        job_id: job_status(job)
+        for job_id, job in jobs.items()
+        if job_status(job) != JOB_SUCCESS_STATUS
+    }
+    if failed:
+        summary = ", ".join(f"{job_id} {status}" for job_id, status in failed.items())
+        raise cyclopts.CycloptsError(f"Job(s) did not complete: {summary}")
+
+
+async def _watch_jobs(job_id: str | None, max_interval: float) -> dict[str, dict]:
+    # One connection: watching is cheap and should stay cheap for the server.
+    async with get_async_rest_client(pool_size=1) as client:
+        if job_id:
+            job_ids = [job_id]
+        else:
+            response = await client.get_job_list()
+            job_ids = [
+                job["job_id"]
+                for job in response.get("jobs", [])
+                if job and not is_job_done(job)
+            ]
+        if not job_ids:
+            return {}
+        view = JobProgressView({job_id: job_id for job_id in job_ids})
+        return await poll_jobs(
+            client, job_ids, view.update, max_interval=max_interval, concurrency=1
+        )
@@ -1,14 +1,178 @@
+import asyncio
+import json
+import sqlite3
+import sys
+import time
+from contextlib import nullcontext
+from typing import Any, TextIO
+
 import typer
 
-from ..rest_client import SynapsoRestClientError
-from .server import get_rest_client
+from ..errors import SynapsoRestClientError
+from ..metrics import summarize_latencies
+from ..query_cache import QueryCache
+from ..streaming import format_stream_stats, render_stream
+from .server import get_async_rest_client, get_rest_client
 
 
-def cmd_query(query: str):
-    """Execute a query against a cortex."""
-    rest_client = get_rest_client()
+def _open_cache(use_cache: bool) -> QueryCache | None:
+    """
+    Open the result cache, or return None if it is disabled or unusable.
+
+    While an index job submitted through the CLI is still running, answers
+    are about to change, so the cache is bypassed until it completes.
+    """
+    if not use_cache:
+        return None
+    cache = QueryCache()
+    try:
+        if cache.has_pending_index_jobs() and cache.refresh_index_jobs(
+            get_rest_client().get_job
+        ):
+            cache.close()
+            return None
+    except sqlite3.Error as e:
+        typer.echo(f"Query cache unavailable: {e}", err=True)
+        cache.close()
+        return None
+    return cache
+
+
+def _cache_get(cache: QueryCache | None, kind: str, query: str, cortex_id: str | None):
+    if cache is None:
+        return None
+    try:
+        return cache.get(kind, query, cortex_id)
+    except sqlite3.Error:
+        return None
+
+
+def _cache_put(
+    cache: QueryCache | None, kind: str, query: str, value, cortex_id: str | None
+):
+    if cache is None:
+        return
     try:
-        response = rest_client.query(query)
+        cache.put(kind, query, value, cortex_id)
+    except sqlite3.Error:
+        pass
+
+
+def _resolve_cortex_ids(
+    cortex_ids: list[str] | None, all_cortices: bool
+) -> list[str] | None:
+    """Return the cortices to query, or None to let the server use its default."""
+    if not all_cortices:
+        return list(dict.fromkeys(cortex_ids)) if cortex_ids else None
+    try:
+        cortices = get_rest_client().get_cortex_list()["cortices"]
+    except SynapsoRestClientError as e:
+        typer.echo(f"Synapso REST client error: {e}", err=True)
+        raise typer.Exit(1) from e
+    if not cortices:
+        typer.echo("No cortexes found", err=True)
+        raise typer.Exit(1)
+    return [cortex["id"] for cortex in cortices]
+
+
+def _cache_scope(cortex_ids: list[str] | None) -> str | None:
+    return ",".join(sorted(cortex_ids)) if cortex_ids else None
+
+
+def _ranked(response: Any) -> list | None:
+    """The scored results of a query response, or None if it has none."""
+    if isinstance(response, dict) and isinstance(response.get("results"), list):
+        return response["results"]
+    return None
+
+
+def limit_results(response: Any, top_k: int) -> Any:
+    """Keep the `top_k` best results of a single query response."""
+    results = _ranked(response)
+    if results is None:
+        return response
+    return {**response, "results": results[:top_k]}
+
+
+def merge_ranked_results(responses: dict[str, Any], top_k: int) -> dict[str, Any]:
+    """
+    Merge per-cortex query responses into one ranking by score.
+
+    Every result is tagged with the cortex it came from; the `top_k` highest
+    scores across all cortices are kept. Responses without scored "results"
+    (a server that only returns its generated answer) have nothing to rank
+    and are kept whole under "responses". Failed cortices (exceptions) are
+    reported under "errors".
+    """
+    merged = []
+    answers = {}
+    errors = {}
+    for cortex_id, response in responses.items():
+        if isinstance(response, Exception):
+            errors[cortex_id] = str(response)
+            continue
+        results = _ranked(response)
+        if results is None:
+            answers[cortex_id] = response
+            continue
+        for result in results:
+            if isinstance(result, dict):
+                merged.append({**result, "cortex_id": cortex_id})
+    merged.sort(key=_score, reverse=True)
+    return {
+        "results": merged[:top_k],
+        **({"responses": answers} if answers else {}),
+        "cortex_ids": [c for c in responses if c not in errors],
+        "errors": errors,
+    }
+
+
+def _score(result: dict) -> float:
+    score = result.get("score")
+    return score if isinstance(score, (int, float)) else float("-inf")
+
+
+async def _query_cortices(query: str, cortex_ids: list[str]) -> list[Any]:
+    async with get_async_rest_client(pool_size=len(cortex_ids)) as client:
+        return await client.query_cortices(
+            query, cortex_ids, concurrency=len(cortex_ids), return_exceptions=True
+        )
+
+
+def cmd_query(
+    query: str,
+    cortex_ids: list[str] | None = None,
+    all_cortices: bool = False,
+    top_k: int = 10,
+    use_cache: bool = True,
+):
+    """
+    Execute a query against one or more cortices.
+
+    Several cortices are queried concurrently and their results merged by
+    score, so the wait is bounded by the slowest cortex.
+    """
+    cortex_ids = _resolve_cortex_ids(cortex_ids, all_cortices)
+    scope = _cache_scope(cortex_ids)
+    # Results cut at another top_k are a different answer.
+    kind = f"query:top_k={top_k}"
+    cache = _open_cache(use_cache)
+    cached = _cache_get(cache, kind, query, scope)
+    if cached is not None:
+        typer.echo(cached)
+        return
+
+    try:
+        if cortex_ids and len(cortex_ids) > 1:
+            responses = asyncio.run(_query_cortices(query, cortex_ids))
+            response = merge_ranked_results(dict(zip(cortex_ids, responses)), top_k)
+            if not response["cortex_ids"]:
+                raise SynapsoRestClientError(
+                    "; ".join(f"{c}: {e}" for c, e in response["errors"].items())
+                )
+        else:
+            cortex_id = cortex_ids[0] if cortex_ids else None
+            response = limit_results(get_rest_client().query(query, cortex_id), top_k)
         typer.echo(response)
     except SynapsoRestClientError as e:
         typer.echo(f"Synapso REST client error: {e}", err=True)
@@ -16,17 +180,153 @@ def cmd_query(query: str):
     except Exception as e:
         typer.echo(f"Error: {e}", err=True)
         raise typer.Exit(1) from e
+    # A partial merge is not worth replaying.
+    if not (isinstance(response, dict) and response.get("errors")):
+        _cache_put(cache, kind, query, response, scope)
+
 
+def cmd_query_stream(
+    query: str,
+    show_stats: bool = False,
+    cortex_ids: list[str] | None = None,
+    all_cortices: bool = False,
+    use_cache: bool = True,
+):
+    """Execute a query against one or more cortices and stream the answer."""
+    cortex_ids = _resolve_cortex_ids(cortex_ids, all_cortices)
+    scope = _cache_scope(cortex_ids)
+    cache = _open_cache(use_cache)
+    cached = _cache_get(cache, "ask", query, scope)
+    if cached is not None:
+        # Replay through the same renderer so pipes and --stats behave alike.
+        stats = render_stream([cached])
+        if show_stats:
+            typer.echo("\n" + format_stream_stats(stats) + " (cached)", err=True)
+        return
+
+    parts: list[str] = []
+    complete = False
+
+    def record(chunks):
+        nonlocal complete
+        for chunk in chunks:
+            parts.append(chunk)
+            yield chunk
+        complete = True
 
-def cmd_query_stream(query: str):
-    """Execute a query against a cortex and stream the results."""
     rest_client = get_rest_client()
     try:
-        for chunk in rest_client.query_stream(query):
-            typer.echo(chunk, nl=False)
+        stats = render_stream(record(rest_client.query_stream(query, cortex_ids)))
     except SynapsoRestClientError as e:
         typer.echo(f"Synapso REST client error: {e}", err=True)
         raise typer.Exit(1) from e
     except Exception as e:
         typer.echo(f"Error: {e}", err=True)
         raise typer.Exit(1) from e
+    if complete:
+        _cache_put(cache, "ask", query, "".join(parts), scope)
+    if show_stats:
+        typer.echo("\n" + format_stream_stats(stats), err=True)
+
+
+def _read_batch_queries(input_path: str) -> list[dict[str, Any]]:
+    """Read queries, one per line, as plain text or JSONL objects with a "query"."""
+    queries = []
+    record: dict[str, Any]
+    with (
+        nullcontext(sys.stdin)
+        if input_path == "-"
+        else open(input_path, encoding="utf-8")
+    ) as stream:
+        for line_no, line in enumerate(stream, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("{"):
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"Line {line_no}: invalid JSON: {e}") from e
+                if not isinstance(record.get("query"), str):
+                    raise ValueError(f"Line {line_no}: missing 'query' field")
+            else:
+                record = {"query": line}
+            record.setdefault("id", len(queries))
+            queries.append(record)
+    return queries
+
+
+async def _run_query_batch(
+    queries: list[dict[str, Any]], output: TextIO, concurrency: int
+) -> tuple[list[float], int]:
+    latencies: list[float] = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with get_async_rest_client(pool_size=concurrency) as client:
+
+        async def run(record: dict[str, Any]) -> dict[str, Any]:
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    response = await client.query(record["query"])
+                    result = {"response": response}
+                except SynapsoRestClientError as e:
+                    result = {"error": str(e)}
+                latency = time.perf_counter() - start
+            return {
+                "id": record["id"],
+                "query": record["query"],
+                "latency_ms": round(latency * 1000, 3),
+                **result,
+            }
+
+        tasks = [asyncio.ensure_future(run(record)) for record in queries]
+        for task in asyncio.as_completed(tasks):
+            result = await task
+            if "error" in result:
+                errors += 1
+            else:
+                latencies.append(result["latency_ms"] / 1000)
+            output.write(json.dumps(result) + "\n")
+            output.flush()
+    return latencies, errors
+
+
+def cmd_query_batch(
+    input_path: str = "-", output_path: str | None = None, concurrency: int = 8
+):
+    """Execute many queries concurrently and write the results as NDJSON."""
+    if concurrency < 1:
+        typer.echo("Concurrency must be at least 1", err=True)
+        raise typer.Exit(1)
+    try:
+        queries = _read_batch_queries(input_path)
+    except (OSError, ValueError) as e:
+        typer.echo(f"Error reading queries: {e}", err=True)
+        raise typer.Exit(1) from e
+    if not queries:
+        typer.echo("No queries to run", err=True)
+        return
+
+    start = time.perf_counter()
+    try:
+        with (
+            nullcontext(sys.stdout) if output_path is None else open(output_path, "w")
+        ) as output:
+            latencies, errors = asyncio.run(
+                _run_query_batch(queries, output, concurrency)
+            )
+    except Exception as e:
+        typer.echo(f"Error: {e}", err=True)
+        raise typer.Exit(1) from e
+    summary = summarize_latencies(latencies, time.perf_counter() - start)
+
+    typer.echo(
+        f"{len(queries)} queries ({errors} failed) in {summary['elapsed_s']:.2f}s: "
+        f"{summary['qps']:.1f} QPS, p50 {summary['p50_ms']:.1f} ms, "
+        f"p95 {summary['p95_ms']:.1f} ms, p99 {summary['p99_ms']:.1f} ms",
+        err=True,
+    )
+    if errors:
+        raise typer.Exit(1)
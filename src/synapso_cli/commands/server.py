@@ -1,22 +1,122 @@
 import json
+import os
+import signal
 import socket
 import subprocess
+import sys
 import time
 from pathlib import Path
+from typing import TYPE_CHECKING, Annotated
 
 import cyclopts
-import psutil
-import requests
 
-from ..rest_client import SynapsoRestClient
+from ..paths import synapso_home
+
+# The HTTP clients, psutil and the config models are imported where they are
+# used so that `synapso --help` and friends don't pay for them at startup.
+if TYPE_CHECKING:
+    import psutil
+
+    from ..async_rest_client import AsyncSynapsoRestClient
+    from ..config import ServerConfig
+    from ..policy import RequestPolicy
+    from ..rest_client import SynapsoRestClient
 
 server_app = cyclopts.App()
 
-CONFIG_PATH = Path.home() / ".synapso" / "api.conf"
-CONFIG_PATH.parent.mkdir(parents=True, exist_ok=True)
+CONFIG_PATH = synapso_home() / "api.conf"
+SERVER_LOG_PATH = synapso_home() / "server.log"
+# Touched whenever the CLI sends the server a request (at most once every
+# HEARTBEAT_INTERVAL); the supervisor stops the server once it goes stale.
+HEARTBEAT_PATH = synapso_home() / "api.heartbeat"
+HEARTBEAT_INTERVAL = 10.0
+
+# How long a successful HTTP health check is trusted. Within this window a
+# live PID and a listening socket are taken as proof that the server is up.
+HEALTH_CHECK_TTL = 30.0
+PORT_CHECK_TIMEOUT = 0.2
+
+# uvicorn logs this once its socket is bound; the launcher follows server.log
+# for it rather than polling the health endpoint blind.
+READY_LOG_MARKER = "Uvicorn running on"
+LOG_POLL_INTERVAL = 0.02
+SERVER_LOG_TAIL_LINES = 20
+
+# The server listens here when started with `--transport uds`.
+SOCKET_PATH = synapso_home() / "api.sock"
+# Requests over the socket still need a Host header.
+UDS_BASE_URL = "http://synapso"
+
+# One pooled client per server address, shared by the health checks and the
+# commands so a single CLI invocation reuses one warm connection.
+_rest_clients: dict[str, "SynapsoRestClient"] = {}
+_last_heartbeat = 0.0
+
+
+def heartbeat():
+    """Record that the CLI is using the server, so it isn't stopped as idle."""
+    global _last_heartbeat
+    now = time.monotonic()
+    if now - _last_heartbeat < HEARTBEAT_INTERVAL:
+        return
+    _last_heartbeat = now
+    try:
+        HEARTBEAT_PATH.touch()
+    except OSError:
+        pass
+
+
+def _address(config: dict) -> str:
+    if config.get("transport") == "uds":
+        return config["socket_path"]
+    return f"127.0.0.1:{config['port']}"
+
+
+def _describe_address(config: dict) -> str:
+    if config.get("transport") == "uds":
+        return f"unix socket {config['socket_path']}"
+    return f"port {config['port']}"
+
+
+def _client_kwargs(config: dict) -> dict:
+    if config.get("transport") == "uds":
+        return {"base_url": UDS_BASE_URL, "socket_path": config["socket_path"]}
+    return {"base_url": f"http://127.0.0.1:{config['port']}"}
+
+
+def _new_policy() -> "RequestPolicy":
+    from ..policy import RequestPolicy, hedge_after_from_env
+
+    return RequestPolicy(hedge_after=hedge_after_from_env())
+
+
+def _restart_on_circuit_open(
+    client: "SynapsoRestClient | AsyncSynapsoRestClient",
+) -> None:
+    client.policy.on_circuit_open = lambda: _restart_unresponsive_server(client)
+
 
-SERVER_LOG_PATH = Path.home() / ".synapso" / "server.log"
-SERVER_LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
+def _client_for(config: dict) -> "SynapsoRestClient":
+    address = _address(config)
+    client = _rest_clients.get(address)
+    if client is None:
+        from ..rest_client import SynapsoRestClient
+
+        client = SynapsoRestClient(
+            **_client_kwargs(config),
+            on_connection_error=_invalidate_health_check,
+            policy=_new_policy(),
+            on_request=heartbeat,
+        )
+        _restart_on_circuit_open(client)
+        _rest_clients[address] = client
+    return client
+
+
+def _close_client(config: dict):
+    client = _rest_clients.pop(_address(config), None)
+    if client is not None:
+        client.close()
 
 
 def get_rest_client():
@@ -25,7 +125,25 @@ def get_rest_client():
     server_config = get_server_config()
     if not server_config:
         raise cyclopts.CycloptsError("Server is not running")
-    return SynapsoRestClient(f"http://127.0.0.1:{server_config['port']}")
+    return _client_for(server_config)
+
+
+def get_async_rest_client(**kwargs) -> "AsyncSynapsoRestClient":
+    """Get an asyncio rest client for the server."""
+    from ..async_rest_client import AsyncSynapsoRestClient
+
+    ensure_server()
+    server_config = get_server_config()
+    if not server_config:
+        raise cyclopts.CycloptsError("Server is not running")
+    client = AsyncSynapsoRestClient(
+        **_client_kwargs(server_config),
+        on_request=heartbeat,
+        policy=_new_policy(),
+        **kwargs,
+    )
+    _restart_on_circuit_open(client)
+    return client
 
 
 def get_available_port(preferred_port=50000):
@@ -39,89 +157,357 @@ def get_available_port(preferred_port=50000):
             return s.getsockname()[1]
 
 
-def launch_server(preferred_port=50000, timeout=300):
-    """Launch the server."""
-    port = get_available_port(preferred_port)
+def _load_server_settings() -> "ServerConfig":
+    """Return the `server` section of config.yaml, or the defaults if there is none."""
+    from ..config import ServerConfig, get_config
+
+    try:
+        return get_config().server
+    except FileNotFoundError:
+        return ServerConfig()
+
+
+def launch_server(
+    preferred_port=50000,
+    timeout=300,
+    settings: "ServerConfig | None" = None,
+    warm: bool | None = None,
+):
+    """
+    Launch the server. With `warm` (default: the `server.warm` setting), the
+    models are loaded by the warm-up queries before this returns.
+    """
+    if settings is None:
+        settings = _load_server_settings()
+
+    if settings.transport == "uds" and hasattr(socket, "AF_UNIX"):
+        SOCKET_PATH.parent.mkdir(parents=True, exist_ok=True)
+        # A socket file left behind by a dead server would make the bind fail.
+        SOCKET_PATH.unlink(missing_ok=True)
+        address = {"transport": "uds", "socket_path": str(SOCKET_PATH)}
+        bind_args = ["--uds", str(SOCKET_PATH)]
+    else:
+        port = get_available_port(preferred_port)
+        address = {"transport": "tcp", "port": port}
+        bind_args = ["--host", "127.0.0.1", "--port", str(port)]
 
+    SERVER_LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
     log_file = SERVER_LOG_PATH.open("w")
+    start_time = time.perf_counter()
     try:
         process = subprocess.Popen(
             [
                 "uvicorn",
                 "synapso_api.main:synapso_api",
-                "--host",
-                "127.0.0.1",
-                "--port",
-                str(port),
+                *bind_args,
+                "--workers",
+                str(settings.effective_workers),
+                "--loop",
+                settings.loop,
+                "--http",
+                settings.http,
+                "--backlog",
+                str(settings.backlog),
             ],
             stdout=log_file,
             stderr=subprocess.STDOUT,
+            # Own process group, so the supervisor and its workers can be
+            # signalled together and don't get the terminal's Ctrl-C.
+            start_new_session=True,
         )
     except FileNotFoundError as e:
-        log_file.close()
         raise RuntimeError(
             "uvicorn is not installed. Please install it with 'pip install uvicorn'"
         ) from e
     except Exception as e:
         raise RuntimeError(f"Failed to launch server: {e}") from e
+    finally:
+        # The child holds its own handle; we only need to read the log back.
+        log_file.close()
 
-    # Wait for healthcheck
-    url = f"http://127.0.0.1:{port}/"
-    start_time = time.time()
-    while time.time() - start_time < timeout:
-        try:
-            response = requests.get(url, timeout=1)
-            if (
-                response.status_code == 200
-                and response.json().get("message") == "Synapso API is running"
-            ):
-                # Success — write config
-                config = {"pid": process.pid, "port": port}
-                CONFIG_PATH.write_text(json.dumps(config))
-                return config
-        except requests.RequestException:
+    try:
+        ready_at = _wait_for_ready(process, address, start_time + timeout)
+    except TimeoutError:
+        _signal_group(process.pid, signal.SIGKILL)
+        _close_client(address)
+        raise RuntimeError(
+            f"Server failed to start within {timeout} seconds." + _format_log_tail()
+        ) from None
+    except ChildProcessError:
+        _close_client(address)
+        raise RuntimeError(
+            f"Server exited during startup with code {process.returncode}."
+            + _format_log_tail()
+        ) from None
+
+    config = {
+        "pid": process.pid,
+        "pgid": process.pid,
+        **address,
+        "worker_pids": _worker_pids(process.pid),
+        "checked_at": time.time(),
+        "startup_s": round(ready_at - start_time, 3),
+        "sampler_pid": _start_sampler(process.pid, settings),
+    }
+    _write_server_config(config)
+    if settings.warm if warm is None else warm:
+        config["warmup"] = _prewarm(config, settings)
+        _write_server_config(config)
+    return config
+
+
+def _prewarm(config: dict, settings: "ServerConfig") -> dict:
+    """
+    Run the warm-up queries against a freshly started server, so that the
+    vectorizer, reranker and summarizer are loaded now rather than by the
+    first real query. Each worker loads its own models, so every query is
+    sent as many times as there are workers, concurrently. Which worker
+    serves a request is up to the server, so with several workers this makes
+    it likely, not certain, that each is warmed. Return the latency of the
+    first (cold) round, of the same query once warm, and the total time.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    from ..errors import SynapsoRestClientError
+
+    client = _client_for(config)
+    workers = settings.effective_workers
+    queries = settings.warmup_queries
+
+    def timed_query(query: str) -> float:
+        start = time.perf_counter()
+        client.query(query)
+        return (time.perf_counter() - start) * 1000
+
+    def drain_stream(query: str):
+        for _ in client.query_stream(query):
             pass
-        time.sleep(0.3)
 
-    # Timed out — kill process
-    process.kill()
-    raise RuntimeError(f"Server failed to start within {timeout} seconds.") from None
+    started = time.perf_counter()
+    warmup = {"queries": len(queries), "cold_ms": None, "warm_ms": None}
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for i, query in enumerate(queries):
+                latencies = list(pool.map(timed_query, [query] * workers))
+                if i == 0:
+                    warmup["cold_ms"] = round(max(latencies), 1)
+            # Streaming answers also load the summarizer.
+            if queries:
+                list(pool.map(drain_stream, queries[:1] * workers))
+        if queries:
+            warmup["warm_ms"] = round(timed_query(queries[0]), 1)
+    except SynapsoRestClientError as e:
+        print(f"Warm-up stopped early: {e}", file=sys.stderr)
+    warmup["total_s"] = round(time.perf_counter() - started, 3)
+    return warmup
+
+
+def _format_warmup(warmup: dict) -> str:
+    msg = f"Warmed up in {warmup['total_s']:.2f} s"
+    if warmup.get("cold_ms") is not None and warmup.get("warm_ms") is not None:
+        msg += (
+            f": first query {warmup['cold_ms']:.0f} ms cold, "
+            f"{warmup['warm_ms']:.0f} ms warm"
+        )
+    return msg
 
 
-def is_server_running():
-    """Check if the server is running."""
-    if not CONFIG_PATH.exists():
+def prewarm_server():
+    """Warm up the running server and record how long it took."""
+    config = get_server_config()
+    if not config:
+        raise cyclopts.CycloptsError("Server is not running")
+    config["warmup"] = _prewarm(config, _load_server_settings())
+    _write_server_config(config)
+    print(_format_warmup(config["warmup"]))
+
+
+def _start_sampler(server_pid: int, settings: "ServerConfig") -> int | None:
+    """
+    Start recording the server's resource usage; it exits with the server.
+    It also supervises the server, stopping it once idle for
+    `settings.idle_timeout_minutes` and restarting it past `settings.max_rss_mb`.
+    """
+    args = [sys.executable, "-m", "synapso_cli.telemetry", str(server_pid)]
+    if settings.idle_timeout_minutes is not None:
+        args += ["--idle-timeout", str(settings.idle_timeout_minutes * 60)]
+    if settings.max_rss_mb is not None:
+        args += ["--max-rss-mb", str(settings.max_rss_mb)]
+    try:
+        sampler = subprocess.Popen(
+            args,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+    except OSError:
+        return None
+    return sampler.pid
+
+
+def _wait_for_ready(process: subprocess.Popen, address: dict, deadline: float) -> float:
+    """
+    Follow the server log until uvicorn reports its socket is bound.
+
+    Returns the `time.perf_counter()` timestamp at which the server answered its
+    health check. Raises ChildProcessError if the child exits first and
+    TimeoutError once `deadline` passes.
+    """
+    client = _client_for(address)
+    bound = False
+    pending = ""
+    with SERVER_LOG_PATH.open(encoding="utf-8", errors="replace") as log:
+        while time.perf_counter() < deadline:
+            chunk = log.read()
+            if chunk:
+                pending += chunk
+                *lines, pending = pending.split("\n")
+                bound = bound or any(READY_LOG_MARKER in line for line in lines)
+            # Confirm over HTTP once uvicorn says it is listening, so a server
+            # that binds but fails its lifespan startup isn't reported ready.
+            if bound and client.health():
+                return time.perf_counter()
+            if process.poll() is not None:
+                raise ChildProcessError(process.returncode)
+            if not chunk:
+                time.sleep(LOG_POLL_INTERVAL)
+    raise TimeoutError
+
+
+def _worker_pids(pid: int) -> list[int]:
+    import psutil
+
+    try:
+        children = psutil.Process(pid).children(recursive=True)
+    except psutil.NoSuchProcess:
+        return []
+    # A single-worker uvicorn serves from the supervisor process itself.
+    return [child.pid for child in children] or [pid]
+
+
+def _signal_group(pgid: int, sig: int):
+    try:
+        os.killpg(pgid, sig)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+def _server_processes(config: dict) -> list["psutil.Process"]:
+    """Live processes of the recorded server: the supervisor and its workers."""
+    import psutil
+
+    pgid = config.get("pgid")
+    pids = {config["pid"], *config.get("worker_pids", [])}
+    try:
+        # Workers respawned by the supervisor since launch aren't recorded.
+        pids.update(
+            child.pid
+            for child in psutil.Process(config["pid"]).children(recursive=True)
+        )
+    except psutil.NoSuchProcess:
+        pass
+
+    processes = []
+    for pid in pids:
+        try:
+            # Recorded PIDs may have been reused by unrelated processes since.
+            if pgid is None or os.getpgid(pid) == pgid:
+                processes.append(psutil.Process(pid))
+        except (ProcessLookupError, psutil.NoSuchProcess):
+            continue
+    return processes
+
+
+def _format_log_tail(lines: int = SERVER_LOG_TAIL_LINES) -> str:
+    try:
+        tail = SERVER_LOG_PATH.read_text(encoding="utf-8", errors="replace")
+    except OSError:
+        return ""
+    tail = "\n".join(tail.rstrip().splitlines()[-lines:])
+    return f"\nLast lines of {SERVER_LOG_PATH}:\n{tail}" if tail else ""
+
+
+def _write_server_config(config: dict):
+    CONFIG_PATH.parent.mkdir(parents=True, exist_ok=True)
+    CONFIG_PATH.write_text(json.dumps(config))
+
+
+def _invalidate_health_check():
+    """Force the next liveness check to probe the server over HTTP."""
+    try:
+        config = get_server_config()
+        if config and config.pop("checked_at", None) is not None:
+            _write_server_config(config)
+    except (OSError, ValueError):
+        pass
+
+
+def _is_listening(config: dict) -> bool:
+    try:
+        if config.get("transport") == "uds":
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(PORT_CHECK_TIMEOUT)
+                sock.connect(config["socket_path"])
+        else:
+            with socket.create_connection(
+                ("127.0.0.1", config["port"]), PORT_CHECK_TIMEOUT
+            ):
+                pass
+        return True
+    except (OSError, KeyError):
         return False
 
+
+def is_server_running():
+    """
+    Check if the server is running.
+
+    The recorded PID and listening socket are checked first; the HTTP health check only
+    runs once the last successful one is older than `HEALTH_CHECK_TTL` or a
+    request has failed to reach the server since.
+    """
+    import psutil
+
     try:
-        with open(CONFIG_PATH, encoding="utf-8") as f:
-            config = json.load(f)
+        config = get_server_config()
+        if not config:
+            return False
         pid = config.get("pid")
-        port = config.get("port")
-
-        if not pid or not port:
+        if not pid:
+            return False
+        if not psutil.pid_exists(pid) or not _is_listening(config):
             return False
 
-        response = requests.get(f"http://127.0.0.1:{port}/", timeout=1)
-        if (
-            response.status_code == 200
-            and response.json().get("message") == "Synapso API is running"
-        ):
+        checked_at = config.get("checked_at", 0)
+        if 0 <= time.time() - checked_at < HEALTH_CHECK_TTL:
             return True
+
+        if not _client_for(config).health():
+            return False
+        config["checked_at"] = time.time()
+        _write_server_config(config)
+        return True
     except Exception:
         return False
 
-    return False
-
 
-def ensure_server():
-    """Ensure the server is running."""
+def ensure_server(warm: bool | None = None) -> bool:
+    """
+    Ensure the server is running. Return True if it had to be launched.
+    `warm` overrides the `server.warm` setting for a launch.
+    """
     if is_server_running():
-        print("Server already running.")
-        return
+        return False
 
-    config = launch_server()
-    print(f"Server started on port {config['port']} (pid {config['pid']})")
+    config = launch_server(warm=warm)
+    print(
+        f"Server started on {_describe_address(config)} (pid {config['pid']}) "
+        f"in {config['startup_s']:.2f} s"
+    )
+    if config.get("warmup"):
+        print(_format_warmup(config["warmup"]))
+    return True
 
 
 def get_server_config():
@@ -134,43 +520,170 @@ def get_server_config():
 
 
 @server_app.command()
-def start():
-    """Start the server."""
-    ensure_server()
+def start(
+    workers: Annotated[int | None, cyclopts.Parameter(name=["--workers", "-w"])] = None,
+    loop: Annotated[str | None, cyclopts.Parameter(name=["--loop"])] = None,
+    http: Annotated[str | None, cyclopts.Parameter(name=["--http"])] = None,
+    backlog: Annotated[int | None, cyclopts.Parameter(name=["--backlog"])] = None,
+    transport: Annotated[
+        str | None, cyclopts.Parameter(name=["--transport", "-t"])
+    ] = None,
+    warm: Annotated[bool | None, cyclopts.Parameter(name=["--warm"])] = None,
+):
+    """
+    Start the server.
+
+    Options given here are saved to the `server` section of config.yaml and
+    used for later starts. --workers defaults to one per CPU core, up to 4.
+    --transport uds serves the API on a Unix domain socket under SYNAPSO_HOME
+    instead of a loopback TCP port. --warm/--no-warm decide, for this start
+    only, whether the models are loaded before the server is reported ready
+    (default: the `server.warm` setting).
+    """
+    overrides = {
+        key: value
+        for key, value in {
+            "workers": workers,
+            "loop": loop,
+            "http": http,
+            "backlog": backlog,
+            "transport": transport,
+        }.items()
+        if value is not None
+    }
+    if overrides:
+        from pydantic import ValidationError
+
+        from ..config import ServerConfig, save_server_config
+
+        settings = _load_server_settings()
+        try:
+            settings = ServerConfig(**{**settings.model_dump(), **overrides})
+        except ValidationError as e:
+            raise cyclopts.CycloptsError(f"Invalid server options: {e}") from e
+        save_server_config(settings)
+
+    if not ensure_server(warm=warm):
+        print("Server already running.")
+        if overrides:
+            print("Run 'synapso server restart' to apply the new settings.")
+        if warm:
+            prewarm_server()
 
 
 @server_app.command()
 def stop():
-    """Stop the server."""
-    if not CONFIG_PATH.exists():
+    """Stop the server and all of its worker processes."""
+    config = get_server_config()
+    if not config or not config.get("pid"):
         print("Server not running.")
         return
 
     try:
-        with open(CONFIG_PATH, encoding="utf-8") as f:
-            config = json.load(f)
-        pid = config.get("pid")
-        if not pid:
-            print("Server not running.")
-            return
-
-        p = psutil.Process(pid)
-        p.terminate()
-        try:
-            p.wait(timeout=10)
-        except psutil.TimeoutExpired:
-            p.kill()
-            p.wait()
-        CONFIG_PATH.unlink()
-        print("Server stopped.")
-    except psutil.NoSuchProcess:
-        CONFIG_PATH.unlink()
-        print("Server not running (stale config cleaned up)")
+        if _terminate_server(config):
+            print("Server stopped.")
+        else:
+            print("Server not running (stale config cleaned up)")
     except Exception as e:
         print(f"Error stopping server: {e}")
         raise cyclopts.CycloptsError(f"Error stopping server: {e}")
 
 
+def _terminate_server(config: dict) -> bool:
+    """
+    Stop the server described by `config` and remove its config. Return
+    False if it was not running (only stale state was cleaned up).
+    """
+    import psutil
+
+    _close_client(config)
+    processes = _server_processes(config)
+    running = any(p.pid == config["pid"] for p in processes)
+    if running:
+        # The supervisor forwards SIGTERM to its workers for a graceful
+        # shutdown; anything still alive after the grace period is killed.
+        if config.get("pgid"):
+            _signal_group(config["pgid"], signal.SIGTERM)
+        else:
+            # Launched before servers got their own process group.
+            for p in processes:
+                p.terminate()
+        _, alive = psutil.wait_procs(processes, timeout=10)
+    else:
+        # Orphaned workers of a supervisor that died.
+        alive = processes
+    for p in alive:
+        p.kill()
+    psutil.wait_procs(alive, timeout=5)
+    if config.get("transport") == "uds":
+        Path(config["socket_path"]).unlink(missing_ok=True)
+    _stop_sampler(config)
+    CONFIG_PATH.unlink(missing_ok=True)
+    return running
+
+
+def _stop_sampler(config: dict):
+    import psutil
+
+    try:
+        sampler = psutil.Process(config["sampler_pid"])
+        # The PID may have been reused since the sampler exited on its own,
+        # and the sampler itself stops the server when it is idle.
+        if sampler.pid != os.getpid() and "synapso_cli.telemetry" in sampler.cmdline():
+            sampler.terminate()
+    except (KeyError, TypeError, psutil.Error):
+        pass
+
+
+def _restart_unresponsive_server(
+    client: "SynapsoRestClient | AsyncSynapsoRestClient",
+):
+    """
+    Circuit breaker hook of `client`: if the local server no longer answers
+    its health check, replace it with a fresh one and point `client` at it.
+    The new server may listen on another port, so the client is moved
+    rather than closed, and its breaker is closed again for the new server.
+    """
+    from ..rest_client import SynapsoRestClient
+
+    config = get_server_config()
+    if config:
+        _invalidate_health_check()
+        if is_server_running():
+            return
+        print("Server is not responding; restarting it.", file=sys.stderr)
+        # Keep `client` out of the shutdown of the old server's clients.
+        if _rest_clients.get(_address(config)) is client:
+            del _rest_clients[_address(config)]
+        _terminate_server(config)
+    # Otherwise it was stopped meanwhile, e.g. by the idle supervisor.
+    ensure_server()
+    new_config = get_server_config()
+    if new_config:
+        client.retarget(**_client_kwargs(new_config))
+        client.policy.breaker.record_success()
+        if isinstance(client, SynapsoRestClient):
+            _rest_clients.setdefault(_address(new_config), client)
+
+
+def stop_idle_server(action: str) -> bool:
+    """
+    Stop the server so the stores can be changed underneath it, and return
+    True if it was running. Refuse while an index job is still running.
+    """
+    from ..jobs import is_job_done
+
+    if not is_server_running():
+        return False
+    jobs = get_rest_client().get_job_list().get("jobs", [])
+    if any(job and not is_job_done(job) for job in jobs):
+        print(f"Index jobs are still running; {action} once they finish.")
+        raise cyclopts.CycloptsError("Index jobs are still running")
+    print(f"Stopping the server to {action}...")
+    stop()
+    return True
+
+
 @server_app.command()
 def status():
     if is_server_running():
@@ -178,14 +691,115 @@ def status():
         if not server_config:
             print("Server is running but config is not found.")
         else:
+            workers = [
+                p
+                for p in _server_processes(server_config)
+                if p.pid in server_config.get("worker_pids", [])
+            ]
             print(
-                f"Server is running on port {server_config['port']} (pid {server_config['pid']})"
+                f"Server is running on {_describe_address(server_config)} "
+                f"(pid {server_config['pid']}, {len(workers)} worker(s))"
             )
+            if server_config.get("warmup"):
+                print(_format_warmup(server_config["warmup"]))
     else:
         print("Server is not running.")
 
 
 @server_app.command()
-def restart():
+def restart(
+    warm: Annotated[bool, cyclopts.Parameter(name=["--warm"])] = True,
+):
+    """Restart the server, warming it up unless --no-warm is given."""
     stop()
-    start()
+    start(warm=warm)
+
+
+@server_app.command()
+def stats(
+    window: Annotated[float, cyclopts.Parameter(name=["--window", "-w"])] = 300.0,
+):
+    """
+    Summarize the server's resource usage over the last --window seconds.
+
+    Covers the supervisor and all workers: memory (RSS/USS), CPU%, threads,
+    open file descriptors and disk I/O, as sampled every few seconds while
+    the server runs.
+    """
+    from ..telemetry import TelemetryRing, summarize
+
+    samples = TelemetryRing().read(since=time.time() - window)
+    if not samples:
+        print("No resource samples recorded in that window.")
+        return
+    print(_format_stats(summarize(samples), len(samples), window))
+
+
+def _format_stats(summary: dict, count: int, window: float) -> str:
+    msg = f"{count} samples over the last {window:g} s\n"
+    msg += "Metric\tMin\tAvg\tMax\tLast\n"
+    for name, values in summary.items():
+        msg += f"{name}\t" + "\t".join(
+            f"{values[key]:.1f}" for key in ("min", "avg", "max", "last")
+        )
+        msg += "\n"
+    return msg
+
+
+@server_app.command()
+def top(
+    interval: Annotated[float, cyclopts.Parameter(name=["--interval", "-n"])] = 1.0,
+):
+    """Show the live resource usage of each server process until interrupted."""
+    from ..telemetry import TreeSampler
+
+    config = get_server_config()
+    if not config or not is_server_running():
+        raise cyclopts.CycloptsError("Server is not running")
+
+    sampler = TreeSampler(config["pid"])
+    interactive = sys.stdout.isatty()
+    previous: dict[int, dict] = {}
+    drawn_lines = 0
+    try:
+        while (sample := sampler.sample()) is not None:
+            lines = _format_top(sample, previous)
+            if interactive and drawn_lines:
+                # Redraw the table in place.
+                sys.stdout.write(f"\x1b[{drawn_lines}F\x1b[J")
+            sys.stdout.write("\n".join(lines) + "\n")
+            sys.stdout.flush()
+            drawn_lines = len(lines)
+            previous = {
+                entry["pid"]: {**entry, "timestamp": sample["timestamp"]}
+                for entry in sample["per_process"]
+            }
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        return
+    print("Server exited.")
+
+
+def _format_top(sample: dict, previous: dict[int, dict]) -> list[str]:
+    from ..telemetry import io_rates
+
+    lines = [
+        f"{'PID':>8} {'ROLE':<10} {'CPU%':>6} {'RSS MB':>8} {'USS MB':>8} "
+        f"{'THR':>4} {'FDS':>5} {'READ KB/s':>10} {'WRITE KB/s':>10}"
+    ]
+    for entry in sample["per_process"]:
+        current = {**entry, "timestamp": sample["timestamp"]}
+        last = previous.get(entry["pid"])
+        read, write = io_rates(last, current) if last else (0.0, 0.0)
+        lines.append(
+            f"{entry['pid']:>8} {entry['role']:<10} {entry['cpu_percent']:>6.1f} "
+            f"{entry['rss'] / 2**20:>8.1f} {entry['uss'] / 2**20:>8.1f} "
+            f"{entry['threads']:>4} {entry['fds']:>5} "
+            f"{read / 1024:>10.1f} {write / 1024:>10.1f}"
+        )
+    lines.append(
+        f"{'total':>8} {sample['processes']:<10} {sample['cpu_percent']:>6.1f} "
+        f"{sample['rss'] / 2**20:>8.1f} {sample['uss'] / 2**20:>8.1f} "
+        f"{sample['threads']:>4} {sample['fds']:>5}"
+    )
+    return lines
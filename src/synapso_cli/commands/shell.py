@@ -0,0 +1,120 @@
+import shlex
+import time
+
+import cyclopts
+import typer
+
+from ..errors import SynapsoRestClientError
+from ..paths import synapso_home
+from ..streaming import format_stream_stats, render_stream
+from .server import get_rest_client
+
+HISTORY_PATH = synapso_home() / "shell_history"
+HISTORY_LENGTH = 1000
+PROMPT = "synapso> "
+
+SHELL_HELP = """\
+Commands:
+  ask <question>     Stream an answer from the server
+  query <question>   Run a query and print the full response
+  cortex ...         Any 'synapso cortex' command, e.g. 'cortex list'
+  job ...            Any 'synapso job' command, e.g. 'job list'
+  help               Show this help
+  exit, quit         Leave the shell (or press Ctrl-D)"""
+
+
+def _setup_history():
+    try:
+        import readline
+    except ImportError:  # Not available on every platform; history is optional.
+        return None
+    HISTORY_PATH.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        readline.read_history_file(HISTORY_PATH)
+    except OSError:
+        pass
+    readline.set_history_length(HISTORY_LENGTH)
+    return readline
+
+
+def _shell_ask(question: str):
+    stats = render_stream(get_rest_client().query_stream(question))
+    typer.echo("\n" + format_stream_stats(stats), err=True)
+
+
+def _shell_query(question: str):
+    rest_client = get_rest_client()
+    start = time.perf_counter()
+    response = rest_client.query(question)
+    latency_ms = (time.perf_counter() - start) * 1000
+    typer.echo(response)
+    typer.echo(f"[{latency_ms:.0f} ms]", err=True)
+
+
+def _run_line(app: cyclopts.App, line: str) -> bool:
+    """Run one shell line. Return False when the shell should exit."""
+    try:
+        tokens = shlex.split(line)
+    except ValueError as e:
+        typer.echo(f"Error: {e}", err=True)
+        return True
+    if not tokens:
+        return True
+
+    command, args = tokens[0], tokens[1:]
+    if command in ("exit", "quit"):
+        return False
+    if command == "help":
+        typer.echo(SHELL_HELP)
+        return True
+
+    try:
+        if command in ("ask", "query"):
+            if not args:
+                typer.echo(f"Usage: {command} <question>", err=True)
+            elif command == "ask":
+                _shell_ask(" ".join(args))
+            else:
+                _shell_query(" ".join(args))
+        elif command in ("cortex", "job"):
+            # The sub-apps report their own errors; a failing command must not
+            # take the whole session down with it.
+            app(tokens, exit_on_error=False)
+        else:
+            typer.echo(f"Unknown command: {command}. Type 'help' for help.", err=True)
+    except SynapsoRestClientError as e:
+        typer.echo(f"Synapso REST client error: {e}", err=True)
+    except (cyclopts.CycloptsError, SystemExit):
+        pass
+    except KeyboardInterrupt:
+        typer.echo("\nInterrupted.", err=True)
+    except Exception as e:
+        typer.echo(f"Error: {e}", err=True)
+    return True
+
+
+def cmd_shell(app: cyclopts.App):
+    """Run an interactive session that reuses one warm server connection."""
+    readline = _setup_history()
+    # Start (or find) the server and open the pooled connection up front so
+    # the first question doesn't pay for it.
+    get_rest_client().health()
+    typer.echo("Synapso shell. Type 'help' for commands, 'exit' to leave.")
+    try:
+        while True:
+            try:
+                line = input(PROMPT)
+            except KeyboardInterrupt:
+                typer.echo("")
+                continue
+            except EOFError:
+                typer.echo("")
+                break
+            if not _run_line(app, line):
+                break
+    finally:
+        if readline is not None:
+            try:
+                readline.write_history_file(HISTORY_PATH)
+            except OSError:
+                pass
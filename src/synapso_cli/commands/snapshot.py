@@ -0,0 +1,94 @@
+import time
+from pathlib import Path
+from typing import Annotated
+
+import cyclopts
+
+snapshot_app = cyclopts.App()
+
+
+def _load_config():
+    from ..config import get_config
+
+    try:
+        return get_config()
+    except FileNotFoundError as e:
+        print(f"{e}. Run `synapso init` first.")
+        raise cyclopts.CycloptsError(str(e))
+
+
+@snapshot_app.command(name="export")
+def export_(
+    output: Annotated[Path | None, cyclopts.Parameter(name=["--output", "-o"])] = None,
+    level: Annotated[int, cyclopts.Parameter(name=["--level", "-l"])] = 6,
+):
+    """
+    Write the meta, private and vector stores to a compressed snapshot.
+
+    The stores are copied with SQLite's online backup, so the server keeps
+    running. Defaults to synapso-snapshot-<timestamp>.tar.gz in the current
+    directory; --level sets the gzip level (1 fastest, 9 smallest).
+    """
+    import sqlite3
+
+    from ..snapshot import SnapshotError, export_snapshot
+
+    if not 1 <= level <= 9:
+        raise cyclopts.CycloptsError(f"--level must be from 1 to 9, got {level}")
+    config = _load_config()
+    output = output or Path(f"synapso-snapshot-{time.strftime('%Y%m%d-%H%M%S')}.tar.gz")
+    start = time.perf_counter()
+    try:
+        snapshot = export_snapshot(config, output, compresslevel=level)
+    except (SnapshotError, OSError, sqlite3.Error) as e:
+        print(f"Error exporting snapshot: {e}")
+        raise cyclopts.CycloptsError(f"Error exporting snapshot: {e}")
+    stores = snapshot["stores"]
+    size = sum(entry["size"] for entry in stores.values())
+    print(
+        f"Exported {', '.join(stores)} ({size / 2**20:.1f} MiB) and "
+        f"{len(snapshot['manifests'])} cortex manifest(s) to {output} "
+        f"({output.stat().st_size / 2**20:.1f} MiB) "
+        f"in {time.perf_counter() - start:.1f} s"
+    )
+
+
+@snapshot_app.command(name="import")
+def import_(
+    input_path: Annotated[Path, cyclopts.Parameter(name=["--input", "-i"])],
+):
+    """
+    Restore the stores from a snapshot instead of reindexing.
+
+    The snapshot must have been taken with the same vectorizer model and
+    chunker settings as the current config. The server is stopped while the
+    stores are replaced and started again afterwards; cached query results
+    are cleared.
+    """
+    import sqlite3
+
+    from ..query_cache import QueryCache
+    from ..snapshot import SnapshotError, import_snapshot
+    from .server import ensure_server, stop_idle_server
+
+    config = _load_config()
+    restart = stop_idle_server("restore the snapshot")
+    start = time.perf_counter()
+    try:
+        snapshot = import_snapshot(config, input_path)
+    except (SnapshotError, OSError, sqlite3.Error) as e:
+        print(f"Error importing snapshot: {e}")
+        raise cyclopts.CycloptsError(f"Error importing snapshot: {e}")
+    finally:
+        if restart:
+            ensure_server()
+    try:
+        with QueryCache() as cache:
+            cache.clear()
+    except sqlite3.Error:
+        pass
+    print(
+        f"Restored {', '.join(snapshot['stores'])} and "
+        f"{len(snapshot['manifests'])} cortex manifest(s) from {input_path} "
+        f"in {time.perf_counter() - start:.1f} s"
+    )
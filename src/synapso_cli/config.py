@@ -1,13 +1,13 @@
 import os
 from abc import ABC
-from pathlib import Path
 from typing import ClassVar
 
 import yaml
 from pydantic import BaseModel, field_validator
 
-DEFAULT_SYNAPSO_HOME = Path("~/.synapso").expanduser().resolve()
-SYNAPSO_HOME = Path(os.getenv("SYNAPSO_HOME", str(DEFAULT_SYNAPSO_HOME)))
+from .paths import synapso_home
+
+SYNAPSO_HOME = synapso_home()
 CONFIG_FILE = SYNAPSO_HOME / "config.yaml"
 
 
@@ -15,11 +15,12 @@ class BaseConfig(BaseModel, ABC):
     available_types: ClassVar[list[str]]
 
     @classmethod
-    def validate_type_field(cls, value: str, field_name: str) -> str:
-        if value not in cls.available_types:
-            raise ValueError(
-                f"{field_name} must be one of {cls.available_types}, got '{value}'"
-            )
+    def validate_type_field(
+        cls, value: str, field_name: str, available: list[str] | None = None
+    ) -> str:
+        available = cls.available_types if available is None else available
+        if value not in available:
+            raise ValueError(f"{field_name} must be one of {available}, got '{value}'")
         return value
 
 
@@ -47,14 +48,66 @@ class PrivateStoreConfig(BaseConfig):
 
 class VectorStoreConfig(BaseConfig):
     available_types: ClassVar[list[str]] = ["sqlite"]
+    available_index_types: ClassVar[list[str]] = ["flat", "ivf"]
+    available_quantizations: ClassVar[list[str]] = ["none", "int8", "binary"]
     vector_db_type: str = "sqlite"
     vector_db_path: str = "vector.db"
+    # "flat" compares the query with every vector (exact); "ivf" clusters the
+    # vectors into `ivf_lists` lists and only searches the `ivf_probes` lists
+    # nearest to the query (approximate, much faster on large corpora).
+    index_type: str = "flat"
+    quantization: str = "none"
+    ivf_lists: int = 256
+    ivf_probes: int = 8
+    # k-means iterations when building the IVF lists.
+    ivf_train_iterations: int = 10
 
     @field_validator("vector_db_type")
     @classmethod
     def validate_db_type(cls, v):
         return cls.validate_type_field(v, "vector_db_type")
 
+    @field_validator("index_type")
+    @classmethod
+    def validate_index_type(cls, v):
+        return cls.validate_type_field(v, "index_type", cls.available_index_types)
+
+    @field_validator("quantization")
+    @classmethod
+    def validate_quantization(cls, v):
+        return cls.validate_type_field(v, "quantization", cls.available_quantizations)
+
+    @field_validator("ivf_lists", "ivf_probes", "ivf_train_iterations")
+    @classmethod
+    def validate_positive(cls, v, info):
+        if v < 1:
+            raise ValueError(f"{info.field_name} must be at least 1, got {v}")
+        return v
+
+    @field_validator("ivf_probes")
+    @classmethod
+    def validate_probes(cls, v, info):
+        lists = info.data.get("ivf_lists")
+        if lists is not None and v > lists:
+            raise ValueError(f"ivf_probes ({v}) must not exceed ivf_lists ({lists})")
+        return v
+
+    def describe_index(self) -> str:
+        description = f"{self.index_type} index"
+        if self.index_type == "ivf":
+            description += f" ({self.ivf_lists} lists, {self.ivf_probes} probes)"
+        return f"{description}, quantization {self.quantization}"
+
+    def index_settings(self) -> dict:
+        """The settings the server builds the vector index from."""
+        return {
+            "index_type": self.index_type,
+            "quantization": self.quantization,
+            "ivf_lists": self.ivf_lists,
+            "ivf_probes": self.ivf_probes,
+            "ivf_train_iterations": self.ivf_train_iterations,
+        }
+
 
 class RerankerConfig(BaseConfig):
     available_types: ClassVar[list[str]] = ["bm25", "modernbert", "qwen3"]
@@ -102,6 +155,105 @@ class ChunkerConfig(BaseConfig):
         return cls.validate_type_field(v, "chunker_type")
 
 
+class SqliteTuningConfig(BaseConfig):
+    """Settings `synapso db optimize` applies to every SQLite store."""
+
+    available_journal_modes: ClassVar[list[str]] = [
+        "wal",
+        "delete",
+        "truncate",
+        "persist",
+    ]
+    journal_mode: str = "wal"
+    page_size: int = 4096
+    # Bytes of each database file to memory-map; 0 disables mmap.
+    mmap_size: int = 256 * 1024 * 1024
+    # Pages if positive, KiB if negative (SQLite's convention).
+    cache_size: int = -64 * 1024
+
+    @field_validator("journal_mode")
+    @classmethod
+    def validate_journal_mode(cls, v):
+        return cls.validate_type_field(v, "journal_mode", cls.available_journal_modes)
+
+    @field_validator("page_size")
+    @classmethod
+    def validate_page_size(cls, v):
+        if not 512 <= v <= 65536 or v & (v - 1):
+            raise ValueError(
+                f"page_size must be a power of two from 512 to 65536, got {v}"
+            )
+        return v
+
+    @field_validator("mmap_size")
+    @classmethod
+    def validate_mmap_size(cls, v):
+        if v < 0:
+            raise ValueError(f"mmap_size must not be negative, got {v}")
+        return v
+
+
+def default_server_workers() -> int:
+    # Every worker loads its own copy of the models, so stop at a few workers
+    # even on large machines.
+    return max(1, min(os.cpu_count() or 1, 4))
+
+
+class ServerConfig(BaseConfig):
+    available_loops: ClassVar[list[str]] = ["auto", "asyncio", "uvloop"]
+    available_http: ClassVar[list[str]] = ["auto", "h11", "httptools"]
+    available_transports: ClassVar[list[str]] = ["tcp", "uds"]
+    workers: int | None = None
+    loop: str = "auto"
+    http: str = "auto"
+    backlog: int = 2048
+    transport: str = "tcp"
+    warm: bool = False
+    warmup_queries: list[str] = ["What is this about?"]
+    idle_timeout_minutes: float | None = None
+    max_rss_mb: int | None = None
+
+    @field_validator("workers")
+    @classmethod
+    def validate_workers(cls, v):
+        if v is not None and v < 1:
+            raise ValueError(f"workers must be at least 1, got {v}")
+        return v
+
+    @field_validator("loop")
+    @classmethod
+    def validate_loop(cls, v):
+        return cls.validate_type_field(v, "loop", cls.available_loops)
+
+    @field_validator("http")
+    @classmethod
+    def validate_http(cls, v):
+        return cls.validate_type_field(v, "http", cls.available_http)
+
+    @field_validator("transport")
+    @classmethod
+    def validate_transport(cls, v):
+        return cls.validate_type_field(v, "transport", cls.available_transports)
+
+    @field_validator("backlog")
+    @classmethod
+    def validate_backlog(cls, v):
+        if v < 1:
+            raise ValueError(f"backlog must be at least 1, got {v}")
+        return v
+
+    @field_validator("idle_timeout_minutes", "max_rss_mb")
+    @classmethod
+    def validate_positive(cls, v, info):
+        if v is not None and v <= 0:
+            raise ValueError(f"{info.field_name} must be positive, got {v}")
+        return v
+
+    @property
+    def effective_workers(self) -> int:
+        return self.workers or default_server_workers()
+
+
 class GlobalConfig(BaseModel):
     meta_store: MetaStoreConfig = MetaStoreConfig()
     private_store: PrivateStoreConfig = PrivateStoreConfig()
@@ -110,6 +262,8 @@ class GlobalConfig(BaseModel):
     summarizer: SummarizerConfig = SummarizerConfig()
     vectorizer: VectorizerConfig = VectorizerConfig()
     chunker: ChunkerConfig = ChunkerConfig()
+    server: ServerConfig = ServerConfig()
+    sqlite: SqliteTuningConfig = SqliteTuningConfig()
 
 
 def get_config(config_file: str = str(CONFIG_FILE)) -> GlobalConfig:
@@ -118,3 +272,17 @@ def get_config(config_file: str = str(CONFIG_FILE)) -> GlobalConfig:
     with open(config_file, "r") as f:
         config_dict = yaml.safe_load(f)
         return GlobalConfig(**(config_dict or {}))
+
+
+def save_server_config(
+    server: ServerConfig, config_file: str = str(CONFIG_FILE)
+) -> None:
+    """Write the `server` section of the config file, keeping the others as-is."""
+    config_dict = {}
+    if os.path.exists(config_file):
+        with open(config_file, "r") as f:
+            config_dict = yaml.safe_load(f) or {}
+    config_dict["server"] = server.model_dump()
+    os.makedirs(os.path.dirname(config_file), exist_ok=True)
+    with open(config_file, "w") as f:
+        yaml.dump(config_dict, f, default_flow_style=False, sort_keys=False)
@@ -0,0 +1,177 @@
+"""
+Inspection, tuning and compaction of the server's SQLite stores.
+
+These operate on the database files directly, so `optimize_store` must only
+run while the server is stopped; `store_stats` and `read_benchmark` open the
+files read-only and are safe at any time.
+"""
+
+import random
+import shutil
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from .metrics import percentile
+
+if TYPE_CHECKING:
+    from .config import GlobalConfig, SqliteTuningConfig
+
+
+def store_paths(config: "GlobalConfig") -> dict[str, Path]:
+    """Database file of each store, resolved as `synapso init` resolves them."""
+    return {
+        "meta": Path(config.meta_store.meta_db_path).expanduser().resolve(),
+        "private": Path(config.private_store.private_db_path).expanduser().resolve(),
+        "vector": Path(config.vector_store.vector_db_path).expanduser().resolve(),
+    }
+
+
+def _file_size(path: Path) -> int:
+    try:
+        return path.stat().st_size
+    except OSError:
+        return 0
+
+
+def _connect_readonly(path: Path) -> sqlite3.Connection:
+    return sqlite3.connect(f"{path.as_uri()}?mode=ro", uri=True, timeout=5)
+
+
+def _pragma(conn: sqlite3.Connection, name: str):
+    return conn.execute(f"PRAGMA {name}").fetchall()[0][0]
+
+
+def _apply_connection_tuning(conn: sqlite3.Connection, tuning: "SqliteTuningConfig"):
+    conn.execute(f"PRAGMA mmap_size={int(tuning.mmap_size)}").fetchall()
+    conn.execute(f"PRAGMA cache_size={int(tuning.cache_size)}").fetchall()
+
+
+def store_stats(path: Path) -> dict:
+    """Size on disk, page usage and fragmentation of one store."""
+    wal_path = path.with_name(path.name + "-wal")
+    with closing(_connect_readonly(path)) as conn:
+        page_size = _pragma(conn, "page_size")
+        page_count = _pragma(conn, "page_count")
+        freelist_count = _pragma(conn, "freelist_count")
+        journal_mode = _pragma(conn, "journal_mode")
+    return {
+        "path": str(path),
+        "size_bytes": _file_size(path),
+        "wal_bytes": _file_size(wal_path),
+        "page_size": page_size,
+        "page_count": page_count,
+        "freelist_count": freelist_count,
+        # Share of pages that are allocated but unused; VACUUM reclaims them.
+        "fragmentation": freelist_count / page_count if page_count else 0.0,
+        "journal_mode": journal_mode,
+    }
+
+
+def optimize_store(
+    path: Path, tuning: "SqliteTuningConfig", vacuum: bool = True
+) -> list[str]:
+    """
+    Check, compact and tune one store; return the steps that were run.
+
+    VACUUM rewrites the whole file, so it is skipped (and reported) when the
+    disk lacks room for a second copy. The page size can only change during a
+    VACUUM, and not in WAL mode, so the journal mode is set last.
+    """
+    # quick_check gets a connection of its own: on some SQLite versions it
+    # leaves a table lock behind that makes the final checkpoint fail.
+    with closing(_connect_readonly(path)) as conn:
+        check = _pragma(conn, "quick_check")
+    if check != "ok":
+        raise sqlite3.DatabaseError(f"{path} failed quick_check: {check}")
+
+    steps = []
+    conn = sqlite3.connect(path, isolation_level=None, timeout=30)
+    try:
+        _apply_connection_tuning(conn, tuning)
+
+        if vacuum:
+            needed = _file_size(path) + _file_size(path.with_name(path.name + "-wal"))
+            if shutil.disk_usage(path.parent).free < needed:
+                steps.append("skipped VACUUM: not enough free disk space")
+            else:
+                if _pragma(conn, "page_size") != tuning.page_size:
+                    _pragma(conn, "journal_mode=DELETE")
+                    conn.execute(f"PRAGMA page_size={int(tuning.page_size)}")
+                    steps.append(f"page_size={tuning.page_size}")
+                conn.execute("VACUUM")
+                steps.append("VACUUM")
+        conn.execute("ANALYZE")
+        steps.append("ANALYZE")
+        conn.execute("PRAGMA optimize").fetchall()
+        steps.append("PRAGMA optimize")
+        mode = _pragma(conn, f"journal_mode={tuning.journal_mode}")
+        steps.append(f"journal_mode={mode}")
+        if mode == "wal":
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+    finally:
+        conn.close()
+    return steps
+
+
+def read_benchmark(
+    path: Path, tuning: "SqliteTuningConfig", lookups: int = 500, seed: int = 0
+) -> dict:
+    """
+    Time a read workload shaped like query serving: a full scan of every
+    table (as when vectors are compared) and random point lookups by rowid
+    (as when chunks and metadata are fetched for results). One untimed pass
+    first warms the page cache, so runs before and after are comparable.
+    """
+    rng = random.Random(seed)
+    with closing(_connect_readonly(path)) as conn:
+        _apply_connection_tuning(conn, tuning)
+        tables = [
+            name
+            for (name,) in conn.execute(
+                "SELECT name FROM sqlite_master "
+                "WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+            )
+        ]
+
+        def scan() -> int:
+            rows = 0
+            for table in tables:
+                for _ in conn.execute(f'SELECT * FROM "{table}"'):
+                    rows += 1
+            return rows
+
+        scan()
+        start = time.perf_counter()
+        rows = scan()
+        scan_ms = (time.perf_counter() - start) * 1000
+
+        lookup_ms = []
+        rowid_tables = []
+        for table in tables:
+            try:
+                (max_rowid,) = conn.execute(
+                    f'SELECT MAX(rowid) FROM "{table}"'
+                ).fetchone()
+            except sqlite3.OperationalError:
+                continue  # WITHOUT ROWID table
+            if max_rowid:
+                rowid_tables.append((table, max_rowid))
+        for _ in range(lookups if rowid_tables else 0):
+            table, max_rowid = rng.choice(rowid_tables)
+            start = time.perf_counter()
+            conn.execute(
+                f'SELECT * FROM "{table}" WHERE rowid = ?', (rng.randint(1, max_rowid),)
+            ).fetchall()
+            lookup_ms.append((time.perf_counter() - start) * 1000)
+
+    return {
+        "tables": len(tables),
+        "rows": rows,
+        "scan_ms": scan_ms,
+        "lookups": len(lookup_ms),
+        "lookup_p50_ms": percentile(lookup_ms, 50),
+        "lookup_p95_ms": percentile(lookup_ms, 95),
+    }
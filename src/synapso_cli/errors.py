@@ -0,0 +1,18 @@
+class SynapsoRestClientError(Exception):
+    pass
+
+
+class SynapsoHTTPError(SynapsoRestClientError):
+    """The server answered with an error status."""
+
+    def __init__(self, message: str, status_code: int):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class DeadlineExceededError(SynapsoRestClientError):
+    """A call ran out of its deadline, retries included."""
+
+
+class CircuitOpenError(SynapsoRestClientError):
+    """A call was refused without trying because the server keeps failing."""
@@ -0,0 +1,179 @@
+"""
+Helpers for following server-side jobs: reading job payloads, polling many
+jobs with an adaptive interval, and drawing a live progress view.
+"""
+
+import random
+import sys
+import time
+from collections.abc import Callable, Iterable
+from typing import TYPE_CHECKING, Any, TextIO
+
+if TYPE_CHECKING:
+    from .async_rest_client import AsyncSynapsoRestClient
+
+JOB_DONE_STATUSES = ("completed", "failed", "error", "cancelled")
+JOB_SUCCESS_STATUS = "completed"
+
+DEFAULT_MIN_POLL_INTERVAL = 0.25
+DEFAULT_MAX_POLL_INTERVAL = 5.0
+# Consecutive failed lookups after which a job is given up on.
+MAX_POLL_FAILURES = 5
+
+# Keys under which the server may report how many documents a job processed.
+_DOCUMENT_COUNT_KEYS = (
+    "documents_indexed",
+    "indexed_documents",
+    "processed_documents",
+    "num_documents",
+    "documents",
+)
+
+
+def job_id_from_response(response: Any) -> str | None:
+    if not isinstance(response, dict):
+        return None
+    return response.get("job_id") or (response.get("job") or {}).get("id")
+
+
+def job_status(job: dict) -> str:
+    return str(job.get("status") or "unknown")
+
+
+def is_job_done(job: dict) -> bool:
+    return job_status(job) in JOB_DONE_STATUSES
+
+
+def documents_processed(job: dict) -> int | None:
+    for source in (job, job.get("result") or {}):
+        for key in _DOCUMENT_COUNT_KEYS:
+            value = source.get(key)
+            if isinstance(value, int):
+                return value
+    return None
+
+
+async def poll_jobs(
+    client: "AsyncSynapsoRestClient",
+    job_ids: Iterable[str],
+    on_change: Callable[[str, dict], None],
+    min_interval: float = DEFAULT_MIN_POLL_INTERVAL,
+    max_interval: float = DEFAULT_MAX_POLL_INTERVAL,
+    concurrency: int = 8,
+) -> dict[str, dict]:
+    """
+    Poll `job_ids` until every job is done and return their final payloads.
+
+    Each round looks up all unfinished jobs concurrently, as conditional
+    requests when the server hands out ETags, so unchanged jobs cost a bare
+    304. `on_change` is called only when a job's payload differs from the
+    last one seen. The interval starts at `min_interval`, doubles after every
+    round in which nothing changed, up to `max_interval`, and drops back on
+    any change, so long quiet jobs cost few requests while fast ones are
+    still seen promptly. Each sleep is jittered so that several watchers
+    don't poll the server in lockstep.
+    """
+    import asyncio
+
+    from .async_rest_client import bounded_gather
+
+    latest: dict[str, dict] = {}
+    etags: dict[str, str | None] = {}
+    failures: dict[str, int] = {}
+    pending = list(dict.fromkeys(job_ids))
+
+    async def fetch(job_id: str) -> dict | None:
+        job, etags[job_id] = await client.get_job_if_changed(job_id, etags.get(job_id))
+        return job
+
+    interval = min_interval
+    while pending:
+        results = await bounded_gather(
+            fetch, pending, concurrency, return_exceptions=True
+        )
+        changed = False
+        for job_id, job in zip(pending, results):
+            if isinstance(job, BaseException):
+                failures[job_id] = failures.get(job_id, 0) + 1
+                if failures[job_id] < MAX_POLL_FAILURES:
+                    continue
+                job = {"job_id": job_id, "status": "error", "error": str(job)}
+            failures.pop(job_id, None)
+            if job is not None and job != latest.get(job_id):
+                latest[job_id] = job
+                changed = True
+                on_change(job_id, job)
+        pending = [
+            job_id for job_id in pending if not is_job_done(latest.get(job_id, {}))
+        ]
+        if not pending:
+            break
+        interval = min_interval if changed else min(interval * 2, max_interval)
+        await asyncio.sleep(random.uniform(interval / 2, interval))
+    return latest
+
+
+def _progress(job: dict) -> str:
+    progress = job.get("progress")
+    if isinstance(progress, (int, float)):
+        percent = progress * 100 if progress <= 1 else progress
+        return f"{percent:5.1f}%"
+    docs = documents_processed(job)
+    return f"{docs} docs" if docs is not None else ""
+
+
+class JobProgressView:
+    """
+    Live table of job rows, one per job.
+
+    On a terminal the table is redrawn in place, and only after a change. On
+    anything else (a pipe or a log file) each change is printed as one line.
+    """
+
+    def __init__(
+        self,
+        labels: dict[str, str],
+        stream: TextIO | None = None,
+        started_at: dict[str, float] | None = None,
+    ):
+        self.labels = labels
+        self.stream = stream if stream is not None else sys.stderr
+        self.interactive = self.stream.isatty()
+        now = time.perf_counter()
+        # `time.perf_counter()` at which each job was submitted.
+        self.started_at = {job_id: now for job_id in labels} | (started_at or {})
+        self.jobs: dict[str, dict] = {}
+        self.finished_at: dict[str, float] = {}
+        self._drawn_lines = 0
+        self._width = max((len(label) for label in labels.values()), default=0)
+
+    def _row(self, job_id: str) -> str:
+        job = self.jobs.get(job_id, {})
+        elapsed = self.elapsed(job_id)
+        return (
+            f"{self.labels[job_id]:<{self._width}}  {job_status(job):<10} "
+            f"{_progress(job):>12}  {elapsed:7.1f}s"
+        )
+
+    def elapsed(self, job_id: str) -> float:
+        """Seconds from submitting the job until it finished (or until now)."""
+        end = self.finished_at.get(job_id, time.perf_counter())
+        return end - self.started_at[job_id]
+
+    def update(self, job_id: str, job: dict):
+        self.jobs[job_id] = job
+        if is_job_done(job):
+            self.finished_at.setdefault(job_id, time.perf_counter())
+        if self.interactive:
+            self.redraw()
+        else:
+            print(self._row(job_id), file=self.stream, flush=True)
+
+    def redraw(self):
+        if self._drawn_lines:
+            # Move to the start of the table and draw over it.
+            self.stream.write(f"\x1b[{self._drawn_lines}F")
+        rows = [self._row(job_id) for job_id in self.labels]
+        self.stream.write("".join(f"\x1b[2K{row}\n" for row in rows))
+        self.stream.flush()
+        self._drawn_lines = len(rows)
@@ -1,13 +1,21 @@
+import os
+import sys
 import warnings
 from typing import Annotated
 
 import cyclopts
 
+# Command modules keep their heavy dependencies (requests, psutil, yaml,
+# pydantic, typer) out of module scope; top-level commands import their
+# implementation on first call so the CLI starts fast.
+from .commands.bench import bench_app
+from .commands.cache import cache_app
 from .commands.cortex import cortex_app
-from .commands.init import init_synapso
+from .commands.db import db_app
 from .commands.job import job_app
-from .commands.query import cmd_query, cmd_query_stream
 from .commands.server import server_app
+from .commands.snapshot import snapshot_app
+from .tracing import TRACE_ENV_VAR, configure_tracing
 
 warnings.filterwarnings("ignore", category=FutureWarning)
 
@@ -18,6 +26,10 @@ synapso_cli = cyclopts.App(
 synapso_cli.command(cortex_app, name="cortex")
 synapso_cli.command(server_app, name="server")
 synapso_cli.command(job_app, name="job")
+synapso_cli.command(bench_app, name="bench")
+synapso_cli.command(cache_app, name="cache")
+synapso_cli.command(db_app, name="db")
+synapso_cli.command(snapshot_app, name="snapshot")
 
 
 @synapso_cli.command
@@ -25,30 +37,129 @@ def init(
     force_db_reset: Annotated[
         bool, cyclopts.Parameter(name=["--force-db-reset", "-f"])
     ] = False,
+    warm: Annotated[bool, cyclopts.Parameter(name=["--warm"])] = True,
 ):
-    init_synapso(force_db_reset)
+    """
+    Create the config and stores, and start the server.
 
+    The server is warmed up once the stores exist, unless --no-warm is given.
+    """
+    from .commands.init import init_synapso
 
+    init_synapso(force_db_reset, warm=warm)
+
+
+CortexIds = Annotated[list[str] | None, cyclopts.Parameter(name=["--cortex-id", "-c"])]
+AllCortices = Annotated[bool, cyclopts.Parameter(name=["--all", "-a"])]
+
+
+@synapso_cli.command
 def query(
     query_text: Annotated[str, cyclopts.Parameter(name=["--query", "-q"])],
-    cortex_id: Annotated[
-        str | None, cyclopts.Parameter(name=["--cortex-id", "-c"])
-    ] = None,  # noqa
+    cortex_id: CortexIds = None,
+    all_cortices: AllCortices = False,
+    top_k: Annotated[int, cyclopts.Parameter(name=["--top-k", "-k"])] = 10,
+    no_cache: Annotated[bool, cyclopts.Parameter(name=["--no-cache"])] = False,
 ):
-    """Query a cortex with a natural language query."""
-    cmd_query(query_text)
+    """
+    Query a cortex with a natural language query.
+
+    Repeat -c (or pass --all) to query several cortices concurrently.
+    Scored results are merged by score and only the best --top-k are kept.
+    This needs a server that returns scored "results". A server that answers
+    with only its generated "response" has nothing to rank, so --top-k has no
+    effect and each cortex's answer is listed under "responses".
+    """
+    from .commands.query import cmd_query
+
+    cmd_query(
+        query_text,
+        cortex_ids=cortex_id,
+        all_cortices=all_cortices,
+        top_k=top_k,
+        use_cache=not no_cache,
+    )
 
 
 @synapso_cli.command(name="ask")
 def query_stream(
     query_text: Annotated[str, cyclopts.Parameter(name=["--query", "-q"])],
-    cortex_id: Annotated[
-        str | None, cyclopts.Parameter(name=["--cortex-id", "-c"])
-    ] = None,  # noqa
+    cortex_id: CortexIds = None,
+    all_cortices: AllCortices = False,
+    stats: Annotated[bool, cyclopts.Parameter(name=["--stats"])] = False,
+    no_cache: Annotated[bool, cyclopts.Parameter(name=["--no-cache"])] = False,
+):
+    """
+    Query a cortex with a natural language query and stream the results.
+
+    Repeat -c (or pass --all) to answer from several cortices at once. They
+    are sent as one request with a `cortex_ids` list, which needs a server
+    that accepts it; a server that ignores the field answers from its default
+    cortex. With --stats, time to first token, tokens/s and total time are printed to
+    stderr once the answer is complete. Repeated questions are answered from
+    the local result cache unless --no-cache is given.
+    """
+    from .commands.query import cmd_query_stream
+
+    cmd_query_stream(
+        query_text,
+        show_stats=stats,
+        cortex_ids=cortex_id,
+        all_cortices=all_cortices,
+        use_cache=not no_cache,
+    )
+
+
+@synapso_cli.command(name="query-batch")
+def query_batch(
+    input_path: Annotated[str, cyclopts.Parameter(name=["--input", "-i"])] = "-",
+    output_path: Annotated[
+        str | None, cyclopts.Parameter(name=["--output", "-o"])
+    ] = None,
+    concurrency: Annotated[int, cyclopts.Parameter(name=["--concurrency", "-j"])] = 8,
 ):
-    """Query a cortex with a natural language query and stream the results."""
-    cmd_query_stream(query_text)
+    """Run queries from a file or stdin and write the results as NDJSON."""
+    from .commands.query import cmd_query_batch
+
+    cmd_query_batch(input_path, output_path, concurrency)
+
+
+@synapso_cli.command
+def shell():
+    """Start an interactive session that keeps one warm server connection."""
+    from .commands.shell import cmd_shell
+
+    cmd_shell(synapso_cli)
+
+
+@synapso_cli.meta.default
+def _meta(
+    *tokens: Annotated[str, cyclopts.Parameter(show=False, allow_leading_hyphen=True)],
+    trace: Annotated[bool, cyclopts.Parameter(name=["--trace"])] = False,
+    trace_file: Annotated[str | None, cyclopts.Parameter(name=["--trace-file"])] = None,
+):
+    """
+    Options that apply to every command.
+
+    --trace prints a timing line per server request to stderr; --trace-file
+    appends the same spans as NDJSON. SYNAPSO_TRACE=1 or SYNAPSO_TRACE=<path>
+    does the same without the flags.
+    """
+    try:
+        if trace:
+            configure_tracing("stderr")
+        if trace_file:
+            configure_tracing(trace_file)
+        if not trace and not trace_file:
+            configure_tracing(os.getenv(TRACE_ENV_VAR))
+    except OSError as e:
+        sys.exit(f"Cannot open trace file: {e}")
+    synapso_cli(tokens)
+
+
+def main():
+    synapso_cli.meta()
 
 
 if __name__ == "__main__":
-    synapso_cli()
+    main()
@@ -0,0 +1,171 @@
+"""
+Client-side manifests of the files in each cortex folder.
+
+A manifest records the size, mtime and content hash of every file in a
+cortex's folder as of its last successful index. Comparing it with a fresh
+scan yields the files that were added, changed or deleted since, so an
+incremental index only has to send that delta to the server.
+"""
+
+import fnmatch
+import hashlib
+import json
+import os
+import stat
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from .paths import synapso_home
+
+MANIFEST_DIR = synapso_home() / "manifests"
+MANIFEST_VERSION = 1
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Editor swap/backup files, partial downloads and other transient files that
+# should never be indexed, nor trigger indexing.
+IGNORED_PATTERNS = (
+    "*.swp",
+    "*.swo",
+    "*.swx",
+    "*~",
+    ".#*",
+    "#*#",
+    "*.tmp",
+    "*.temp",
+    "*.part",
+    "*.crdownload",
+    ".~lock.*#",
+    "~$*",
+    ".DS_Store",
+    "4913",  # vim's write-permission probe
+)
+
+
+def is_ignored(name: str) -> bool:
+    """Return True if the file name `name` matches one of IGNORED_PATTERNS."""
+    return any(fnmatch.fnmatchcase(name, pattern) for pattern in IGNORED_PATTERNS)
+
+
+def manifest_path(cortex_id: str) -> Path:
+    return MANIFEST_DIR / f"{cortex_id}.json"
+
+
+def load_manifest(cortex_id: str, root: str) -> dict[str, dict]:
+    """
+    Return the files recorded for `cortex_id`, or {} if there is no usable
+    manifest (missing, unreadable, or taken of a different folder).
+    """
+    try:
+        with open(manifest_path(cortex_id), encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get("version") != MANIFEST_VERSION or manifest.get("root") != root:
+        return {}
+    return manifest.get("files", {})
+
+
+def save_manifest(cortex_id: str, root: str, files: dict[str, dict]):
+    """Write the manifest atomically, so a crash never leaves a partial one."""
+    manifest = {"version": MANIFEST_VERSION, "root": root, "files": files}
+    write_json_atomic(manifest_path(cortex_id), manifest)
+
+
+def write_json_atomic(path: Path, data):
+    """Write `data` as JSON to a temp file, then rename it over `path`."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+
+
+def _hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def stat_files(root: str) -> dict[str, os.stat_result]:
+    """Stat every regular file under `root`, skipping ignored files."""
+    stats = {}
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            if is_ignored(filename):
+                continue
+            path = os.path.join(dirpath, filename)
+            try:
+                st = os.stat(path, follow_symlinks=False)
+            except OSError:
+                continue  # Deleted mid-scan.
+            if stat.S_ISREG(st.st_mode):
+                stats[os.path.relpath(path, root)] = st
+    return stats
+
+
+def scan_folder(
+    root: str, previous: dict[str, dict] | None = None, workers: int | None = None
+) -> dict[str, dict]:
+    """
+    Return {relative path: {"size", "mtime_ns", "sha256"}} for every file
+    under `root` that is not ignored.
+
+    Files whose size and mtime match their entry in `previous` keep its
+    hash; only new or touched files are read, on a pool of `workers`
+    threads (hashlib releases the GIL while hashing).
+    """
+    previous = previous or {}
+    files: dict[str, dict] = {}
+    to_hash: list[str] = []
+    for rel_path, st in stat_files(root).items():
+        entry = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+        known = previous.get(rel_path)
+        if known and all(known.get(k) == v for k, v in entry.items()):
+            entry["sha256"] = known["sha256"]
+        else:
+            to_hash.append(rel_path)
+        files[rel_path] = entry
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        paths = (os.path.join(root, rel_path) for rel_path in to_hash)
+        for rel_path, digest in zip(to_hash, pool.map(_safe_hash, paths)):
+            if digest is None:
+                del files[rel_path]
+            else:
+                files[rel_path]["sha256"] = digest
+    return files
+
+
+def _safe_hash(path: str) -> str | None:
+    try:
+        return _hash_file(path)
+    except OSError:
+        return None
+
+
+def diff_manifests(
+    previous: dict[str, dict], current: dict[str, dict]
+) -> dict[str, list[str]]:
+    """Return the sorted relative paths that were added, changed or deleted."""
+    return {
+        "added": sorted(current.keys() - previous.keys()),
+        "changed": sorted(
+            path
+            for path in current.keys() & previous.keys()
+            if current[path]["sha256"] != previous[path]["sha256"]
+        ),
+        "deleted": sorted(previous.keys() - current.keys()),
+    }
+
+
+def is_empty_delta(delta: dict[str, list[str]]) -> bool:
+    return not any(delta.values())
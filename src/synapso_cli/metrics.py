@@ -0,0 +1,30 @@
+import math
+from collections.abc import Iterable
+
+
+def percentile(values: Iterable[float], p: float) -> float:
+    """Return the `p`-th percentile (0-100) of `values` by linear interpolation."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    if len(ordered) == 1:
+        return ordered[0]
+    rank = (len(ordered) - 1) * p / 100
+    low = math.floor(rank)
+    high = math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize_latencies(latencies: list[float], elapsed: float) -> dict[str, float]:
+    """Summarize per-request latencies (seconds) over a run of `elapsed` seconds."""
+    count = len(latencies)
+    return {
+        "count": count,
+        "elapsed_s": elapsed,
+        "qps": count / elapsed if elapsed > 0 else 0.0,
+        "mean_ms": (sum(latencies) / count * 1000) if count else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": max(latencies, default=0.0) * 1000,
+    }
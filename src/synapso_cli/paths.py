@@ -0,0 +1,17 @@
+"""
+Where the CLI keeps its state.
+
+Everything lives under SYNAPSO_HOME (default ~/.synapso). This module only
+uses the standard library, so any module can derive its paths from it at
+import time without slowing startup.
+"""
+
+import os
+from pathlib import Path
+
+DEFAULT_SYNAPSO_HOME = Path.home() / ".synapso"
+
+
+def synapso_home() -> Path:
+    """The SYNAPSO_HOME directory: $SYNAPSO_HOME if set, else ~/.synapso."""
+    return Path(os.getenv("SYNAPSO_HOME", DEFAULT_SYNAPSO_HOME)).expanduser()
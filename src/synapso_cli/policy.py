@@ -0,0 +1,382 @@
+"""
+Resilience policy for REST calls.
+
+Every call made through a `RequestPolicy` gets an overall deadline for its
+endpoint. Idempotent calls (GETs and `query`) are retried on transient
+failures with jittered exponential backoff. `query` can be hedged: if the
+first attempt hasn't answered within `hedge_after` seconds a second one is
+sent and whichever answers first wins. A circuit breaker counts consecutive
+server failures; once open, calls fail fast with `CircuitOpenError` until a
+trial call succeeds, and `on_circuit_open` is told so that e.g. the CLI can
+restart a wedged local server. Each of these is counted in `counters`.
+`call` runs blocking attempts and `acall` coroutines, under the same
+breaker and counters.
+"""
+
+import asyncio
+import os
+import random
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import TypeVar
+
+from .errors import (
+    CircuitOpenError,
+    DeadlineExceededError,
+    SynapsoHTTPError,
+    SynapsoRestClientError,
+)
+
+HEDGE_ENV_VAR = "SYNAPSO_HEDGE_AFTER_MS"
+
+# Overall seconds per call, retries and hedges included. Endpoints not listed
+# here are only bounded by their connect/read timeouts.
+DEFAULT_ENDPOINT_DEADLINES: dict[str, float] = {
+    "/": 2.0,
+    "/cortex/list": 30.0,
+    "/cortex": 30.0,
+    "/job/list_jobs": 30.0,
+    "/job/get_job": 30.0,
+    "/query/query": 120.0,
+}
+RETRYABLE_STATUS_CODES = frozenset({502, 503, 504})
+DEFAULT_MAX_RETRIES = 2
+DEFAULT_BACKOFF_BASE = 0.1
+DEFAULT_BACKOFF_CAP = 2.0
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RESET_TIMEOUT = 10.0
+
+COUNTER_NAMES = (
+    "calls",
+    "retries",
+    "hedges",
+    "hedge_wins",
+    "deadline_exceeded",
+    "failures",
+    "circuit_opened",
+    "short_circuited",
+)
+
+T = TypeVar("T")
+
+
+def is_server_failure(error: SynapsoRestClientError) -> bool:
+    """True for transport errors and 5xx answers; 4xx means the server is fine."""
+    if isinstance(error, SynapsoHTTPError):
+        return error.status_code >= 500
+    return not isinstance(error, (CircuitOpenError, DeadlineExceededError))
+
+
+def is_retryable(error: SynapsoRestClientError) -> bool:
+    if isinstance(error, SynapsoHTTPError):
+        return error.status_code in RETRYABLE_STATUS_CODES
+    return is_server_failure(error)
+
+
+def backoff_delay(retry: int, base: float, cap: float) -> float:
+    """Full-jitter exponential backoff before retry number `retry` (from 0)."""
+    return random.uniform(0, min(cap, base * 2**retry))
+
+
+def hedge_after_from_env() -> float | None:
+    """Return the hedging delay in seconds set by SYNAPSO_HEDGE_AFTER_MS."""
+    value = os.getenv(HEDGE_ENV_VAR)
+    try:
+        return float(value) / 1000 if value else None
+    except ValueError:
+        return None
+
+
+class CircuitBreaker:
+    """
+    Closed until `failure_threshold` consecutive failures, then open: calls
+    are refused for `reset_timeout` seconds, after which a single trial call
+    is let through (half-open). Its success closes the circuit again; its
+    failure reopens it.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        reset_timeout: float = DEFAULT_RESET_TIMEOUT,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if (
+                self.state == "open"
+                and time.monotonic() - self._opened_at >= self.reset_timeout
+            ):
+                self.state = "half_open"
+                self._trial_in_flight = False
+            if self.state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self) -> bool:
+        """Count a failure; return True if it opened the circuit."""
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.state == "half_open" or (
+                self.state == "closed" and self.failures >= self.failure_threshold
+            ):
+                self.state = "open"
+                self._opened_at = time.monotonic()
+                return True
+            return False
+
+
+class RequestPolicy:
+    """Deadlines, retries, hedging and circuit breaking for one client."""
+
+    def __init__(
+        self,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff_base: float = DEFAULT_BACKOFF_BASE,
+        backoff_cap: float = DEFAULT_BACKOFF_CAP,
+        endpoint_deadlines: dict[str, float] | None = None,
+        hedge_after: float | None = None,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        reset_timeout: float = DEFAULT_RESET_TIMEOUT,
+        on_circuit_open: Callable[[], None] | None = None,
+    ):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.endpoint_deadlines = {
+            **DEFAULT_ENDPOINT_DEADLINES,
+            **(endpoint_deadlines or {}),
+        }
+        self.hedge_after = hedge_after
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.on_circuit_open = on_circuit_open
+        self.counters: dict[str, int] = dict.fromkeys(COUNTER_NAMES, 0)
+        self._lock = threading.Lock()
+        self._executor: ThreadPoolExecutor | None = None
+
+    def close(self):
+        if self._executor is not None:
+            # Don't wait for the losing attempts of hedged calls.
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self.counters, "circuit": self.breaker.state}
+
+    def _count(self, name: str):
+        with self._lock:
+            self.counters[name] += 1
+
+    def _admit(self, endpoint: str) -> tuple[float | None, float | None]:
+        """Count a call and check the breaker; return its budget and deadline."""
+        self._count("calls")
+        if not self.breaker.allow():
+            self._count("short_circuited")
+            raise CircuitOpenError(
+                f"Server failed {self.breaker.failures} calls in a row; "
+                f"not calling {endpoint} until it recovers"
+            )
+        budget = self.endpoint_deadlines.get(endpoint)
+        deadline = time.monotonic() + budget if budget is not None else None
+        return budget, deadline
+
+    def _retry_delay(
+        self,
+        error: SynapsoRestClientError,
+        endpoint: str,
+        budget: float | None,
+        deadline: float | None,
+        retry: int,
+        retries: int,
+    ) -> float:
+        """
+        Account for a failed attempt. Return the backoff before the next one,
+        or raise if the call must fail: the error isn't retryable, retries are
+        used up, the circuit opened, or the backoff would pass the deadline.
+        """
+        if not is_server_failure(error):
+            self.breaker.record_success()
+            raise error
+        self._count("failures")
+        if self.breaker.record_failure():
+            self._open_circuit()
+            raise error
+        if retry >= retries or not is_retryable(error):
+            raise error
+        delay = backoff_delay(retry, self.backoff_base, self.backoff_cap)
+        if deadline is not None and time.monotonic() + delay >= deadline:
+            self._count("deadline_exceeded")
+            raise DeadlineExceededError(
+                f"{endpoint} did not succeed within its {budget:g} s deadline: {error}"
+            ) from error
+        self._count("retries")
+        return delay
+
+    def call(
+        self,
+        endpoint: str,
+        attempt: Callable[[float | None, int], T],
+        idempotent: bool,
+        hedge: bool = False,
+    ) -> T:
+        """
+        Run `attempt(remaining_seconds, retry)` under the policy and return
+        its result. `attempt` makes one request, bounding it by the seconds
+        left until the deadline (None if the endpoint has none); `retry` is
+        the number of retries before it (0 for the first attempt).
+        """
+        budget, deadline = self._admit(endpoint)
+        retries = self.max_retries if idempotent else 0
+        retry = 0
+        while True:
+            remaining = deadline - time.monotonic() if deadline is not None else None
+            try:
+                if hedge and self.hedge_after is not None:
+                    result = self._hedged(attempt, remaining, retry, self.hedge_after)
+                else:
+                    result = attempt(remaining, retry)
+            except SynapsoRestClientError as e:
+                time.sleep(
+                    self._retry_delay(e, endpoint, budget, deadline, retry, retries)
+                )
+                retry += 1
+                continue
+            self.breaker.record_success()
+            return result
+
+    async def acall(
+        self,
+        endpoint: str,
+        attempt: Callable[[float | None, int], Awaitable[T]],
+        idempotent: bool,
+        hedge: bool = False,
+    ) -> T:
+        """
+        `call` for coroutines. Each attempt is also cancelled once the
+        deadline passes, raising `DeadlineExceededError`.
+        """
+        budget, deadline = self._admit(endpoint)
+        retries = self.max_retries if idempotent else 0
+        retry = 0
+        while True:
+            remaining = deadline - time.monotonic() if deadline is not None else None
+            if hedge and self.hedge_after is not None:
+                pending = self._ahedged(attempt, remaining, retry, self.hedge_after)
+            else:
+                pending = attempt(remaining, retry)
+            try:
+                result = await asyncio.wait_for(pending, remaining)
+            except TimeoutError:
+                # An attempt still running at the deadline is a slow server.
+                self._count("failures")
+                if self.breaker.record_failure():
+                    self._open_circuit()
+                self._count("deadline_exceeded")
+                raise DeadlineExceededError(
+                    f"{endpoint} did not succeed within its {budget:g} s deadline"
+                ) from None
+            except SynapsoRestClientError as e:
+                await asyncio.sleep(
+                    self._retry_delay(e, endpoint, budget, deadline, retry, retries)
+                )
+                retry += 1
+                continue
+            self.breaker.record_success()
+            return result
+
+    def _open_circuit(self):
+        self._count("circuit_opened")
+        if self.on_circuit_open is not None:
+            try:
+                self.on_circuit_open()
+            except Exception:
+                pass
+
+    def _hedged(
+        self,
+        attempt: Callable[[float | None, int], T],
+        remaining: float | None,
+        retry: int,
+        hedge_after: float,
+    ) -> T:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=4, thread_name_prefix="synapso-hedge"
+            )
+        primary = self._executor.submit(attempt, remaining, retry)
+        try:
+            return primary.result(timeout=hedge_after)
+        except FutureTimeoutError:
+            pass
+        if remaining is not None:
+            remaining -= hedge_after
+        self._count("hedges")
+        backup = self._executor.submit(attempt, remaining, retry)
+        pending = {primary, backup}
+        errors: list[BaseException] = []
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if (error := future.exception()) is None:
+                    if future is backup:
+                        self._count("hedge_wins")
+                    return future.result()
+                errors.append(error)
+        raise errors[-1]
+
+    async def _ahedged(
+        self,
+        attempt: Callable[[float | None, int], Awaitable[T]],
+        remaining: float | None,
+        retry: int,
+        hedge_after: float,
+    ) -> T:
+        primary = asyncio.ensure_future(attempt(remaining, retry))
+        tasks = [primary]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+            if done:
+                return primary.result()
+            if remaining is not None:
+                remaining -= hedge_after
+            self._count("hedges")
+            backup = asyncio.ensure_future(attempt(remaining, retry))
+            tasks.append(backup)
+            pending = set(tasks)
+            errors: list[BaseException] = []
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if (error := task.exception()) is None:
+                        if task is backup:
+                            self._count("hedge_wins")
+                        return task.result()
+                    errors.append(error)
+            raise errors[-1]
+        finally:
+            # The losing attempt, or both if the call was cancelled.
+            for task in tasks:
+                task.cancel()
@@ -0,0 +1,269 @@
+"""
+On-disk cache of query and ask results.
+
+Entries are keyed by the kind of request, the query text, the cortex and a
+hash of the config sections that shape answers, and evicted least recently
+used first once the cache outgrows its size or entry budget. Index jobs
+submitted through the CLI are tracked, and a cortex's entries are dropped as
+soon as one of its jobs is seen to have finished.
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from .paths import synapso_home
+
+CACHE_PATH = synapso_home() / "query_cache.db"
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_MAX_ENTRIES = 10_000
+DEFAULT_TTL = 7 * 24 * 3600.0
+
+# Config sections whose settings change the answer to a query.
+ANSWER_CONFIG_SECTIONS = ("vectorizer", "chunker", "reranker", "summarizer")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    cortex TEXT NOT NULL,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at);
+CREATE INDEX IF NOT EXISTS entries_cortex ON entries (cortex);
+CREATE TABLE IF NOT EXISTS pending_index_jobs (
+    job_id TEXT PRIMARY KEY,
+    cortex TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+def config_fingerprint() -> str:
+    """Hash the answer-shaping sections of config.yaml ("default" without one)."""
+    from .config import get_config
+
+    try:
+        config = get_config()
+    except FileNotFoundError:
+        return "default"
+    sections = {
+        name: getattr(config, name).model_dump() for name in ANSWER_CONFIG_SECTIONS
+    }
+    encoded = json.dumps(sections, sort_keys=True).encode()
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+class QueryCache:
+    """
+    SQLite-backed LRU cache of query results.
+
+    `get`/`put` take the request kind ("query" or "ask"), the query text and
+    the cortex (None for queries across all cortices, comma-separated ids for
+    several). Values must be JSON serializable.
+    """
+
+    def __init__(
+        self,
+        path: Path = CACHE_PATH,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl: float = DEFAULT_TTL,
+        fingerprint: str | None = None,
+    ):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._fingerprint = fingerprint
+        self._conn: sqlite3.Connection | None = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    @property
+    def fingerprint(self) -> str:
+        if self._fingerprint is None:
+            self._fingerprint = config_fingerprint()
+        return self._fingerprint
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _key(self, kind: str, query: str, cortex: str | None) -> str:
+        raw = json.dumps([kind, query, cortex or "", self.fingerprint])
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def _count(self, name: str):
+        self.conn.execute(
+            "INSERT INTO counters (name, value) VALUES (?, 1) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + 1",
+            (name,),
+        )
+
+    def get(self, kind: str, query: str, cortex: str | None = None):
+        """Return the cached value, or None on a miss or an expired entry."""
+        key = self._key(kind, query, cortex)
+        row = self.conn.execute(
+            "SELECT value, created_at FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+        now = time.time()
+        if row is None or now - row[1] > self.ttl:
+            if row is not None:
+                self.conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._count("misses")
+            return None
+        self.conn.execute(
+            "UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key)
+        )
+        self._count("hits")
+        return json.loads(row[0])
+
+    def put(self, kind: str, query: str, value, cortex: str | None = None):
+        encoded = json.dumps(value)
+        now = time.time()
+        self.conn.execute(
+            "INSERT OR REPLACE INTO entries "
+            "(key, cortex, value, size, created_at, accessed_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                self._key(kind, query, cortex),
+                cortex or "",
+                encoded,
+                len(encoded),
+                now,
+                now,
+            ),
+        )
+        self._evict(now)
+
+    def _evict(self, now: float):
+        conn = self.conn
+        conn.execute("DELETE FROM entries WHERE created_at < ?", (now - self.ttl,))
+        count, size = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()
+        if count <= self.max_entries and size <= self.max_bytes:
+            return
+        rows = conn.execute(
+            "SELECT key, size FROM entries ORDER BY accessed_at"
+        ).fetchall()
+        stale = []
+        for key, entry_size in rows:
+            if count <= self.max_entries and size <= self.max_bytes:
+                break
+            stale.append((key,))
+            count -= 1
+            size -= entry_size
+        conn.executemany("DELETE FROM entries WHERE key = ?", stale)
+        conn.execute(
+            "INSERT INTO counters (name, value) VALUES ('evictions', ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            (len(stale),),
+        )
+
+    def invalidate(self, cortex: str | None = None) -> int:
+        """
+        Drop the entries of `cortex`, plus entries across all cortices or
+        several including it that may have drawn on it. With no cortex, drop
+        everything.
+        """
+        if cortex is None:
+            cursor = self.conn.execute("DELETE FROM entries")
+        else:
+            cursor = self.conn.execute(
+                "DELETE FROM entries WHERE cortex = '' "
+                "OR instr(',' || cortex || ',', ',' || ? || ',') > 0",
+                (cortex,),
+            )
+        return cursor.rowcount
+
+    def track_index_job(self, job_id: str, cortex: str | None):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO pending_index_jobs (job_id, cortex) VALUES (?, ?)",
+            (job_id, cortex or ""),
+        )
+
+    def has_pending_index_jobs(self) -> bool:
+        return (
+            self.conn.execute("SELECT 1 FROM pending_index_jobs LIMIT 1").fetchone()
+            is not None
+        )
+
+    def refresh_index_jobs(self, get_job: Callable[[str], dict]) -> bool:
+        """
+        Check tracked index jobs with `get_job`, invalidating the cortex of
+        each one that has finished. Return True if any are still running.
+        """
+        from .jobs import JOB_DONE_STATUSES
+
+        pending = self.conn.execute(
+            "SELECT job_id, cortex FROM pending_index_jobs"
+        ).fetchall()
+        running = False
+        for job_id, cortex in pending:
+            try:
+                status = get_job(job_id).get("status")
+            except Exception:
+                # Unknown to the server (e.g. restarted): assume it finished.
+                status = None
+            if status is not None and status not in JOB_DONE_STATUSES:
+                running = True
+                continue
+            # Indexed by name, the cortex id is unknown; drop everything.
+            self.invalidate(cortex or None)
+            self.conn.execute(
+                "DELETE FROM pending_index_jobs WHERE job_id = ?", (job_id,)
+            )
+        return running
+
+    def stats(self) -> dict:
+        count, size = self.conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()
+        counters = dict(self.conn.execute("SELECT name, value FROM counters"))
+        hits = counters.get("hits", 0)
+        misses = counters.get("misses", 0)
+        return {
+            "path": str(self.path),
+            "entries": count,
+            "size_bytes": size,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "ttl_s": self.ttl,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "evictions": counters.get("evictions", 0),
+            "pending_index_jobs": self.conn.execute(
+                "SELECT COUNT(*) FROM pending_index_jobs"
+            ).fetchone()[0],
+        }
+
+    def clear(self) -> int:
+        removed = self.invalidate()
+        self.conn.execute("DELETE FROM counters")
+        return removed
@@ -1,98 +1,417 @@
+import codecs
+import socket
+import threading
+import time
+from collections.abc import Callable, Iterator
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from . import tracing
+from .errors import SynapsoHTTPError, SynapsoRestClientError
+from .policy import RequestPolicy
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_CONNECT_TIMEOUT = 3.05
+DEFAULT_READ_TIMEOUT = 300
+
+# (connect, read) timeouts per endpoint. Endpoints not listed here fall back to
+# the client-wide connect/read timeouts.
+DEFAULT_ENDPOINT_TIMEOUTS: dict[str, tuple[float, float]] = {
+    "/": (1, 1),
+    "/cortex/list": (DEFAULT_CONNECT_TIMEOUT, 30),
+    "/cortex": (DEFAULT_CONNECT_TIMEOUT, 30),
+    "/job/list_jobs": (DEFAULT_CONNECT_TIMEOUT, 30),
+    "/job/get_job": (DEFAULT_CONNECT_TIMEOUT, 30),
+}
+
+
+# Seconds spent opening connections on this thread, for trace spans.
+_connect_time = threading.local()
+
 
+class _TimedHTTPConnection(HTTPConnection):
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _connect_time.seconds = (
+                getattr(_connect_time, "seconds", 0.0) + time.perf_counter() - start
+            )
 
-class SynapsoRestClientError(Exception):
+
+class _TimedHTTPSConnection(_TimedHTTPConnection, HTTPSConnection):
     pass
 
 
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection  # pyright: ignore[reportAssignmentType]
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection  # pyright: ignore[reportAssignmentType]
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """`HTTPAdapter` whose connections report how long they took to open."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
+
+
+class _UnixSocketConnection(_TimedHTTPConnection):
+    def __init__(self, *args, socket_path: str, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.socket_path = socket_path
+
+    def _new_conn(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()
+            raise
+        return sock
+
+
+class _UnixSocketConnectionPool(HTTPConnectionPool):
+    # urllib3's stubs declare ConnectionCls as protocols that its own
+    # connection classes don't match (Final class attributes), so any
+    # override is rejected.
+    ConnectionCls = _UnixSocketConnection  # pyright: ignore[reportAssignmentType]
+
+
+class UnixSocketAdapter(HTTPAdapter):
+    """Transport adapter that sends every request over one Unix domain socket."""
+
+    def __init__(self, socket_path: str, pool_maxsize: int = DEFAULT_POOL_SIZE):
+        super().__init__(pool_connections=1, pool_maxsize=pool_maxsize)
+        self.socket_path = socket_path
+        # Extra pool kwargs are handed to every new connection.
+        self._pool = _UnixSocketConnectionPool(
+            "localhost", maxsize=pool_maxsize, block=False, socket_path=socket_path
+        )
+
+    def get_connection_with_tls_context(self, request, verify, proxies=None, cert=None):
+        return self._pool
+
+    def get_connection(self, url, proxies=None):
+        return self._pool
+
+    def close(self):
+        super().close()
+        self._pool.close()
+
+
 def _handle_response(response: requests.Response):
     try:
         response.raise_for_status()
     except requests.exceptions.HTTPError as e:
-        raise SynapsoRestClientError(f"HTTP error: {e}") from e
+        raise SynapsoHTTPError(f"HTTP error: {e}", response.status_code) from e
     except requests.exceptions.RequestException as e:
         raise SynapsoRestClientError(f"Request error: {e}") from e
-    return response.json()
+    try:
+        return response.json()
+    except ValueError as e:
+        raise SynapsoRestClientError(f"Invalid JSON response: {e}") from e
+
+
+def build_query_payload(query: str, cortex_ids: list[str] | None) -> dict:
+    data: dict = {"query": query}
+    if cortex_ids and len(cortex_ids) == 1:
+        data["cortex_id"] = cortex_ids[0]
+    elif cortex_ids:
+        data["cortex_ids"] = list(cortex_ids)
+    return data
 
 
 class SynapsoRestClient:
-    def __init__(self, base_url: str):
+    """
+    Client for the Synapso REST API.
+
+    All requests go through a single `requests.Session`, so connections to the
+    server are pooled and kept alive between calls. Use the client as a context
+    manager (or call `close()`) to release the pool when done.
+
+    Pass `socket_path` to talk to a server listening on a Unix domain socket;
+    `base_url` then only supplies the Host header.
+
+    JSON calls run under `policy` (see `synapso_cli.policy`): per-endpoint
+    deadlines, retries of idempotent calls, optional hedging of `query` and a
+    circuit breaker. `policy.stats()` reports what it did.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        keep_alive: bool = True,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: float = DEFAULT_READ_TIMEOUT,
+        endpoint_timeouts: dict[str, tuple[float, float]] | None = None,
+        on_connection_error: Callable[[], None] | None = None,
+        socket_path: str | None = None,
+        policy: RequestPolicy | None = None,
+        on_request: Callable[[], None] | None = None,
+    ):
         if not base_url.startswith(("http://", "https://")):
             raise ValueError("base_url must start with 'http://' or 'https://'")
-        self.base_url = base_url
+        if pool_size < 1:
+            raise ValueError("pool_size must be at least 1")
+        self.base_url = base_url.rstrip("/")
+        self.pool_size = pool_size
+        self.keep_alive = keep_alive
+        self.socket_path = socket_path
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.endpoint_timeouts = {
+            **DEFAULT_ENDPOINT_TIMEOUTS,
+            **(endpoint_timeouts or {}),
+        }
+        # Called when the server can't be reached at all, e.g. so callers can
+        # drop any cached belief that it is up.
+        self.on_connection_error = on_connection_error
+        # Called before every request, e.g. to record that the server is in use.
+        self.on_request = on_request
+        self.policy = policy if policy is not None else RequestPolicy()
+        self._session: requests.Session | None = None
+
+    @property
+    def session(self) -> requests.Session:
+        if self._session is None:
+            session = requests.Session()
+            if self.socket_path:
+                adapter = UnixSocketAdapter(self.socket_path, self.pool_size)
+            else:
+                adapter = TimedHTTPAdapter(
+                    pool_connections=1, pool_maxsize=self.pool_size, pool_block=False
+                )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            if not self.keep_alive:
+                session.headers["Connection"] = "close"
+            self._session = session
+        return self._session
+
+    def close(self):
+        self.policy.close()
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def timeout_for(self, endpoint: str) -> tuple[float, float]:
+        return self.endpoint_timeouts.get(
+            endpoint, (self.connect_timeout, self.read_timeout)
+        )
+
+    def retarget(self, base_url: str, socket_path: str | None = None):
+        """Point the client at another server, e.g. one restarted elsewhere."""
+        self.base_url = base_url.rstrip("/")
+        self.socket_path = socket_path
+        # Pooled connections lead to the old address.
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    def _request(
+        self, method: str, endpoint: str, retries: int = 0, **kwargs
+    ) -> requests.Response:
+        """
+        Send one request. `retries` is how many attempts of the same call
+        came before it, as recorded in its trace span.
+        """
+        kwargs.setdefault("timeout", self.timeout_for(endpoint))
+        if self.on_request is not None:
+            self.on_request()
+        if not tracing.tracing_enabled():
+            return self._send(method, endpoint, **kwargs)
+
+        span = tracing.start_span(method, endpoint)
+        span["retries"] = retries
+        # Always stream so headers and body can be timed separately.
+        stream = kwargs.pop("stream", False)
+        _connect_time.seconds = 0.0
+        try:
+            response = self._send(method, endpoint, stream=True, **kwargs)
+        except SynapsoRestClientError as e:
+            span["connect_ms"] = _connect_time.seconds * 1000
+            tracing.finish_span(span, error=str(e))
+            raise
+        span["ttfb_ms"] = tracing.elapsed_ms(span)
+        span["connect_ms"] = _connect_time.seconds * 1000
+        span["status"] = response.status_code
+        if stream:
+            # The caller reads the body and finishes the span.
+            response.trace_span = span  # pyright: ignore[reportAttributeAccessIssue]
+            return response
+        try:
+            body = response.content
+        except requests.exceptions.RequestException as e:
+            tracing.finish_span(span, error=str(e))
+            raise SynapsoRestClientError(f"Request error: {e}") from e
+        tracing.finish_span(span, body_bytes=len(body))
+        return response
+
+    def _send(self, method: str, endpoint: str, **kwargs) -> requests.Response:
+        try:
+            return self.session.request(method, f"{self.base_url}{endpoint}", **kwargs)
+        except requests.exceptions.ConnectionError as e:
+            if self.on_connection_error is not None:
+                self.on_connection_error()
+            raise SynapsoRestClientError(f"Request error: {e}") from e
+        except requests.exceptions.RequestException as e:
+            raise SynapsoRestClientError(f"Request error: {e}") from e
+
+    def _call(
+        self,
+        method: str,
+        endpoint: str,
+        idempotent: bool | None = None,
+        hedge: bool = False,
+        **kwargs,
+    ):
+        """
+        Make a JSON call under the client's policy and return the decoded
+        body. Calls are idempotent, and so retried, if they are GETs unless
+        told otherwise.
+        """
+        if idempotent is None:
+            idempotent = method == "GET"
+        connect_timeout, read_timeout = self.timeout_for(endpoint)
+
+        def attempt(remaining: float | None, retry: int):
+            if remaining is not None:
+                read_timeout_left = max(0.001, min(read_timeout, remaining))
+            else:
+                read_timeout_left = read_timeout
+            timeout = (connect_timeout, read_timeout_left)
+            response = self._request(
+                method, endpoint, retries=retry, timeout=timeout, **kwargs
+            )
+            return _handle_response(response)
+
+        return self.policy.call(endpoint, attempt, idempotent=idempotent, hedge=hedge)
+
+    def health(self) -> bool:
+        """Return True if the server answers its health check."""
+        try:
+            response = self._request("GET", "/")
+            return (
+                response.status_code == 200
+                and response.json().get("message") == "Synapso API is running"
+            )
+        except (SynapsoRestClientError, ValueError):
+            return False
 
     def get_cortex_list(self):
-        response = requests.get(f"{self.base_url}/cortex/list", timeout=300)
-        return _handle_response(response)
+        return self._call("GET", "/cortex/list")
 
     def get_cortex(self, cortex_id: str | None = None, cortex_name: str | None = None):
-        url = f"{self.base_url}/cortex"
         params = {}
         if cortex_id:
             params["cortex_id"] = cortex_id
         if cortex_name:
             params["cortex_name"] = cortex_name
-        response = requests.get(url, params=params, timeout=300)
-        return _handle_response(response)
+        return self._call("GET", "/cortex", params=params)
 
     def create_cortex(self, path: str, cortex_name: str):
-        url = f"{self.base_url}/cortex/create"
         data = {
             "path": path,
             "name": cortex_name,
         }
-        response = requests.post(url, json=data, timeout=300)
-        return _handle_response(response)
+        return self._call("POST", "/cortex/create", json=data)
 
     def index_cortex(
-        self, cortex_id: str | None = None, cortex_name: str | None = None
+        self,
+        cortex_id: str | None = None,
+        cortex_name: str | None = None,
+        delta: dict[str, list[str]] | None = None,
     ):
-        url = f"{self.base_url}/cortex/index"
+        """
+        Submit an index job. With `delta` ({"added", "changed", "deleted"}
+        lists of file paths) only those files are (re)indexed or dropped.
+        """
         params = {}
         if cortex_id:
             params["cortex_id"] = cortex_id
         if cortex_name:
             params["cortex_name"] = cortex_name
-        response = requests.post(url, params=params, timeout=300)
-        return _handle_response(response)
+        data = {"files": delta} if delta is not None else None
+        return self._call("POST", "/cortex/index", params=params, json=data)
 
-    def query(self, query: str):
-        url = f"{self.base_url}/query/query"
+    def query(self, query: str, cortex_id: str | None = None):
         data = {
             "query": query,
         }
-        response = requests.post(url, json=data, timeout=300)
-        return _handle_response(response)
+        if cortex_id:
+            data["cortex_id"] = cortex_id
+        return self._call(
+            "POST", "/query/query", json=data, idempotent=True, hedge=True
+        )
 
     def system_init(self):
-        url = f"{self.base_url}/system/init"
-        response = requests.post(url, timeout=300)
-        return _handle_response(response)
+        return self._call("POST", "/system/init")
 
-    def query_stream(self, query: str):
-        url = f"{self.base_url}/query/query_stream"
-        data = {
-            "query": query,
-        }
-        with requests.post(url, json=data, timeout=300, stream=True) as response:
-            # Check if the request was successful
-            response.raise_for_status()
-
-            print("Server Response (Streaming):")
-            # iter_content lets us process the response chunk-by-chunk
-            # decode_unicode=True converts the raw bytes to text for us
-            for chunk in response.iter_content(chunk_size=None, decode_unicode=True):
-                if chunk:
-                    # Print each piece of text as it arrives
-                    # print(chunk, end="", flush=True)
-                    yield chunk
+    def rebuild_vector_index(self, settings: dict):
+        """Submit a job rebuilding the vector index with `settings`."""
+        return self._call("POST", "/vector/rebuild_index", json=settings)
+
+    def query_stream(
+        self, query: str, cortex_ids: list[str] | None = None
+    ) -> Iterator[str]:
+        """
+        Yield the streamed answer as text, chunk by chunk as it arrives.
+
+        Bytes are decoded incrementally, so a multi-byte UTF-8 character split
+        across network reads is held back until it is complete. With several
+        `cortex_ids`, the request carries a `cortex_ids` list; a server that
+        accepts it answers from the merged context of those cortices.
+        """
+        data = build_query_payload(query, cortex_ids)
+        with self._request(
+            "POST", "/query/query_stream", json=data, stream=True
+        ) as response:
+            span = getattr(response, "trace_span", None)
+            body_bytes = 0
+            error = None
+            try:
+                if not response.ok:
+                    _handle_response(response)
+                decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+                try:
+                    for chunk in response.iter_content(chunk_size=None):
+                        body_bytes += len(chunk)
+                        text = decoder.decode(chunk)
+                        if text:
+                            yield text
+                except requests.exceptions.RequestException as e:
+                    raise SynapsoRestClientError(f"Request error: {e}") from e
+                tail = decoder.decode(b"", final=True)
+                if tail:
+                    yield tail
+            except SynapsoRestClientError as e:
+                error = str(e)
+                raise
+            finally:
+                if span is not None:
+                    tracing.finish_span(span, body_bytes=body_bytes, error=error)
 
     def get_job_list(self):
-        url = f"{self.base_url}/job/list_jobs"
-        response = requests.get(url, timeout=300)
-        return _handle_response(response)
+        return self._call("GET", "/job/list_jobs")
 
     def get_job(self, job_id: str):
-        url = f"{self.base_url}/job/get_job"
-        response = requests.get(url, params={"job_id": job_id}, timeout=300)
-        return _handle_response(response)
+        return self._call("GET", "/job/get_job", params={"job_id": job_id})
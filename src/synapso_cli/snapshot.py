@@ -0,0 +1,320 @@
+"""
+Snapshots of the cortex stores.
+
+`export_snapshot` copies the meta, private and vector stores with SQLite's
+online backup API, which gives a consistent copy of each database while the
+server keeps running, and streams the copies into a gzip-compressed tar
+archive. The archive starts with `snapshot.json`, which records the
+vectorizer, chunker and quantization settings the stores were built with
+and the SHA-256 of every file. `import_snapshot` checks those settings
+against the current config before it reads anything else, and verifies
+every file while it is extracted. Both copy in fixed-size blocks, so memory stays bounded however
+large the stores are.
+
+The client-side cortex manifests are included too, so incremental indexing
+carries on from the snapshot rather than rescanning every folder.
+"""
+
+import hashlib
+import io
+import json
+import os
+import sqlite3
+import tarfile
+import tempfile
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from .db_maintenance import store_paths
+from .manifest import MANIFEST_DIR
+
+if TYPE_CHECKING:
+    from .config import GlobalConfig
+
+SNAPSHOT_VERSION = 1
+SNAPSHOT_MANIFEST = "snapshot.json"
+STORES_DIR = "stores"
+MANIFESTS_DIR = "manifests"
+COPY_CHUNK_SIZE = 1024 * 1024
+# Pages copied per step of the online backup; between steps the server's
+# writers get the database back.
+BACKUP_PAGES_PER_STEP = 4096
+
+# Settings that decide what is stored: a snapshot taken with other values
+# holds vectors or chunks the current models would not produce.
+VECTORIZER_FIELDS = ("vectorizer_type", "model_name")
+CHUNKER_FIELDS = ("chunker_type", "chunk_size", "chunk_overlap")
+# The index itself can be rebuilt, but quantized vectors can't be restored.
+VECTOR_STORE_FIELDS = ("quantization",)
+COMPATIBILITY_FIELDS = {
+    "vectorizer": VECTORIZER_FIELDS,
+    "chunker": CHUNKER_FIELDS,
+    "vector_store": VECTOR_STORE_FIELDS,
+}
+
+
+class SnapshotError(Exception):
+    """Raised for an unreadable, corrupt or incompatible snapshot."""
+
+
+def _compatibility(config: "GlobalConfig") -> dict:
+    return {
+        section: {f: getattr(getattr(config, section), f) for f in fields}
+        for section, fields in COMPATIBILITY_FIELDS.items()
+    }
+
+
+def check_compatible(snapshot: dict, config: "GlobalConfig"):
+    """Raise SnapshotError unless `snapshot` was taken with `config`'s models."""
+    current = _compatibility(config)
+    mismatches = [
+        f"{section}.{field}: snapshot has {snapshot_value!r}, config has {value!r}"
+        for section, fields in current.items()
+        for field, value in fields.items()
+        if (snapshot_value := snapshot.get(section, {}).get(field)) != value
+    ]
+    if mismatches:
+        raise SnapshotError(
+            "Snapshot is incompatible with the current config:\n  "
+            + "\n  ".join(mismatches)
+        )
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(COPY_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _backup(source: Path, target: Path):
+    """Copy a live database to `target` with the online backup API."""
+    with closing(sqlite3.connect(f"{source.as_uri()}?mode=ro", uri=True)) as src:
+        with closing(sqlite3.connect(target)) as dst:
+            src.backup(dst, pages=BACKUP_PAGES_PER_STEP)
+            # The copy travels alone, so fold any WAL back into the file.
+            dst.execute("PRAGMA journal_mode=DELETE").fetchall()
+
+
+def _add_json(tar: tarfile.TarFile, name: str, data):
+    raw = json.dumps(data, indent=2).encode("utf-8")
+    info = tarfile.TarInfo(name)
+    info.size = len(raw)
+    info.mtime = int(time.time())
+    tar.addfile(info, io.BytesIO(raw))
+
+
+def export_snapshot(
+    config: "GlobalConfig", output: Path, compresslevel: int = 6
+) -> dict:
+    """Write a snapshot of the stores to `output`; return its snapshot.json."""
+    output = Path(output).expanduser()
+    output.parent.mkdir(parents=True, exist_ok=True)
+    sources = {
+        name: path for name, path in store_paths(config).items() if path.exists()
+    }
+    if not sources:
+        raise SnapshotError("No stores found; nothing to export")
+
+    snapshot = {
+        "version": SNAPSHOT_VERSION,
+        "created": time.time(),
+        **_compatibility(config),
+        "stores": {},
+        "manifests": {},
+    }
+    # Backups are staged next to the output, so the disk that has room for
+    # the archive is the one that holds them.
+    with tempfile.TemporaryDirectory(dir=output.parent, prefix=".snapshot-") as tmp:
+        staged = {}
+        for name, source in sources.items():
+            copy = Path(tmp) / f"{name}.db"
+            _backup(source, copy)
+            staged[f"{STORES_DIR}/{name}.db"] = copy
+            snapshot["stores"][name] = {
+                "file": f"{STORES_DIR}/{name}.db",
+                "size": copy.stat().st_size,
+                "sha256": _sha256(copy),
+            }
+        for manifest in sorted(MANIFEST_DIR.glob("*.json")):
+            staged[f"{MANIFESTS_DIR}/{manifest.name}"] = manifest
+            snapshot["manifests"][manifest.name] = _sha256(manifest)
+
+        partial = output.with_name(output.name + ".partial")
+        try:
+            with tarfile.open(partial, "w:gz", compresslevel=compresslevel) as tar:
+                _add_json(tar, SNAPSHOT_MANIFEST, snapshot)
+                for arcname, path in staged.items():
+                    tar.add(path, arcname=arcname, recursive=False)
+            os.replace(partial, output)
+        except BaseException:
+            partial.unlink(missing_ok=True)
+            raise
+    return snapshot
+
+
+def read_snapshot_manifest(archive: Path) -> dict:
+    """Return the snapshot.json of `archive` without reading the rest."""
+    try:
+        with tarfile.open(archive, "r|gz") as tar:
+            return _read_manifest_member(tar)
+    except (OSError, tarfile.TarError) as e:
+        raise SnapshotError(f"Cannot read snapshot {archive}: {e}") from e
+
+
+def _read_manifest_member(tar: tarfile.TarFile) -> dict:
+    member = tar.next()
+    if member is None or member.name != SNAPSHOT_MANIFEST:
+        raise SnapshotError(
+            f"Not a snapshot: it does not start with {SNAPSHOT_MANIFEST}"
+        )
+    source = tar.extractfile(member)
+    if source is None:
+        raise SnapshotError(f"Corrupt {SNAPSHOT_MANIFEST}: not a regular file")
+    try:
+        snapshot = json.load(source)
+    except ValueError as e:
+        raise SnapshotError(f"Corrupt {SNAPSHOT_MANIFEST}: {e}") from e
+    if not isinstance(snapshot, dict):
+        raise SnapshotError(f"Corrupt {SNAPSHOT_MANIFEST}: not a JSON object")
+    if snapshot.get("version") != SNAPSHOT_VERSION:
+        raise SnapshotError(
+            f"Unsupported snapshot version {snapshot.get('version')!r}; "
+            f"expected {SNAPSHOT_VERSION}"
+        )
+    _validate_manifest(snapshot)
+    return snapshot
+
+
+def _is_sha256(value) -> bool:
+    return (
+        isinstance(value, str)
+        and len(value) == 64
+        and all(c in "0123456789abcdef" for c in value)
+    )
+
+
+def _validate_manifest(snapshot: dict):
+    """Raise SnapshotError unless the entries `import_snapshot` reads are sound."""
+    stores = snapshot.get("stores")
+    manifests = snapshot.get("manifests")
+    if not isinstance(stores, dict) or not isinstance(manifests, dict):
+        raise SnapshotError(
+            f"Corrupt {SNAPSHOT_MANIFEST}: missing its stores or manifests"
+        )
+    for name, entry in stores.items():
+        if not (
+            isinstance(entry, dict)
+            and entry.get("file") == f"{STORES_DIR}/{name}.db"
+            and _is_sha256(entry.get("sha256"))
+        ):
+            raise SnapshotError(
+                f"Corrupt {SNAPSHOT_MANIFEST}: bad entry for store {name!r}"
+            )
+    for name, sha256 in manifests.items():
+        # Names become paths under MANIFEST_DIR, so nothing may lead out of it.
+        if Path(name).name != name or not name.endswith(".json"):
+            raise SnapshotError(f"Corrupt {SNAPSHOT_MANIFEST}: bad manifest {name!r}")
+        if not _is_sha256(sha256):
+            raise SnapshotError(
+                f"Corrupt {SNAPSHOT_MANIFEST}: bad checksum for manifest {name!r}"
+            )
+    for section in COMPATIBILITY_FIELDS:
+        if not isinstance(snapshot.get(section, {}), dict):
+            raise SnapshotError(f"Corrupt {SNAPSHOT_MANIFEST}: bad {section!r}")
+
+
+def _extract_verified(
+    tar: tarfile.TarFile, member: tarfile.TarInfo, target: Path, expected: str
+):
+    digest = hashlib.sha256()
+    source = tar.extractfile(member)
+    if source is None:
+        raise SnapshotError(f"{member.name} in the snapshot is not a regular file")
+    with open(target, "wb") as f:
+        while chunk := source.read(COPY_CHUNK_SIZE):
+            digest.update(chunk)
+            f.write(chunk)
+        f.flush()
+        os.fsync(f.fileno())
+    if digest.hexdigest() != expected:
+        raise SnapshotError(f"Checksum mismatch for {member.name}")
+
+
+def _check_database(path: Path) -> bool:
+    with closing(sqlite3.connect(f"{path.as_uri()}?mode=ro", uri=True)) as conn:
+        return conn.execute("PRAGMA quick_check").fetchall() == [("ok",)]
+
+
+def _replace_database(staged: Path, target: Path):
+    # A WAL or shared-memory file left by the old database would be applied
+    # to the restored one.
+    for suffix in ("-wal", "-shm", "-journal"):
+        target.with_name(target.name + suffix).unlink(missing_ok=True)
+    os.replace(staged, target)
+
+
+def import_snapshot(config: "GlobalConfig", archive: Path) -> dict:
+    """
+    Restore the stores (and cortex manifests) from `archive`; return its
+    snapshot.json. The server must be stopped. Nothing is replaced unless the
+    snapshot is compatible and every file in it checks out.
+    """
+    archive = Path(archive).expanduser()
+    targets = store_paths(config)
+    # Final path -> extracted temp file next to it, for stores and manifests.
+    databases: dict[Path, Path] = {}
+    manifests: dict[Path, Path] = {}
+    try:
+        with tarfile.open(archive, "r|gz") as tar:
+            snapshot = _read_manifest_member(tar)
+            check_compatible(snapshot, config)
+            expected: dict[str, tuple[Path, dict[Path, Path], str]] = {}
+            for name, entry in snapshot["stores"].items():
+                if name not in targets:
+                    raise SnapshotError(f"Unknown store in snapshot: {name}")
+                expected[entry["file"]] = (targets[name], databases, entry["sha256"])
+            for name, sha256 in snapshot["manifests"].items():
+                target = MANIFEST_DIR / name
+                expected[f"{MANIFESTS_DIR}/{name}"] = (target, manifests, sha256)
+
+            # Iterating the archive would start over with snapshot.json.
+            while (member := tar.next()) is not None:
+                if member.name not in expected or not member.isfile():
+                    raise SnapshotError(f"Unexpected entry in snapshot: {member.name}")
+                target, staged, sha256 = expected.pop(member.name)
+                target.parent.mkdir(parents=True, exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(
+                    dir=target.parent, prefix=f".{target.name}."
+                )
+                os.close(fd)
+                staged[target] = Path(tmp_path)
+                _extract_verified(tar, member, staged[target], sha256)
+            if expected:
+                raise SnapshotError(
+                    f"Snapshot is missing {', '.join(sorted(expected))}"
+                )
+        for target, path in databases.items():
+            if not _check_database(path):
+                raise SnapshotError(f"{target.name} in the snapshot failed quick_check")
+    except (OSError, tarfile.TarError, sqlite3.Error) as e:
+        _discard(databases, manifests)
+        raise SnapshotError(f"Cannot restore snapshot {archive}: {e}") from e
+    except BaseException:
+        _discard(databases, manifests)
+        raise
+
+    for target, path in databases.items():
+        _replace_database(path, target)
+    for target, path in manifests.items():
+        os.replace(path, target)
+    return snapshot
+
+
+def _discard(*staged: dict[Path, Path]):
+    for files in staged:
+        for path in files.values():
+            path.unlink(missing_ok=True)
@@ -0,0 +1,216 @@
+"""
+In-process stand-in for the Synapso API, used by `synapso bench`.
+
+It answers the endpoints the CLI talks to with canned payloads after a
+configurable delay, so the client paths can be benchmarked offline and in CI
+without the real server or its models.
+"""
+
+import hashlib
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+class StandInServer:
+    """
+    Serve a fake Synapso API on 127.0.0.1 from a background thread.
+
+    `latency_ms` delays every response, `payload_bytes` sets the size of query
+    answers (streamed answers are split into `stream_tokens` chunks spaced
+    `token_interval_ms` apart), and index jobs complete `index_ms` after they
+    are submitted. Job lookups carry ETags and honour If-None-Match. Use it
+    as a context manager.
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = 5.0,
+        payload_bytes: int = 2048,
+        stream_tokens: int = 64,
+        token_interval_ms: float = 2.0,
+        index_ms: float = 200.0,
+    ):
+        self.latency_ms = latency_ms
+        self.payload_bytes = payload_bytes
+        self.stream_tokens = max(1, stream_tokens)
+        self.token_interval_ms = token_interval_ms
+        self.index_ms = index_ms
+        self.cortices: dict[str, dict] = {}
+        self.jobs: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._httpd: ThreadingHTTPServer | None = None
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        if self._httpd is None:
+            raise RuntimeError("Stand-in server is not running")
+        return f"http://127.0.0.1:{self._httpd.server_address[1]}"
+
+    def start(self) -> "StandInServer":
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), _make_handler(self))
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def answer(self) -> str:
+        return ("lorem ipsum " * (self.payload_bytes // 12 + 1))[: self.payload_bytes]
+
+    def create_cortex(self, path: str, name: str) -> dict:
+        cortex = {"id": uuid.uuid4().hex, "name": name, "path": path}
+        with self._lock:
+            self.cortices[cortex["id"]] = cortex
+        return cortex
+
+    def submit_index_job(self, cortex_id: str | None) -> dict:
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "cortex_id": cortex_id,
+            "submitted_at": time.time(),
+        }
+        with self._lock:
+            self.jobs[job["job_id"]] = job
+        return self._status(job)
+
+    def job_status(self, job_id: str) -> dict | None:
+        with self._lock:
+            job = self.jobs.get(job_id)
+        return None if job is None else self._status(job)
+
+    def _status(self, job: dict) -> dict:
+        done = time.time() - job["submitted_at"] >= self.index_ms / 1000
+        return {
+            "job_id": job["job_id"],
+            "cortex_id": job["cortex_id"],
+            "status": "completed" if done else "running",
+        }
+
+
+def _make_handler(server: StandInServer) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        # Keep-alive, so pooled clients are measured the way they really run.
+        protocol_version = "HTTP/1.1"
+        # Headers and body go out in separate writes; with Nagle's algorithm
+        # the body then waits for the client's delayed ACK (~40 ms a call).
+        disable_nagle_algorithm = True
+
+        def log_message(self, format, *args):
+            pass
+
+        def _params(self) -> dict[str, str]:
+            query = parse_qs(urlsplit(self.path).query)
+            return {key: values[0] for key, values in query.items()}
+
+        def _body(self) -> dict:
+            length = int(self.headers.get("Content-Length") or 0)
+            return json.loads(self.rfile.read(length) or b"{}") if length else {}
+
+        def _send_json(self, payload, status: int = 200, etag: str | None = None):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            if etag is not None:
+                self.send_header("ETag", etag)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _send_conditional(self, payload):
+            """Send `payload`, or 304 Not Modified if the client already has it."""
+            digest = hashlib.sha1(json.dumps(payload, sort_keys=True).encode())
+            etag = f'"{digest.hexdigest()}"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self._send_json(payload, etag=etag)
+
+        def _send_stream(self, text: str):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; charset=utf-8")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            size = max(1, -(-len(text) // server.stream_tokens))
+            for i in range(0, len(text), size):
+                if i:
+                    time.sleep(server.token_interval_ms / 1000)
+                chunk = text[i : i + size].encode()
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+                self.wfile.flush()
+            self.wfile.write(b"0\r\n\r\n")
+
+        def _route(self, method: str):
+            path = urlsplit(self.path).path
+            body = self._body() if method == "POST" else {}
+            params = self._params()
+            time.sleep(server.latency_ms / 1000)
+
+            if method == "GET" and path == "/":
+                return self._send_json({"message": "Synapso API is running"})
+            if method == "POST" and path == "/query/query":
+                return self._send_json(
+                    {"query": body.get("query"), "response": server.answer()}
+                )
+            if method == "POST" and path == "/query/query_stream":
+                return self._send_stream(server.answer())
+            if method == "POST" and path == "/system/init":
+                return self._send_json(
+                    {
+                        "meta_store_initialized": True,
+                        "vector_store_initialized": True,
+                        "chunk_store_initialized": True,
+                    }
+                )
+            if method == "GET" and path == "/cortex/list":
+                return self._send_json({"cortices": list(server.cortices.values())})
+            if method == "GET" and path == "/cortex":
+                cortex = server.cortices.get(params.get("cortex_id", ""))
+                if cortex is None:
+                    return self._send_json({"detail": "Cortex not found"}, 404)
+                return self._send_json({"cortex": cortex})
+            if method == "POST" and path == "/cortex/create":
+                cortex = server.create_cortex(
+                    body.get("path", ""), body.get("name", "")
+                )
+                return self._send_json({"cortex": cortex})
+            if method == "POST" and path == "/cortex/index":
+                return self._send_json(server.submit_index_job(params.get("cortex_id")))
+            if method == "POST" and path == "/vector/rebuild_index":
+                return self._send_json(server.submit_index_job(None))
+            if method == "GET" and path == "/job/list_jobs":
+                jobs = [server.job_status(job_id) for job_id in list(server.jobs)]
+                return self._send_json({"jobs": jobs})
+            if method == "GET" and path == "/job/get_job":
+                job = server.job_status(params.get("job_id", ""))
+                if job is None:
+                    return self._send_json({"detail": "Job not found"}, 404)
+                return self._send_conditional(job)
+            return self._send_json({"detail": "Not Found"}, 404)
+
+        def do_GET(self):
+            self._route("GET")
+
+        def do_POST(self):
+            self._route("POST")
+
+    return Handler
@@ -0,0 +1,77 @@
+import os
+import sys
+import time
+from collections.abc import Iterable
+from typing import BinaryIO, cast
+
+
+def render_stream(chunks: Iterable[str], output: BinaryIO | None = None) -> dict:
+    """
+    Write streamed text to `output` as it arrives and return timing stats.
+
+    Each chunk is encoded and written straight to the binary stream and
+    flushed, with no intermediate buffering. Writes block while a slow pipe
+    reader catches up, which in turn stops us reading from the server, so
+    memory stays flat however far behind the reader falls. If the reader goes
+    away (e.g. `synapso ask ... | head`), the stream is abandoned quietly.
+
+    The returned dict has `ttft_ms` (time to the first chunk), `total_ms`,
+    `chunks`, `chars` and `chunks_per_s`. The server streams one token per
+    chunk, so `chunks_per_s` is the token rate.
+    """
+    if output is None:
+        # Anything already printed through the text layer must come first.
+        sys.stdout.flush()
+        # typeshed leaves sys.stdout loosely typed, which would undo the
+        # narrowing of `output`.
+        output = cast(BinaryIO, sys.stdout.buffer)
+    write = output.write
+    flush = output.flush
+
+    start = time.perf_counter()
+    first_chunk_at = None
+    count = 0
+    chars = 0
+    iterator = iter(chunks)
+    try:
+        for chunk in iterator:
+            if first_chunk_at is None:
+                first_chunk_at = time.perf_counter()
+            write(chunk.encode("utf-8"))
+            flush()
+            count += 1
+            chars += len(chunk)
+    except BrokenPipeError:
+        _silence_stdout(output)
+    finally:
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            # Releases the HTTP response if we stopped early.
+            close()
+    end = time.perf_counter()
+
+    ttft = (first_chunk_at or end) - start
+    generation = end - (first_chunk_at or end)
+    return {
+        "ttft_ms": ttft * 1000,
+        "total_ms": (end - start) * 1000,
+        "chunks": count,
+        "chars": chars,
+        "chunks_per_s": count / generation if generation > 0 else 0.0,
+    }
+
+
+def _silence_stdout(output: BinaryIO):
+    # Point stdout at /dev/null so the interpreter's final flush doesn't raise
+    # another BrokenPipeError on exit.
+    if output is getattr(sys.stdout, "buffer", None):
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        os.close(devnull)
+
+
+def format_stream_stats(stats: dict) -> str:
+    return (
+        f"[ttft {stats['ttft_ms']:.0f} ms, {stats['chunks_per_s']:.1f} tokens/s, "
+        f"total {stats['total_ms']:.0f} ms]"
+    )
@@ -0,0 +1,188 @@
+"""
+Idle and memory supervision of the local server.
+
+Runs inside the telemetry sampler that is started with the server, checking
+each sample. The server is stopped once the CLI has left it alone for the
+idle timeout; the next command starts it again through `ensure_server()`.
+It is restarted once its process tree stays above the memory ceiling. Both
+wait while an index job is running, so neither interrupts one.
+
+The sampler runs at a lowered priority, which every process it starts would
+inherit, so restarts go through a `ServerLauncher` forked before it lowered
+it.
+"""
+
+import json
+import os
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from .commands.server import (
+    CONFIG_PATH,
+    HEARTBEAT_PATH,
+    _client_kwargs,
+    _terminate_server,
+    get_server_config,
+    launch_server,
+)
+from .errors import SynapsoRestClientError
+from .jobs import is_job_done
+from .paths import synapso_home
+
+SUPERVISOR_LOG_PATH = synapso_home() / "supervisor.log"
+# Consecutive samples above the memory ceiling before restarting, so a
+# short spike doesn't cost a restart.
+MEMORY_STRIKES = 3
+
+
+def _mtime(path: Path) -> float:
+    try:
+        return path.stat().st_mtime
+    except OSError:
+        return 0.0
+
+
+def last_activity() -> float:
+    """When the CLI last used the server: its latest request or launch."""
+    return max(_mtime(HEARTBEAT_PATH), _mtime(CONFIG_PATH))
+
+
+class ServerLauncher:
+    """
+    Child process that launches servers on request. Fork it before lowering
+    the caller's priority: servers it starts keep the priority it had then.
+    """
+
+    def __init__(self, launch: Callable[[], dict] = launch_server):
+        requests_fd, self._requests_fd = os.pipe()
+        self._replies_fd, replies_fd = os.pipe()
+        self.pid = os.fork()
+        if self.pid == 0:
+            os.close(self._requests_fd)
+            os.close(self._replies_fd)
+            try:
+                _serve_launches(requests_fd, replies_fd, launch)
+            finally:
+                os._exit(0)
+        os.close(requests_fd)
+        os.close(replies_fd)
+        self._requests = os.fdopen(self._requests_fd, "w")
+        self._replies = os.fdopen(self._replies_fd)
+
+    def launch(self) -> dict:
+        """Launch a server in the child; return its config."""
+        self._requests.write("launch\n")
+        self._requests.flush()
+        line = self._replies.readline()
+        if not line:
+            raise RuntimeError("Server launcher exited")
+        reply = json.loads(line)
+        if "error" in reply:
+            raise RuntimeError(reply["error"])
+        return reply["config"]
+
+    def close(self):
+        # End of input stops the child.
+        self._requests.close()
+        self._replies.close()
+        os.waitpid(self.pid, 0)
+
+
+def _serve_launches(requests_fd: int, replies_fd: int, launch: Callable[[], dict]):
+    with os.fdopen(requests_fd) as requests, os.fdopen(replies_fd, "w") as replies:
+        for _ in requests:
+            try:
+                reply = {"config": launch()}
+            except Exception as e:
+                reply = {"error": str(e)}
+            replies.write(json.dumps(reply) + "\n")
+            replies.flush()
+
+
+class IdleSupervisor:
+    """
+    Telemetry sample hook stopping an idle server and restarting one that
+    outgrew its memory ceiling. Returns False once it has done either, which
+    ends this sampler; a restarted server brings its own, started by
+    `launcher` if given.
+    """
+
+    def __init__(
+        self,
+        idle_timeout: float | None,
+        max_rss_mb: float | None,
+        launcher: ServerLauncher | None = None,
+    ):
+        self.idle_timeout = idle_timeout
+        self.max_rss = max_rss_mb * 2**20 if max_rss_mb is not None else None
+        self.launcher = launcher
+        self._strikes = 0
+
+    def __call__(self, sample: dict) -> bool:
+        max_rss = self.max_rss
+        if max_rss is not None and sample["rss"] > max_rss:
+            self._strikes += 1
+        else:
+            self._strikes = 0
+
+        if max_rss is not None and self._strikes >= MEMORY_STRIKES and not self._busy():
+            self._log(
+                f"RSS {sample['rss'] / 2**20:.0f} MB is over the "
+                f"{max_rss / 2**20:.0f} MB ceiling; restarting the server"
+            )
+            return not self._replace(restart=True)
+
+        idle_for = time.time() - last_activity()
+        if (
+            self.idle_timeout is not None
+            and idle_for >= self.idle_timeout
+            and not self._busy()
+        ):
+            self._log(f"Idle for {idle_for / 60:.1f} min; stopping the server")
+            return not self._replace(restart=False)
+        return True
+
+    def _busy(self) -> bool:
+        """True if the server reports an unfinished job."""
+        from .policy import RequestPolicy
+        from .rest_client import SynapsoRestClient
+
+        config = get_server_config()
+        if not config:
+            return False
+        # No heartbeat hook: these checks must not count as activity.
+        client = SynapsoRestClient(
+            **_client_kwargs(config), policy=RequestPolicy(max_retries=0)
+        )
+        try:
+            with client:
+                jobs = client.get_job_list().get("jobs", [])
+        except SynapsoRestClientError:
+            return False
+        return any(job and not is_job_done(job) for job in jobs)
+
+    def _replace(self, restart: bool) -> bool:
+        """Stop the server, and start a fresh one if `restart`. True on success."""
+        config = get_server_config()
+        try:
+            if config:
+                _terminate_server(config)
+            if restart:
+                if self.launcher is None:
+                    config = launch_server()
+                else:
+                    config = self.launcher.launch()
+                self._log(f"Server restarted (pid {config['pid']})")
+        except Exception as e:
+            self._log(f"Failed to {'restart' if restart else 'stop'} server: {e}")
+            return False
+        return True
+
+    def _log(self, message: str):
+        try:
+            SUPERVISOR_LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
+            with open(SUPERVISOR_LOG_PATH, "a", encoding="utf-8") as f:
+                f.write(f"{time.strftime('%Y-%m-%d %H:%M:%S')} {message}\n")
+        except OSError:
+            pass
@@ -0,0 +1,291 @@
+"""
+Resource telemetry for the local server.
+
+A sampler process started alongside the server records, every few seconds,
+the memory, CPU, thread, file descriptor and I/O usage of the server's
+process tree (supervisor plus workers) into a fixed-size ring buffer file
+under SYNAPSO_HOME. Each sample is one 60-byte record written in place, so
+the file never grows and sampling costs a handful of /proc reads. `synapso
+server stats` summarizes the buffer; `synapso server top` samples live.
+
+Run the sampler with `python -m synapso_cli.telemetry <server pid>`; with
+--idle-timeout or --max-rss-mb it also supervises the server (see
+`synapso_cli.supervisor`).
+"""
+
+import argparse
+import os
+import struct
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO
+
+from .paths import synapso_home
+
+if TYPE_CHECKING:
+    import psutil
+
+TELEMETRY_PATH = synapso_home() / "server_telemetry.bin"
+DEFAULT_SAMPLE_INTERVAL = 5.0
+# A day of samples at the default interval.
+DEFAULT_CAPACITY = 17_280
+
+_MAGIC = b"SYNT"
+_VERSION = 1
+_HEADER = struct.Struct("<4sIIQ")  # magic, version, capacity, samples written
+_RECORD = struct.Struct("<dIQQdIIQQ")
+RECORD_FIELDS = (
+    "timestamp",
+    "processes",
+    "rss",
+    "uss",
+    "cpu_percent",
+    "threads",
+    "fds",
+    "read_bytes",
+    "write_bytes",
+)
+
+
+class TelemetryRing:
+    """
+    Ring buffer of samples in a file: a header followed by `capacity`
+    fixed-size records, the oldest overwritten first. Meant for a single
+    writer; readers tolerate a concurrent append.
+    """
+
+    def __init__(self, path: Path = TELEMETRY_PATH, capacity: int = DEFAULT_CAPACITY):
+        self.path = Path(path)
+        self.capacity = capacity
+        self._file: BinaryIO | None = None
+        self._count = 0
+
+    def _open_for_append(self) -> BinaryIO:
+        if self._file is not None:
+            return self._file
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        header = self._read_header()
+        if header is not None and header[1] == self.capacity:
+            self._file = open(self.path, "r+b")
+            self._count = header[2]
+        else:
+            # Missing, foreign or resized: start over.
+            self._file = open(self.path, "w+b")
+            self._count = 0
+            self._write_header(self._file)
+        return self._file
+
+    def _read_header(self) -> tuple[int, int, int] | None:
+        try:
+            with open(self.path, "rb") as f:
+                raw = f.read(_HEADER.size)
+        except OSError:
+            return None
+        if len(raw) < _HEADER.size:
+            return None
+        magic, version, capacity, count = _HEADER.unpack(raw)
+        if magic != _MAGIC:
+            return None
+        return version, capacity, count
+
+    def _write_header(self, f: BinaryIO):
+        f.seek(0)
+        f.write(_HEADER.pack(_MAGIC, _VERSION, self.capacity, self._count))
+
+    def append(self, sample: dict):
+        f = self._open_for_append()
+        f.seek(_HEADER.size + (self._count % self.capacity) * _RECORD.size)
+        f.write(_RECORD.pack(*(sample[field] for field in RECORD_FIELDS)))
+        self._count += 1
+        self._write_header(f)
+        f.flush()
+
+    def read(self, since: float | None = None) -> list[dict]:
+        """Return the recorded samples, oldest first, optionally from `since`."""
+        header = self._read_header()
+        if header is None or header[0] != _VERSION:
+            return []
+        _, capacity, count = header
+        with open(self.path, "rb") as f:
+            f.seek(_HEADER.size)
+            raw = f.read(min(count, capacity) * _RECORD.size)
+        usable = len(raw) - len(raw) % _RECORD.size
+        samples = [
+            dict(zip(RECORD_FIELDS, values))
+            for values in _RECORD.iter_unpack(raw[:usable])
+        ]
+        samples.sort(key=lambda sample: sample["timestamp"])
+        if since is not None:
+            samples = [s for s in samples if s["timestamp"] >= since]
+        return samples
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class TreeSampler:
+    """
+    Sample the process tree rooted at `pid`. Process handles are kept between
+    samples, since CPU% is measured over the time since the previous one.
+    """
+
+    def __init__(self, pid: int):
+        self.pid = pid
+        self._processes: dict[int, "psutil.Process"] = {}
+
+    def sample(self) -> dict | None:
+        """Return totals plus a `per_process` list, or None once `pid` is gone."""
+        import psutil
+
+        try:
+            root = self._processes.get(self.pid) or psutil.Process(self.pid)
+            tree = [root, *root.children(recursive=True)]
+        except psutil.NoSuchProcess:
+            return None
+
+        per_process = []
+        for proc in tree:
+            proc = self._processes.setdefault(proc.pid, proc)
+            try:
+                per_process.append(_sample_process(proc, is_root=proc.pid == self.pid))
+            except psutil.NoSuchProcess:
+                continue
+        live = {entry["pid"] for entry in per_process}
+        for pid in self._processes.keys() - live:
+            del self._processes[pid]
+
+        totals = {
+            field: sum(entry[field] for entry in per_process)
+            for field in RECORD_FIELDS[2:]
+        }
+        return {
+            "timestamp": time.time(),
+            "processes": len(per_process),
+            **totals,
+            "per_process": per_process,
+        }
+
+
+def _sample_process(proc: "psutil.Process", is_root: bool) -> dict:
+    import psutil
+
+    with proc.oneshot():
+        try:
+            memory = proc.memory_full_info()
+            uss = memory.uss
+        except psutil.AccessDenied:
+            memory = proc.memory_info()
+            uss = 0
+        try:
+            io = proc.io_counters() if hasattr(proc, "io_counters") else None
+        except psutil.AccessDenied:
+            io = None
+        return {
+            "pid": proc.pid,
+            "role": "supervisor" if is_root else "worker",
+            "rss": memory.rss,
+            "uss": uss,
+            "cpu_percent": proc.cpu_percent(None),
+            "threads": proc.num_threads(),
+            "fds": proc.num_fds() if hasattr(proc, "num_fds") else 0,
+            "read_bytes": io.read_bytes if io else 0,
+            "write_bytes": io.write_bytes if io else 0,
+        }
+
+
+def io_rates(previous: dict, current: dict) -> tuple[float, float]:
+    """Bytes/s read and written between two samples (0 if counters reset)."""
+    elapsed = current["timestamp"] - previous["timestamp"]
+    if elapsed <= 0:
+        return 0.0, 0.0
+    return tuple(
+        max(0, current[field] - previous[field]) / elapsed
+        for field in ("read_bytes", "write_bytes")
+    )
+
+
+def summarize(samples: list[dict]) -> dict[str, dict[str, float]]:
+    """Min/avg/max/last of each metric over `samples` (oldest first)."""
+    series: dict[str, list[float]] = {
+        "rss_mb": [s["rss"] / 2**20 for s in samples],
+        "uss_mb": [s["uss"] / 2**20 for s in samples],
+        "cpu_percent": [s["cpu_percent"] for s in samples],
+        "threads": [s["threads"] for s in samples],
+        "fds": [s["fds"] for s in samples],
+        "processes": [s["processes"] for s in samples],
+        "read_mb_s": [],
+        "write_mb_s": [],
+    }
+    for previous, current in zip(samples, samples[1:]):
+        read, write = io_rates(previous, current)
+        series["read_mb_s"].append(read / 2**20)
+        series["write_mb_s"].append(write / 2**20)
+    return {
+        name: {
+            "min": min(values),
+            "avg": sum(values) / len(values),
+            "max": max(values),
+            "last": values[-1],
+        }
+        for name, values in series.items()
+        if values
+    }
+
+
+def run_sampler(
+    pid: int,
+    interval: float = DEFAULT_SAMPLE_INTERVAL,
+    path: Path = TELEMETRY_PATH,
+    capacity: int = DEFAULT_CAPACITY,
+    on_sample: Callable[[dict], bool] | None = None,
+):
+    """
+    Record samples of `pid`'s process tree until it exits, or until
+    `on_sample`, called with every sample, returns False.
+    """
+    sampler = TreeSampler(pid)
+    ring = TelemetryRing(path, capacity)
+    try:
+        while (sample := sampler.sample()) is not None:
+            ring.append(sample)
+            if on_sample is not None and not on_sample(sample):
+                break
+            time.sleep(interval)
+    finally:
+        ring.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sample a server process tree.")
+    parser.add_argument("pid", type=int)
+    parser.add_argument("--interval", type=float, default=DEFAULT_SAMPLE_INTERVAL)
+    parser.add_argument("--path", type=Path, default=TELEMETRY_PATH)
+    parser.add_argument("--capacity", type=int, default=DEFAULT_CAPACITY)
+    parser.add_argument("--idle-timeout", type=float, help="seconds")
+    parser.add_argument("--max-rss-mb", type=float)
+    args = parser.parse_args()
+    on_sample = None
+    launcher = None
+    if args.idle_timeout is not None or args.max_rss_mb is not None:
+        from .supervisor import IdleSupervisor, ServerLauncher
+
+        if args.max_rss_mb is not None:
+            # Forked before os.nice, so a restarted server doesn't inherit it.
+            launcher = ServerLauncher()
+        on_sample = IdleSupervisor(args.idle_timeout, args.max_rss_mb, launcher)
+    # Stay out of the way of the server we are measuring.
+    os.nice(10)
+    try:
+        run_sampler(args.pid, args.interval, args.path, args.capacity, on_sample)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if launcher is not None:
+            launcher.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Opt-in per-request tracing for the REST client.
+
+Every request made while at least one hook is registered produces a span:
+
+    {"method": "POST", "endpoint": "/query/query", "status": 200,
+     "started_at": 1700000000.0, "connect_ms": 0.4, "ttfb_ms": 120.3,
+     "body_bytes": 2048, "total_ms": 121.0, "retries": 0}
+
+`connect_ms` is 0 when a pooled connection was reused, and failed requests
+carry an `error` field. Monitoring code can consume spans with
+`add_trace_hook`; the CLI wires up the built-in stderr and NDJSON sinks from
+`--trace`/`--trace-file` or the `SYNAPSO_TRACE` environment variable.
+"""
+
+import json
+import os
+import sys
+import time
+from collections.abc import Callable
+
+TRACE_ENV_VAR = "SYNAPSO_TRACE"
+
+TraceHook = Callable[[dict], None]
+
+_hooks: list[TraceHook] = []
+
+
+def add_trace_hook(hook: TraceHook):
+    """Call `hook` with every finished span."""
+    if hook not in _hooks:
+        _hooks.append(hook)
+
+
+def remove_trace_hook(hook: TraceHook):
+    if hook in _hooks:
+        _hooks.remove(hook)
+
+
+def tracing_enabled() -> bool:
+    return bool(_hooks)
+
+
+def start_span(method: str, endpoint: str) -> dict:
+    return {
+        "method": method,
+        "endpoint": endpoint,
+        "status": None,
+        "started_at": time.time(),
+        "connect_ms": 0.0,
+        "ttfb_ms": None,
+        "body_bytes": 0,
+        "total_ms": None,
+        "retries": 0,
+        "_start": time.perf_counter(),
+    }
+
+
+def elapsed_ms(span: dict) -> float:
+    return (time.perf_counter() - span["_start"]) * 1000
+
+
+def finish_span(span: dict, body_bytes: int = 0, error: str | None = None):
+    """Close `span` and hand it to every hook. Hooks must not break requests."""
+    span["total_ms"] = elapsed_ms(span)
+    span["body_bytes"] = body_bytes
+    del span["_start"]
+    if error is not None:
+        span["error"] = error
+    for hook in list(_hooks):
+        try:
+            hook(span)
+        except Exception:
+            pass
+
+
+def format_span(span: dict) -> str:
+    ttfb = f"{span['ttfb_ms']:.1f} ms" if span["ttfb_ms"] is not None else "-"
+    line = (
+        f"[trace] {span['method']} {span['endpoint']} {span['status'] or '-'} "
+        f"connect {span['connect_ms']:.1f} ms, ttfb {ttfb}, "
+        f"{span['body_bytes']} B, total {span['total_ms']:.1f} ms, "
+        f"retries {span['retries']}"
+    )
+    if "error" in span:
+        line += f", error: {span['error']}"
+    return line
+
+
+def stderr_hook(span: dict):
+    print(format_span(span), file=sys.stderr, flush=True)
+
+
+def ndjson_file_hook(path: str) -> TraceHook:
+    """
+    Return a hook appending each span as one JSON line to `path`. The file is
+    opened here once, so an unwritable path fails now rather than mid-command.
+    """
+    path = os.path.expanduser(path)
+    with open(path, "a", encoding="utf-8"):
+        pass
+
+    def hook(span: dict):
+        with open(path, "a", encoding="utf-8") as trace_file:
+            trace_file.write(json.dumps(span) + "\n")
+
+    return hook
+
+
+def configure_tracing(target: str | None):
+    """
+    Enable the built-in sink for `target`: "1"/"true"/"stderr" print a summary
+    line per request, anything else is taken as an NDJSON trace file path.
+    Empty, "0" and "false" leave tracing off.
+    """
+    if not target or target.lower() in ("0", "false", "no", "off"):
+        return
+    if target.lower() in ("1", "true", "yes", "on", "stderr"):
+        add_trace_hook(stderr_hook)
+    else:
+        add_trace_hook(ndjson_file_hook(target))
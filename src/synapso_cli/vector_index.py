@@ -0,0 +1,266 @@
+"""
+Reference model of the vector store's index and quantization options.
+
+The server builds the real index; this module mirrors the options of
+`VectorStoreConfig` in plain Python so that `synapso bench vector-index` can
+show what each costs in recall and buys in latency and memory, on synthetic
+embeddings and without loading a model:
+
+- "flat" scores the query against every vector; "ivf" clusters the vectors
+  with k-means into `lists` inverted lists and scores only those in the
+  `probes` lists whose centroids are nearest the query.
+- "int8" stores each vector as signed bytes with one float scale; "binary"
+  keeps only the sign of each dimension, scored by Hamming distance.
+
+Vectors are unit length, so the dot product is the cosine similarity.
+"""
+
+import heapq
+import math
+import operator
+import random
+import time
+from collections.abc import Callable, Sequence
+
+from .metrics import percentile
+
+Vector = list[float]
+
+FLOAT_BYTES = 4
+# Vectors k-means trains on per list; the rest are only assigned.
+TRAIN_SAMPLES_PER_LIST = 40
+
+
+def dot(a: Sequence[float], b: Sequence[float]) -> float:
+    return sum(map(operator.mul, a, b))
+
+
+def normalize(vector: Sequence[float]) -> Vector:
+    norm = math.sqrt(dot(vector, vector)) or 1.0
+    return [x / norm for x in vector]
+
+
+def synthetic_embeddings(
+    count: int, dim: int, clusters: int = 32, spread: float = 0.8, seed: int = 0
+) -> list[Vector]:
+    """
+    Unit vectors scattered around `clusters` random topics, which is how
+    sentence embeddings of a real corpus are distributed (and what makes
+    clustering them worthwhile).
+    """
+    rng = random.Random(seed)
+    sigma = spread / math.sqrt(dim)
+    centers = [
+        normalize([rng.gauss(0, 1) for _ in range(dim)]) for _ in range(clusters)
+    ]
+    return [
+        normalize([x + rng.gauss(0, sigma) for x in rng.choice(centers)])
+        for _ in range(count)
+    ]
+
+
+def _nearest(centroids: list[Vector], vector: Sequence[float]) -> int:
+    return max(range(len(centroids)), key=lambda i: dot(centroids[i], vector))
+
+
+def kmeans(
+    vectors: list[Vector], k: int, iterations: int, rng: random.Random
+) -> list[Vector]:
+    """Spherical k-means: centroids are renormalized means of their members."""
+    centroids = [list(v) for v in rng.sample(vectors, min(k, len(vectors)))]
+    for _ in range(iterations):
+        sums = [[0.0] * len(vectors[0]) for _ in centroids]
+        counts = [0] * len(centroids)
+        for vector in vectors:
+            i = _nearest(centroids, vector)
+            counts[i] += 1
+            sums[i] = list(map(operator.add, sums[i], vector))
+        # A list that lost all its members keeps its previous centroid.
+        centroids = [
+            normalize(total) if count else centroid
+            for total, count, centroid in zip(sums, counts, centroids)
+        ]
+    return centroids
+
+
+class IvfPartition:
+    """Inverted lists: k-means centroids plus the ids of each list's vectors."""
+
+    def __init__(
+        self, vectors: list[Vector], lists: int, iterations: int = 10, seed: int = 0
+    ):
+        rng = random.Random(seed)
+        sample_size = min(len(vectors), lists * TRAIN_SAMPLES_PER_LIST)
+        sample = rng.sample(vectors, sample_size)
+        self.centroids = kmeans(sample, lists, iterations, rng)
+        self.lists: list[list[int]] = [[] for _ in self.centroids]
+        for i, vector in enumerate(vectors):
+            self.lists[_nearest(self.centroids, vector)].append(i)
+
+    def candidates(self, query: Sequence[float], probes: int) -> list[int]:
+        nearest = heapq.nlargest(
+            probes,
+            range(len(self.centroids)),
+            key=lambda i: dot(self.centroids[i], query),
+        )
+        return [i for list_id in nearest for i in self.lists[list_id]]
+
+
+def _binary_code(vector: Sequence[float]) -> int:
+    return sum(1 << i for i, x in enumerate(vector) if x > 0)
+
+
+class FloatCodes:
+    """Vectors stored as they are, 4 bytes per dimension."""
+
+    quantization = "none"
+
+    def __init__(self, vectors: list[Vector]):
+        self.dim = len(vectors[0])
+        self.vectors = vectors
+
+    @property
+    def bytes_per_vector(self) -> float:
+        return self.dim * FLOAT_BYTES
+
+    def scorer(self, query: Sequence[float]) -> Callable[[int], float]:
+        """Return score(id): higher is more similar to `query`."""
+        vectors = self.vectors
+        return lambda i: dot(query, vectors[i])
+
+
+class Int8Codes:
+    """Vectors stored as signed bytes, with one float scale per vector."""
+
+    quantization = "int8"
+
+    def __init__(self, vectors: list[Vector]):
+        self.dim = len(vectors[0])
+        self.values: list[list[int]] = []
+        self.scales: list[float] = []
+        for vector in vectors:
+            scale = max(map(abs, vector)) / 127 or 1.0
+            self.values.append([round(x / scale) for x in vector])
+            self.scales.append(scale)
+
+    @property
+    def bytes_per_vector(self) -> float:
+        return self.dim + FLOAT_BYTES
+
+    def scorer(self, query: Sequence[float]) -> Callable[[int], float]:
+        values, scales = self.values, self.scales
+        return lambda i: dot(query, values[i]) * scales[i]
+
+
+class BinaryCodes:
+    """The sign of each dimension, packed into an int; scored by Hamming."""
+
+    quantization = "binary"
+
+    def __init__(self, vectors: list[Vector]):
+        self.dim = len(vectors[0])
+        self.bits = [_binary_code(vector) for vector in vectors]
+
+    @property
+    def bytes_per_vector(self) -> float:
+        return math.ceil(self.dim / 8)
+
+    def scorer(self, query: Sequence[float]) -> Callable[[int], float]:
+        bits, query_bits = self.bits, _binary_code(query)
+        return lambda i: -(query_bits ^ bits[i]).bit_count()
+
+
+Codes = FloatCodes | Int8Codes | BinaryCodes
+CODES: dict[str, type[Codes]] = {
+    codes.quantization: codes for codes in (FloatCodes, Int8Codes, BinaryCodes)
+}
+
+
+def quantize(vectors: list[Vector], quantization: str) -> Codes:
+    """Store `vectors` at `quantization` ("none", "int8" or "binary")."""
+    if quantization not in CODES:
+        raise ValueError(f"Unknown quantization '{quantization}'")
+    return CODES[quantization](vectors)
+
+
+class VectorIndex:
+    def __init__(
+        self,
+        vectors: list[Vector],
+        quantization: str = "none",
+        partition: IvfPartition | None = None,
+    ):
+        self.size = len(vectors)
+        self.store = quantize(vectors, quantization)
+        self.partition = partition
+
+    def search(self, query: Sequence[float], k: int, probes: int = 1) -> list[int]:
+        """Ids of the `k` best matches; IVF indexes search `probes` lists."""
+        if self.partition is None:
+            candidates = range(self.size)
+        else:
+            candidates = self.partition.candidates(query, probes)
+        return heapq.nlargest(k, candidates, key=self.store.scorer(query))
+
+
+def recall(found: Sequence[int], truth: Sequence[int]) -> float:
+    return len(set(found) & set(truth)) / len(truth) if truth else 1.0
+
+
+def run_benchmark(
+    count: int = 4000,
+    dim: int = 64,
+    queries: int = 100,
+    k: int = 10,
+    lists: int = 64,
+    probes: Sequence[int] = (1, 4, 16),
+    quantizations: Sequence[str] = ("none", "int8", "binary"),
+    train_iterations: int = 10,
+    seed: int = 0,
+) -> dict:
+    """
+    Recall@k against exact search, query latency and bytes per vector for
+    the flat index and for IVF at each of `probes`, at each quantization.
+    """
+    rng = random.Random(seed)
+    vectors = synthetic_embeddings(count, dim, seed=seed)
+    query_set = [
+        normalize([x + rng.gauss(0, 0.05) for x in rng.choice(vectors)])
+        for _ in range(queries)
+    ]
+    exact = VectorIndex(vectors)
+    truth = [exact.search(query, k) for query in query_set]
+
+    start = time.perf_counter()
+    partition = IvfPartition(vectors, min(lists, count), train_iterations, seed)
+    ivf_build_s = time.perf_counter() - start
+
+    runs = []
+    for quantization in quantizations:
+        start = time.perf_counter()
+        flat = VectorIndex(vectors, quantization)
+        encode_s = time.perf_counter() - start
+        ivf = VectorIndex(vectors, quantization, partition)
+        configs = [("flat", flat, 1, encode_s)]
+        configs += [("ivf", ivf, p, encode_s + ivf_build_s) for p in probes]
+        for index_type, index, n_probes, build_s in configs:
+            latencies = []
+            recalls = []
+            for query, expected in zip(query_set, truth):
+                start = time.perf_counter()
+                found = index.search(query, k, n_probes)
+                latencies.append((time.perf_counter() - start) * 1000)
+                recalls.append(recall(found, expected))
+            runs.append(
+                {
+                    "index_type": index_type,
+                    "quantization": quantization,
+                    "probes": n_probes if index_type == "ivf" else None,
+                    "recall": sum(recalls) / len(recalls),
+                    "p50_ms": percentile(latencies, 50),
+                    "p95_ms": percentile(latencies, 95),
+                    "bytes_per_vector": index.store.bytes_per_vector,
+                    "build_s": build_s,
+                }
+            )
+    return {"runs": runs, "ivf_lists": len(partition.centroids)}
@@ -0,0 +1,453 @@
+"""
+Keep cortices fresh by reindexing their folders as files change.
+
+Each cortex folder is watched with inotify where the kernel offers it, and
+by periodically re-statting the folder otherwise. Changes are queued per
+cortex and coalesced: a batch is submitted as one incremental index job once
+the folder has been quiet for the debounce window (or changes have kept
+coming for `max_delay`), and never while a job for that cortex is running.
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from .errors import SynapsoRestClientError
+from .jobs import (
+    JOB_SUCCESS_STATUS,
+    MAX_POLL_FAILURES,
+    is_job_done,
+    job_id_from_response,
+    job_status,
+)
+from .manifest import (
+    diff_manifests,
+    is_empty_delta,
+    is_ignored,
+    load_manifest,
+    save_manifest,
+    scan_folder,
+    stat_files,
+    write_json_atomic,
+)
+from .paths import synapso_home
+
+if TYPE_CHECKING:
+    from .rest_client import SynapsoRestClient
+
+METRICS_PATH = synapso_home() / "watch_metrics.json"
+DEFAULT_DEBOUNCE = 2.0
+DEFAULT_MAX_DELAY = 30.0
+DEFAULT_POLL_INTERVAL = 5.0
+JOB_POLL_INTERVAL = 1.0
+# Backoff before resubmitting a batch whose submission or job failed,
+# doubling per consecutive failure.
+RETRY_BACKOFF_BASE = 5.0
+RETRY_BACKOFF_CAP = 300.0
+METRICS_INTERVAL = 1.0
+# Longest the loop sleeps, so metrics stay current while nothing happens.
+MAX_WAIT = 5.0
+
+# From <sys/inotify.h>.
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+_WATCH_MASK = (
+    IN_MODIFY
+    | IN_ATTRIB
+    | IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+    | IN_MOVE_SELF
+)
+_EVENT = struct.Struct("iIII")
+
+
+class InotifyWatcher:
+    """
+    Report changed paths under `root` using inotify, one watch per directory.
+
+    Raises OSError if inotify is unavailable or runs out of watches, in which
+    case callers should fall back to `PollingWatcher`.
+    """
+
+    backend = "inotify"
+
+    def __init__(self, root: str):
+        if not sys.platform.startswith("linux"):
+            raise OSError(errno.ENOSYS, "inotify is only available on Linux")
+        self.root = root
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+        self._dirs: dict[int, str] = {}
+        try:
+            self._watch_tree(root)
+        except OSError:
+            self.close()
+            raise
+
+    def _watch_tree(self, top: str):
+        for dirpath, _, _ in os.walk(top):
+            wd = self._libc.inotify_add_watch(
+                self.fd, os.fsencode(dirpath), _WATCH_MASK
+            )
+            if wd >= 0:
+                self._dirs[wd] = dirpath
+                continue
+            error = ctypes.get_errno()
+            if error == errno.ENOSPC:
+                raise OSError(error, "inotify watch limit reached")
+            # Otherwise the directory vanished while walking; skip it.
+
+    def timeout(self) -> float | None:
+        return None
+
+    def read_changes(self) -> set[str]:
+        changes: set[str] = set()
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return changes
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT.unpack_from(data, offset)
+                offset += _EVENT.size
+                name = os.fsdecode(data[offset : offset + length].rstrip(b"\0"))
+                offset += length
+                if mask & IN_Q_OVERFLOW:
+                    # Events were dropped; the batch's rescan finds them.
+                    changes.add(self.root)
+                    continue
+                if mask & IN_IGNORED:
+                    self._dirs.pop(wd, None)
+                    continue
+                directory = self._dirs.get(wd)
+                if directory is None or (name and is_ignored(name)):
+                    continue
+                path = os.path.join(directory, name) if name else directory
+                if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                    self._watch_tree(path)
+                changes.add(path)
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class PollingWatcher:
+    """Report changed paths under `root` by re-statting it every `interval`."""
+
+    backend = "polling"
+    fd = None
+
+    def __init__(self, root: str, interval: float = DEFAULT_POLL_INTERVAL):
+        self.root = root
+        self.interval = interval
+        self._snapshot = self._scan()
+        self._next_scan = time.monotonic() + interval
+
+    def _scan(self) -> dict[str, tuple[int, int]]:
+        return {
+            path: (st.st_size, st.st_mtime_ns)
+            for path, st in stat_files(self.root).items()
+        }
+
+    def timeout(self) -> float | None:
+        return max(0.0, self._next_scan - time.monotonic())
+
+    def read_changes(self) -> set[str]:
+        if time.monotonic() < self._next_scan:
+            return set()
+        snapshot = self._scan()
+        self._next_scan = time.monotonic() + self.interval
+        changed = {
+            path
+            for path in snapshot.keys() | self._snapshot.keys()
+            if snapshot.get(path) != self._snapshot.get(path)
+        }
+        self._snapshot = snapshot
+        return {os.path.join(self.root, path) for path in changed}
+
+    def close(self):
+        pass
+
+
+def open_watcher(root: str, poll_interval: float = DEFAULT_POLL_INTERVAL):
+    """Watch `root` with inotify if possible, else by polling."""
+    try:
+        return InotifyWatcher(root)
+    except (OSError, AttributeError):
+        return PollingWatcher(root, poll_interval)
+
+
+class WatchedCortex:
+    """Change queue and index job state of one watched cortex."""
+
+    def __init__(self, cortex_id: str, label: str, root: str, watcher):
+        self.cortex_id = cortex_id
+        self.label = label
+        self.root = root
+        self.watcher = watcher
+        self.pending: set[str] = set()
+        self.first_change_at: float | None = None
+        self.last_change_at: float | None = None
+        # The batch being indexed: its job, scanned files and first change.
+        self.job_id: str | None = None
+        self.job_files: dict[str, dict] | None = None
+        self.job_first_change_at: float | None = None
+        self.next_job_check = 0.0
+        # Consecutive failed lookups of the job; the server may have lost it.
+        self.job_check_failures = 0
+        self.last_index_lag: float | None = None
+        self.jobs_submitted = 0
+        self.jobs_failed = 0
+        # Consecutive failed submissions and jobs, and when to try again.
+        self.failures = 0
+        self.retry_at: float | None = None
+
+    def add_changes(self, paths: set[str], now: float):
+        self.pending |= paths
+        if self.first_change_at is None:
+            self.first_change_at = now
+        self.last_change_at = now
+
+    def due_at(self, debounce: float, max_delay: float) -> float | None:
+        """Monotonic time at which the pending batch should be submitted."""
+        if (
+            not self.pending
+            or self.job_id is not None
+            or self.first_change_at is None
+            or self.last_change_at is None
+        ):
+            return None
+        due = min(self.last_change_at + debounce, self.first_change_at + max_delay)
+        return due if self.retry_at is None else max(due, self.retry_at)
+
+    def retry_later(self, now: float) -> float:
+        """Requeue the whole folder after a failure; return the backoff."""
+        self.failures += 1
+        delay = min(RETRY_BACKOFF_CAP, RETRY_BACKOFF_BASE * 2 ** (self.failures - 1))
+        self.retry_at = now + delay
+        # The manifest is unchanged, so a rescan finds the same files again.
+        self.add_changes({self.root}, now)
+        return delay
+
+    def metrics(self, now: float) -> dict[str, Any]:
+        return {
+            "cortex_id": self.cortex_id,
+            "backend": self.watcher.backend,
+            "queue_depth": len(self.pending),
+            "oldest_change_age_s": (
+                now - self.first_change_at if self.first_change_at else 0.0
+            ),
+            "job_id": self.job_id,
+            "last_index_lag_s": self.last_index_lag,
+            "jobs_submitted": self.jobs_submitted,
+            "jobs_failed": self.jobs_failed,
+        }
+
+
+class WatchDaemon:
+    """
+    Watch cortices and submit debounced incremental index jobs for them.
+
+    `on_submit(response, cortex_id)` is called for every submitted job, and
+    `log` receives one line per batch and job outcome. Queue depth and index
+    lag (first change of a batch to its job finishing) are written as JSON
+    to `metrics_path`. `keepalive` is called on every pass of the loop, e.g.
+    so an idle timeout doesn't stop the server while the daemon runs.
+    """
+
+    def __init__(
+        self,
+        client: "SynapsoRestClient",
+        cortices: list[WatchedCortex],
+        debounce: float = DEFAULT_DEBOUNCE,
+        max_delay: float = DEFAULT_MAX_DELAY,
+        metrics_path: Path = METRICS_PATH,
+        on_submit: Callable[[Any, str], None] | None = None,
+        log: Callable[[str], None] = print,
+        keepalive: Callable[[], None] | None = None,
+    ):
+        self.client = client
+        self.cortices = cortices
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.metrics_path = Path(metrics_path)
+        self.on_submit = on_submit
+        self.log = log
+        self.keepalive = keepalive
+        self._next_metrics = 0.0
+
+    def run(self):
+        # Catch up on anything that changed while nobody was watching.
+        now = time.monotonic()
+        for cortex in self.cortices:
+            cortex.add_changes({cortex.root}, now)
+        try:
+            while True:
+                self._wait(self._next_wakeup())
+                self.tick(time.monotonic())
+        finally:
+            for cortex in self.cortices:
+                cortex.watcher.close()
+
+    def _next_wakeup(self) -> float:
+        now = time.monotonic()
+        deadlines = [now + MAX_WAIT]
+        for cortex in self.cortices:
+            due = cortex.due_at(self.debounce, self.max_delay)
+            if due is not None:
+                deadlines.append(due)
+            if cortex.job_id is not None:
+                deadlines.append(cortex.next_job_check)
+            timeout = cortex.watcher.timeout()
+            if timeout is not None:
+                deadlines.append(now + timeout)
+        return max(0.0, min(deadlines) - now)
+
+    def _wait(self, timeout: float):
+        fds = [c.watcher.fd for c in self.cortices if c.watcher.fd is not None]
+        if fds:
+            select.select(fds, [], [], timeout)
+        else:
+            time.sleep(timeout)
+
+    def tick(self, now: float):
+        if self.keepalive is not None:
+            self.keepalive()
+        for cortex in self.cortices:
+            changes = cortex.watcher.read_changes()
+            if changes:
+                cortex.add_changes(changes, now)
+            if cortex.job_id is not None and now >= cortex.next_job_check:
+                self._check_job(cortex, now)
+            due = cortex.due_at(self.debounce, self.max_delay)
+            if due is not None and now >= due:
+                self._submit(cortex, now)
+        if now >= self._next_metrics:
+            self._write_metrics(now)
+
+    def _submit(self, cortex: WatchedCortex, now: float):
+        queued = len(cortex.pending)
+        first_change_at = cortex.first_change_at
+        cortex.pending.clear()
+        cortex.first_change_at = cortex.last_change_at = None
+
+        previous = load_manifest(cortex.cortex_id, cortex.root)
+        files = scan_folder(cortex.root, previous)
+        delta = diff_manifests(previous, files)
+        if is_empty_delta(delta):
+            return
+        try:
+            response = self.client.index_cortex(
+                cortex.cortex_id,
+                delta={
+                    kind: [os.path.join(cortex.root, path) for path in paths]
+                    for kind, paths in delta.items()
+                },
+            )
+        except SynapsoRestClientError as e:
+            delay = cortex.retry_later(now)
+            self.log(
+                f"{cortex.label}: failed to submit index job: {e}; "
+                f"retrying in {delay:.0f}s"
+            )
+            return
+        if self.on_submit is not None:
+            self.on_submit(response, cortex.cortex_id)
+        cortex.jobs_submitted += 1
+        cortex.job_id = job_id_from_response(response)
+        cortex.job_files = files
+        cortex.job_first_change_at = first_change_at or now
+        cortex.next_job_check = now + JOB_POLL_INTERVAL
+        self.log(
+            f"{cortex.label}: {queued} queued change(s) -> "
+            f"{len(delta['added'])} added, {len(delta['changed'])} changed, "
+            f"{len(delta['deleted'])} deleted (job {cortex.job_id})"
+        )
+        if cortex.job_id is None:
+            # No job to follow: the server indexed synchronously.
+            self._finish_job(cortex, {"status": JOB_SUCCESS_STATUS}, now)
+
+    def _check_job(self, cortex: WatchedCortex, now: float):
+        cortex.next_job_check = now + JOB_POLL_INTERVAL
+        job_id = cortex.job_id
+        if job_id is None:
+            return
+        try:
+            job = self.client.get_job(job_id)
+        except SynapsoRestClientError as e:
+            cortex.job_check_failures += 1
+            if cortex.job_check_failures < MAX_POLL_FAILURES:
+                self.log(f"{cortex.label}: failed to check job {job_id}: {e}")
+                return
+            # E.g. a restarted server no longer knows the job: give up on it.
+            job = {"job_id": job_id, "status": "error", "error": str(e)}
+        else:
+            cortex.job_check_failures = 0
+        if is_job_done(job):
+            self._finish_job(cortex, job, now)
+
+    def _finish_job(self, cortex: WatchedCortex, job: dict, now: float):
+        status = job_status(job)
+        lag = now - (cortex.job_first_change_at or now)
+        cortex.last_index_lag = lag
+        message = f"{cortex.label}: job {cortex.job_id} {status}, index lag {lag:.1f}s"
+        if status == JOB_SUCCESS_STATUS:
+            save_manifest(cortex.cortex_id, cortex.root, cortex.job_files or {})
+            cortex.failures = 0
+            cortex.retry_at = None
+        else:
+            cortex.jobs_failed += 1
+            delay = cortex.retry_later(now)
+            message += f"; retrying in {delay:.0f}s"
+        self.log(message)
+        cortex.job_id = cortex.job_files = cortex.job_first_change_at = None
+        cortex.job_check_failures = 0
+        self._write_metrics(now)
+
+    def metrics(self, now: float) -> dict[str, Any]:
+        cortices = {cortex.label: cortex.metrics(now) for cortex in self.cortices}
+        return {
+            "updated_at": time.time(),
+            "pid": os.getpid(),
+            "queue_depth": sum(c["queue_depth"] for c in cortices.values()),
+            "max_index_lag_s": max(
+                (c["last_index_lag_s"] or 0.0 for c in cortices.values()),
+                default=0.0,
+            ),
+            "cortices": cortices,
+        }
+
+    def _write_metrics(self, now: float):
+        self._next_metrics = now + METRICS_INTERVAL
+        try:
+            write_json_atomic(self.metrics_path, self.metrics(now))
+        except OSError:
+            pass
@@ -0,0 +1,38 @@
+import os
+
+from synapso_cli.manifest import diff_manifests, is_empty_delta, scan_folder
+
+
+def _entry(sha256: str) -> dict:
+    return {"size": 1, "mtime_ns": 0, "sha256": sha256}
+
+
+def test_diff_manifests():
+    previous = {
+        "kept.md": _entry("a"),
+        "edited.md": _entry("b"),
+        "gone.md": _entry("c"),
+    }
+    current = {"kept.md": _entry("a"), "edited.md": _entry("B"), "new.md": _entry("d")}
+    assert diff_manifests(previous, current) == {
+        "added": ["new.md"],
+        "changed": ["edited.md"],
+        "deleted": ["gone.md"],
+    }
+
+
+def test_diff_of_unchanged_manifest_is_empty():
+    manifest = {"a.md": _entry("a")}
+    assert is_empty_delta(diff_manifests(manifest, dict(manifest)))
+
+
+def test_rescan_detects_edits_and_skips_ignored_files(tmp_path):
+    (tmp_path / "note.md").write_text("one")
+    (tmp_path / "note.md.swp").write_text("swap")
+    first = scan_folder(str(tmp_path))
+    assert list(first) == ["note.md"]
+
+    (tmp_path / "note.md").write_text("two!")
+    os.utime(tmp_path / "note.md", ns=(0, first["note.md"]["mtime_ns"] + 10**9))
+    second = scan_folder(str(tmp_path), previous=first)
+    assert diff_manifests(first, second)["changed"] == ["note.md"]
@@ -0,0 +1,24 @@
+import pytest
+
+from synapso_cli.metrics import percentile, summarize_latencies
+
+
+def test_percentile_interpolates_between_ranks():
+    values = [4.0, 1.0, 3.0, 2.0]
+    assert percentile(values, 0) == 1.0
+    assert percentile(values, 50) == 2.5
+    assert percentile(values, 100) == 4.0
+    assert percentile(values, 95) == pytest.approx(3.85)
+
+
+def test_percentile_of_few_values():
+    assert percentile([], 95) == 0.0
+    assert percentile([7.0], 95) == 7.0
+
+
+def test_summarize_latencies_reports_milliseconds():
+    summary = summarize_latencies([0.1, 0.2, 0.3], elapsed=2.0)
+    assert summary["count"] == 3
+    assert summary["qps"] == 1.5
+    assert summary["p50_ms"] == pytest.approx(200.0)
+    assert summary["max_ms"] == pytest.approx(300.0)
@@ -0,0 +1,170 @@
+import asyncio
+import socket
+
+import pytest
+
+from synapso_cli import tracing
+from synapso_cli.errors import (
+    CircuitOpenError,
+    DeadlineExceededError,
+    SynapsoHTTPError,
+    SynapsoRestClientError,
+)
+from synapso_cli.policy import CircuitBreaker, RequestPolicy
+from synapso_cli.rest_client import SynapsoRestClient
+
+
+def _policy(**kwargs) -> RequestPolicy:
+    kwargs.setdefault("backoff_base", 0.0)
+    return RequestPolicy(**kwargs)
+
+
+def _failing(errors: list[Exception], result="ok"):
+    """An attempt that raises `errors` in turn, then returns `result`."""
+    calls = []
+
+    def attempt(remaining, retry):
+        calls.append(retry)
+        if errors:
+            raise errors.pop(0)
+        return result
+
+    return attempt, calls
+
+
+def test_breaker_opens_after_threshold():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+    assert not breaker.record_failure()
+    assert not breaker.record_failure()
+    assert breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+
+def test_breaker_success_resets_failure_count():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    breaker.record_failure()
+    breaker.record_success()
+    assert not breaker.record_failure()
+    assert breaker.state == "closed"
+
+
+def test_breaker_half_open_lets_one_trial_through():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.allow()
+    assert breaker.state == "half_open"
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow()
+
+
+def test_breaker_failed_trial_reopens():
+    breaker = CircuitBreaker(failure_threshold=5, reset_timeout=0)
+    for _ in range(5):
+        breaker.record_failure()
+    assert breaker.allow()
+    assert breaker.record_failure()
+    assert breaker.state == "open"
+
+
+def test_call_retries_idempotent_calls_with_retry_numbers():
+    policy = _policy()
+    attempt, calls = _failing(
+        [SynapsoRestClientError("refused"), SynapsoHTTPError("busy", 503)]
+    )
+    assert policy.call("/job/list_jobs", attempt, idempotent=True) == "ok"
+    assert calls == [0, 1, 2]
+    assert policy.stats()["retries"] == 2
+    assert policy.stats()["circuit"] == "closed"
+
+
+def test_call_does_not_retry_non_idempotent_calls():
+    policy = _policy()
+    attempt, calls = _failing([SynapsoRestClientError("refused")])
+    with pytest.raises(SynapsoRestClientError):
+        policy.call("/cortex/create", attempt, idempotent=False)
+    assert calls == [0]
+
+
+def test_client_errors_are_not_retried_or_counted_as_failures():
+    policy = _policy()
+    attempt, calls = _failing([SynapsoHTTPError("not found", 404)])
+    with pytest.raises(SynapsoHTTPError):
+        policy.call("/cortex", attempt, idempotent=True)
+    assert calls == [0]
+    assert policy.stats()["failures"] == 0
+
+
+def test_open_circuit_calls_hook_and_short_circuits():
+    opened = []
+    policy = _policy(
+        failure_threshold=2, reset_timeout=60, on_circuit_open=lambda: opened.append(1)
+    )
+    attempt, calls = _failing([SynapsoRestClientError("refused")] * 2)
+    with pytest.raises(SynapsoRestClientError):
+        policy.call("/job/list_jobs", attempt, idempotent=True)
+    assert opened == [1]
+    assert calls == [0, 1]
+    with pytest.raises(CircuitOpenError):
+        policy.call("/job/list_jobs", attempt, idempotent=True)
+    assert policy.stats()["short_circuited"] == 1
+
+
+def test_acall_retries_and_passes_retry_numbers():
+    policy = _policy()
+    calls = []
+
+    async def attempt(remaining, retry):
+        calls.append(retry)
+        if retry < 2:
+            raise SynapsoHTTPError("busy", 502)
+        return "ok"
+
+    result = asyncio.run(policy.acall("/job/get_job", attempt, idempotent=True))
+    assert result == "ok"
+    assert calls == [0, 1, 2]
+
+
+def test_acall_cancels_attempts_at_the_deadline():
+    policy = _policy(endpoint_deadlines={"/slow": 0.05})
+
+    async def attempt(remaining, retry):
+        await asyncio.sleep(10)
+
+    with pytest.raises(DeadlineExceededError):
+        asyncio.run(policy.acall("/slow", attempt, idempotent=True))
+    assert policy.stats()["deadline_exceeded"] == 1
+
+
+def test_acall_hedge_returns_first_answer():
+    policy = _policy(hedge_after=0.01)
+    started = []
+
+    async def attempt(remaining, retry):
+        started.append(retry)
+        if len(started) == 1:
+            await asyncio.sleep(10)
+            return "slow"
+        return "fast"
+
+    result = asyncio.run(policy.acall("/query/query", attempt, True, hedge=True))
+    assert result == "fast"
+    assert policy.stats()["hedge_wins"] == 1
+
+
+def test_trace_spans_record_retry_number():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    spans = []
+    hook = spans.append
+    tracing.add_trace_hook(hook)
+    try:
+        with SynapsoRestClient(f"http://127.0.0.1:{port}", policy=_policy()) as client:
+            with pytest.raises(SynapsoRestClientError):
+                client.get_job_list()
+    finally:
+        tracing.remove_trace_hook(hook)
+    assert [span["retries"] for span in spans] == [0, 1, 2]
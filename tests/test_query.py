@@ -0,0 +1,74 @@
+from synapso_cli.commands import query as query_command
+from synapso_cli.commands.query import limit_results, merge_ranked_results
+from synapso_cli.errors import SynapsoRestClientError
+
+
+def test_merge_ranks_results_across_cortices():
+    merged = merge_ranked_results(
+        {
+            "a": {
+                "results": [{"text": "a1", "score": 0.9}, {"text": "a2", "score": 0.2}]
+            },
+            "b": {"results": [{"text": "b1", "score": 0.5}]},
+        },
+        top_k=2,
+    )
+    assert [(r["text"], r["cortex_id"]) for r in merged["results"]] == [
+        ("a1", "a"),
+        ("b1", "b"),
+    ]
+    assert merged["cortex_ids"] == ["a", "b"]
+    assert merged["errors"] == {}
+
+
+def test_merge_reports_failed_cortices():
+    merged = merge_ranked_results(
+        {"a": {"results": []}, "b": SynapsoRestClientError("down")}, top_k=5
+    )
+    assert merged["cortex_ids"] == ["a"]
+    assert merged["errors"] == {"b": "down"}
+
+
+def test_merge_keeps_answers_without_results():
+    answer = {"query": "q", "response": "text"}
+    merged = merge_ranked_results(
+        {"a": answer, "b": {"results": [{"text": "b1"}]}}, top_k=5
+    )
+    assert merged["responses"] == {"a": answer}
+    assert merged["results"] == [{"text": "b1", "cortex_id": "b"}]
+
+
+def test_limit_results():
+    response = {"query": "q", "results": [{"score": 3}, {"score": 2}, {"score": 1}]}
+    assert limit_results(response, 2)["results"] == [{"score": 3}, {"score": 2}]
+    assert limit_results({"response": "text"}, 2) == {"response": "text"}
+
+
+def test_cache_key_includes_top_k(monkeypatch, tmp_path):
+    from synapso_cli.query_cache import QueryCache
+
+    class Client:
+        def query(self, query, cortex_id):
+            return {"results": [{"score": s} for s in (3, 2, 1)]}
+
+    echoed = []
+    cache = QueryCache(tmp_path / "cache.db", fingerprint="test")
+    monkeypatch.setattr(query_command, "_open_cache", lambda use_cache: cache)
+    monkeypatch.setattr(query_command, "get_rest_client", lambda: Client())
+    monkeypatch.setattr(query_command.typer, "echo", echoed.append)
+
+    query_command.cmd_query("q", top_k=1)
+    query_command.cmd_query("q", top_k=2)
+    assert [len(response["results"]) for response in echoed] == [1, 2]
+    query_command.cmd_query("q", top_k=1)
+    assert echoed[-1] == echoed[0]
+    assert cache.stats()["hits"] == 1
+
+
+def test_batch_queries_read_from_file(tmp_path):
+    path = tmp_path / "queries.jsonl"
+    path.write_text('plain question\n\n{"query": "json question", "id": "q2"}\n')
+    assert query_command._read_batch_queries(str(path)) == [
+        {"query": "plain question", "id": 0},
+        {"query": "json question", "id": "q2"},
+    ]
@@ -0,0 +1,60 @@
+import pytest
+
+from synapso_cli import query_cache
+from synapso_cli.query_cache import QueryCache
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(query_cache.time, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def cache(tmp_path):
+    with QueryCache(
+        tmp_path / "cache.db", max_entries=2, ttl=60, fingerprint="test"
+    ) as cache:
+        yield cache
+
+
+def test_least_recently_used_entry_is_evicted(cache, clock):
+    cache.put("query", "a", {"answer": "a"})
+    clock.now += 1
+    cache.put("query", "b", {"answer": "b"})
+    clock.now += 1
+    assert cache.get("query", "a") == {"answer": "a"}
+    clock.now += 1
+    cache.put("query", "c", {"answer": "c"})
+
+    assert cache.get("query", "b") is None
+    assert cache.get("query", "a") == {"answer": "a"}
+    assert cache.get("query", "c") == {"answer": "c"}
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_expire_after_ttl(cache, clock):
+    cache.put("query", "a", {"answer": "a"})
+    clock.now += 59
+    assert cache.get("query", "a") == {"answer": "a"}
+    clock.now += 2
+    assert cache.get("query", "a") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_size_budget_evicts_oldest(tmp_path, clock):
+    with QueryCache(tmp_path / "cache.db", max_bytes=20, fingerprint="test") as cache:
+        cache.put("query", "a", "x" * 10)
+        clock.now += 1
+        cache.put("query", "b", "y" * 10)
+        assert cache.get("query", "a") is None
+        assert cache.get("query", "b") == "y" * 10
@@ -0,0 +1,23 @@
+from synapso_cli.commands import server
+from synapso_cli.rest_client import SynapsoRestClient
+
+
+def test_restart_points_the_client_at_the_new_server(monkeypatch):
+    configs = [{"pid": 1, "port": 50000}, {"pid": 2, "port": 50001}]
+    terminated = []
+    monkeypatch.setattr(server, "get_server_config", lambda: configs[0])
+    monkeypatch.setattr(server, "is_server_running", lambda: False)
+    monkeypatch.setattr(server, "_terminate_server", terminated.append)
+    monkeypatch.setattr(server, "ensure_server", lambda: configs.pop(0))
+    monkeypatch.setattr(server, "_rest_clients", {})
+
+    client = server._client_for(configs[0])
+    client.policy.breaker.state = "open"
+    assert client.policy.on_circuit_open is not None
+    client.policy.on_circuit_open()
+
+    assert terminated == [{"pid": 1, "port": 50000}]
+    assert client.base_url == "http://127.0.0.1:50001"
+    assert client.policy.breaker.state == "closed"
+    assert server._rest_clients == {"127.0.0.1:50001": client}
+    assert isinstance(client, SynapsoRestClient)
@@ -0,0 +1,109 @@
+import io
+import json
+import sqlite3
+import tarfile
+
+import pytest
+
+from synapso_cli import snapshot as snapshot_module
+from synapso_cli.config import (
+    ChunkerConfig,
+    GlobalConfig,
+    MetaStoreConfig,
+    PrivateStoreConfig,
+    VectorizerConfig,
+    VectorStoreConfig,
+)
+from synapso_cli.snapshot import (
+    SnapshotError,
+    check_compatible,
+    export_snapshot,
+    import_snapshot,
+    read_snapshot_manifest,
+)
+
+
+def _config(tmp_path, model_name="all-MiniLM-L6-v2", quantization="none"):
+    return GlobalConfig(
+        vectorizer=VectorizerConfig(model_name=model_name),
+        chunker=ChunkerConfig(chunk_size=512, chunk_overlap=64),
+        vector_store=VectorStoreConfig(
+            quantization=quantization, vector_db_path=str(tmp_path / "vector.db")
+        ),
+        meta_store=MetaStoreConfig(meta_db_path=str(tmp_path / "meta.db")),
+        private_store=PrivateStoreConfig(private_db_path=str(tmp_path / "private.db")),
+    )
+
+
+@pytest.fixture
+def stores(tmp_path, monkeypatch):
+    monkeypatch.setattr(snapshot_module, "MANIFEST_DIR", tmp_path / "manifests")
+    (tmp_path / "manifests").mkdir()
+    (tmp_path / "manifests" / "c1.json").write_text("{}")
+    for name in ("meta", "private", "vector"):
+        with sqlite3.connect(tmp_path / f"{name}.db") as conn:
+            conn.execute("CREATE TABLE t (x)")
+            conn.execute("INSERT INTO t VALUES (?)", (name,))
+        conn.close()
+    return tmp_path
+
+
+def _write_archive(path, manifest: dict):
+    with tarfile.open(path, "w:gz") as tar:
+        raw = json.dumps(manifest).encode()
+        info = tarfile.TarInfo("snapshot.json")
+        info.size = len(raw)
+        tar.addfile(info, io.BytesIO(raw))
+
+
+def test_check_compatible_accepts_same_settings(tmp_path):
+    config = _config(tmp_path)
+    check_compatible(snapshot_module._compatibility(config), config)
+
+
+def test_check_compatible_lists_every_mismatch(tmp_path):
+    taken = snapshot_module._compatibility(_config(tmp_path, quantization="int8"))
+    taken["vectorizer"]["model_name"] = "other-model"
+    with pytest.raises(SnapshotError) as e:
+        check_compatible(taken, _config(tmp_path))
+    assert "vectorizer.model_name" in str(e.value)
+    assert "vector_store.quantization" in str(e.value)
+
+
+def test_export_import_round_trip(stores, tmp_path):
+    config = _config(stores)
+    archive = tmp_path / "out" / "snap.tar.gz"
+    exported = export_snapshot(config, archive)
+    assert read_snapshot_manifest(archive) == exported
+
+    (stores / "meta.db").unlink()
+    (stores / "manifests" / "c1.json").unlink()
+    import_snapshot(config, archive)
+    with sqlite3.connect(stores / "meta.db") as conn:
+        assert conn.execute("SELECT x FROM t").fetchall() == [("meta",)]
+    conn.close()
+    assert (stores / "manifests" / "c1.json").read_text() == "{}"
+
+
+def test_import_refuses_other_models(stores, tmp_path):
+    archive = tmp_path / "snap.tar.gz"
+    export_snapshot(_config(stores), archive)
+    with pytest.raises(SnapshotError, match="incompatible"):
+        import_snapshot(_config(stores, model_name="other-model"), archive)
+
+
+@pytest.mark.parametrize(
+    "manifest",
+    [
+        {"version": 1, "manifests": {}},
+        {"version": 1, "stores": {"meta": {"file": "stores/meta.db"}}, "manifests": {}},
+        {"version": 1, "stores": {}, "manifests": {"../escape.json": "0" * 64}},
+        {"version": 1, "stores": {}, "manifests": {}, "chunker": "text"},
+        ["not", "an", "object"],
+    ],
+)
+def test_malformed_manifest_is_a_snapshot_error(stores, tmp_path, manifest):
+    archive = tmp_path / "bad.tar.gz"
+    _write_archive(archive, manifest)
+    with pytest.raises(SnapshotError, match="Corrupt"):
+        import_snapshot(_config(stores), archive)
@@ -0,0 +1,55 @@
+import os
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+
+import synapso_cli
+from synapso_cli.supervisor import ServerLauncher
+
+SRC = Path(synapso_cli.__file__).parents[1]
+
+# Starts a launcher, lowers its own priority as the sampler does, then has
+# the launcher start a process and report that process's niceness.
+SCRIPT = textwrap.dedent(
+    """
+    import os, subprocess, sys
+    from synapso_cli.supervisor import ServerLauncher
+
+    def launch():
+        out = subprocess.check_output(
+            [sys.executable, "-c", "import os; print(os.nice(0))"]
+        )
+        return {"nice": int(out)}
+
+    launcher = ServerLauncher(launch)
+    os.nice(10)
+    print(launcher.launch()["nice"], os.nice(0))
+    launcher.close()
+    """
+)
+
+
+def test_relaunched_server_does_not_inherit_the_samplers_niceness():
+    output = subprocess.check_output(
+        [sys.executable, "-c", SCRIPT],
+        env={**os.environ, "PYTHONPATH": str(SRC)},
+        text=True,
+    )
+    launched, sampler = map(int, output.split())
+    assert launched == os.nice(0)
+    assert sampler == min(os.nice(0) + 10, 19)
+
+
+def test_launch_errors_are_raised_in_the_caller():
+    def launch():
+        raise RuntimeError("uvicorn is not installed")
+
+    launcher = ServerLauncher(launch)
+    try:
+        with pytest.raises(RuntimeError, match="uvicorn is not installed"):
+            launcher.launch()
+    finally:
+        launcher.close()
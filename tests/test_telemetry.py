@@ -0,0 +1,41 @@
+from synapso_cli.telemetry import RECORD_FIELDS, TelemetryRing
+
+
+def _sample(timestamp: float) -> dict:
+    sample: dict[str, float] = dict.fromkeys(RECORD_FIELDS, 0)
+    sample["timestamp"] = timestamp
+    return sample
+
+
+def test_ring_overwrites_oldest_samples(tmp_path):
+    ring = TelemetryRing(tmp_path / "telemetry.bin", capacity=3)
+    for timestamp in range(1, 6):
+        ring.append(_sample(float(timestamp)))
+    ring.close()
+
+    samples = TelemetryRing(tmp_path / "telemetry.bin", capacity=3).read()
+    assert [s["timestamp"] for s in samples] == [3.0, 4.0, 5.0]
+    assert (tmp_path / "telemetry.bin").stat().st_size == 20 + 3 * 60
+
+
+def test_reopened_ring_continues_where_it_stopped(tmp_path):
+    path = tmp_path / "telemetry.bin"
+    for timestamp in range(1, 5):
+        ring = TelemetryRing(path, capacity=3)
+        ring.append(_sample(float(timestamp)))
+        ring.close()
+
+    samples = TelemetryRing(path, capacity=3).read(since=3.0)
+    assert [s["timestamp"] for s in samples] == [3.0, 4.0]
+
+
+def test_resized_ring_starts_over(tmp_path):
+    path = tmp_path / "telemetry.bin"
+    ring = TelemetryRing(path, capacity=3)
+    ring.append(_sample(1.0))
+    ring.close()
+
+    ring = TelemetryRing(path, capacity=4)
+    ring.append(_sample(2.0))
+    ring.close()
+    assert [s["timestamp"] for s in ring.read()] == [2.0]
@@ -0,0 +1,19 @@
+import json
+
+import pytest
+
+from synapso_cli.tracing import ndjson_file_hook
+
+
+def test_ndjson_hook_appends_one_line_per_span(tmp_path):
+    path = tmp_path / "trace.ndjson"
+    hook = ndjson_file_hook(str(path))
+    hook({"endpoint": "/a"})
+    hook({"endpoint": "/b"})
+    lines = path.read_text().splitlines()
+    assert [json.loads(line)["endpoint"] for line in lines] == ["/a", "/b"]
+
+
+def test_ndjson_hook_fails_early_on_unwritable_path(tmp_path):
+    with pytest.raises(OSError):
+        ndjson_file_hook(str(tmp_path / "missing" / "trace.ndjson"))
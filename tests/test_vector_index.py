@@ -0,0 +1,37 @@
+import pytest
+
+from synapso_cli.vector_index import (
+    IvfPartition,
+    VectorIndex,
+    quantize,
+    recall,
+    synthetic_embeddings,
+)
+
+
+@pytest.mark.parametrize("quantization", ["none", "int8", "binary"])
+def test_every_quantization_finds_the_vector_itself(quantization):
+    vectors = synthetic_embeddings(200, 32, seed=1)
+    index = VectorIndex(vectors, quantization)
+    assert index.search(vectors[7], k=1) == [7]
+
+
+def test_bytes_per_vector():
+    vectors = synthetic_embeddings(10, 64)
+    assert quantize(vectors, "none").bytes_per_vector == 256
+    assert quantize(vectors, "int8").bytes_per_vector == 68
+    assert quantize(vectors, "binary").bytes_per_vector == 8
+
+
+def test_unknown_quantization():
+    with pytest.raises(ValueError, match="pq"):
+        quantize([[1.0]], "pq")
+
+
+def test_ivf_probing_every_list_matches_flat_search():
+    vectors = synthetic_embeddings(300, 16, seed=2)
+    partition = IvfPartition(vectors, lists=8)
+    flat = VectorIndex(vectors)
+    ivf = VectorIndex(vectors, partition=partition)
+    query = vectors[0]
+    assert recall(ivf.search(query, 10, probes=8), flat.search(query, 10)) == 1.0
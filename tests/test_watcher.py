@@ -0,0 +1,121 @@
+import pytest
+
+from synapso_cli import manifest
+from synapso_cli.errors import SynapsoRestClientError
+from synapso_cli.jobs import MAX_POLL_FAILURES
+from synapso_cli.watcher import RETRY_BACKOFF_BASE, WatchDaemon, WatchedCortex
+
+
+class FakeWatcher:
+    backend = "fake"
+    fd = None
+
+    def timeout(self):
+        return None
+
+    def read_changes(self):
+        return set()
+
+    def close(self):
+        pass
+
+
+class FakeClient:
+    def __init__(self, submit_error=None, job_status="completed", job_error=None):
+        self.submit_error = submit_error
+        self.job_status = job_status
+        self.job_error = job_error
+        self.submitted = []
+
+    def index_cortex(self, cortex_id, delta=None):
+        self.submitted.append(delta)
+        if self.submit_error is not None:
+            raise self.submit_error
+        return {"job_id": f"job-{len(self.submitted)}"}
+
+    def get_job(self, job_id):
+        if self.job_error is not None:
+            raise self.job_error
+        return {"job_id": job_id, "status": self.job_status}
+
+
+@pytest.fixture
+def cortex(tmp_path, monkeypatch):
+    monkeypatch.setattr(manifest, "MANIFEST_DIR", tmp_path / "manifests")
+    root = tmp_path / "notes"
+    root.mkdir()
+    (root / "a.md").write_text("a")
+    cortex = WatchedCortex("c1", "notes", str(root), FakeWatcher())
+    cortex.add_changes({str(root)}, 0.0)
+    return cortex
+
+
+def _daemon(client, cortex, tmp_path):
+    return WatchDaemon(
+        client,
+        [cortex],
+        debounce=0.0,
+        max_delay=0.0,
+        metrics_path=tmp_path / "metrics.json",
+        log=lambda line: None,
+    )
+
+
+def test_failed_submission_backs_off_instead_of_spinning(cortex, tmp_path):
+    client = FakeClient(submit_error=SynapsoRestClientError("down"))
+    daemon = _daemon(client, cortex, tmp_path)
+    daemon.tick(1.0)
+    daemon.tick(1.1)
+    daemon.tick(1.2)
+    assert len(client.submitted) == 1
+    assert cortex.first_change_at == 1.0
+    assert cortex.due_at(0.0, 0.0) == 1.0 + RETRY_BACKOFF_BASE
+
+    daemon.tick(1.0 + RETRY_BACKOFF_BASE)
+    assert len(client.submitted) == 2
+    assert cortex.due_at(0.0, 0.0) == 1.0 + 3 * RETRY_BACKOFF_BASE
+
+
+def test_failed_job_requeues_its_files(cortex, tmp_path):
+    client = FakeClient(job_status="failed")
+    daemon = _daemon(client, cortex, tmp_path)
+    daemon.tick(1.0)
+    assert cortex.job_id == "job-1"
+    daemon.tick(2.0)
+    assert cortex.job_id is None
+    assert cortex.jobs_failed == 1
+    assert cortex.pending == {cortex.root}
+    assert manifest.load_manifest("c1", cortex.root) == {}
+
+    client.job_status = "completed"
+    daemon.tick(2.0 + RETRY_BACKOFF_BASE)
+    assert client.submitted[1] == client.submitted[0]
+    daemon.tick(3.0 + RETRY_BACKOFF_BASE)
+    assert cortex.failures == 0
+    assert list(manifest.load_manifest("c1", cortex.root)) == ["a.md"]
+
+
+def test_lost_job_is_given_up_and_requeued(cortex, tmp_path):
+    client = FakeClient(job_error=SynapsoRestClientError("404 Job not found"))
+    daemon = _daemon(client, cortex, tmp_path)
+    daemon.tick(1.0)
+    for i in range(1, MAX_POLL_FAILURES):
+        daemon.tick(1.0 + i)
+        assert cortex.job_id == "job-1"
+    daemon.tick(1.0 + MAX_POLL_FAILURES)
+    assert cortex.job_id is None
+    assert cortex.jobs_failed == 1
+    assert cortex.pending == {cortex.root}
+
+    client.job_error = None
+    daemon.tick(1.0 + MAX_POLL_FAILURES + RETRY_BACKOFF_BASE)
+    assert cortex.job_id == "job-2"
+
+
+def test_tick_keeps_the_server_alive(cortex, tmp_path):
+    beats = []
+    daemon = _daemon(FakeClient(), cortex, tmp_path)
+    daemon.keepalive = lambda: beats.append(1)
+    daemon.tick(1.0)
+    daemon.tick(2.0)
+    assert beats == [1, 1]